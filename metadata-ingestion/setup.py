@@ -145,6 +145,7 @@ plugins: Dict[str, Set[str]] = {
     # Sink plugins.
     "datahub-kafka": kafka_common,
     "datahub-rest": {"requests"},
+    "datahub-rest-async": {"aiohttp>=3.7"},
     # Integrations.
     "airflow": {
         "apache-airflow >= 1.10.2",
@@ -168,7 +169,7 @@ plugins: Dict[str, Set[str]] = {
     "datahub-business-glossary": set(),
     "data-lake": {*data_lake_base, *data_lake_profiling},
     "s3": {*s3_base, *data_lake_profiling},
-    "dbt": {"requests"},
+    "dbt": {"requests", "ijson>=3.1"},
     "druid": sql_common | {"pydruid>=0.6.2"},
     # Starting with 7.14.0 python client is checking if it is connected to elasticsearch client. If its not it throws
     # UnsupportedProductError
@@ -311,6 +312,7 @@ base_dev_requirements = {
             "sagemaker",
             "datahub-kafka",
             "datahub-rest",
+            "datahub-rest-async",
             "redash",
             "redshift",
             "redshift-usage",
@@ -460,6 +462,7 @@ entry_points = {
         "console = datahub.ingestion.sink.console:ConsoleSink",
         "datahub-kafka = datahub.ingestion.sink.datahub_kafka:DatahubKafkaSink",
         "datahub-rest = datahub.ingestion.sink.datahub_rest:DatahubRestSink",
+        "datahub-rest-async = datahub.ingestion.sink.datahub_rest_async:DatahubRestAsyncSink",
     ],
     "datahub.ingestion.checkpointing_provider.plugins": [
         "datahub = datahub.ingestion.source.state_provider.datahub_ingestion_checkpointing_provider:DatahubIngestionCheckpointingProvider",
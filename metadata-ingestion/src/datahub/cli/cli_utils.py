@@ -1,11 +1,27 @@
+import concurrent.futures
 import json
 import logging
 import os
 import os.path
 import sys
+import threading
 import typing
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import click
 import requests
@@ -55,10 +71,13 @@ from datahub.metadata.schema_classes import (
     UpstreamLineageClass,
     ViewPropertiesClass,
 )
+from datahub.utilities.prefetch_iter import PrefetchIterator
 from datahub.utilities.urns.urn import Urn
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 DEFAULT_GMS_HOST = "http://localhost:8080"
 CONDENSED_DATAHUB_CONFIG_PATH = "~/.datahubenv"
 DATAHUB_CONFIG_PATH = os.path.expanduser(CONDENSED_DATAHUB_CONFIG_PATH)
@@ -67,6 +86,13 @@ ENV_SKIP_CONFIG = "DATAHUB_SKIP_CONFIG"
 ENV_METADATA_HOST = "DATAHUB_GMS_HOST"
 ENV_METADATA_TOKEN = "DATAHUB_GMS_TOKEN"
 
+# Bounded, since the search endpoint returns all the results of a page at once.
+SEARCH_PAGE_SIZE = 1000
+# GMS only hands out the first 10000 results of a search, see ESUtils.MAX_RESULT_SIZE.
+SEARCH_MAX_RESULTS = 10000
+# Bounds the length of the urls of batch gets.
+BATCH_GET_SIZE = 100
+
 config_override: Dict = {}
 
 
@@ -319,16 +345,92 @@ def post_delete_endpoint_with_session_and_url(
     return urn, rows_affected
 
 
+def _search_after_urn(search_body: Dict[str, Any], urn: str) -> Dict[str, Any]:
+    after_urn = {"field": "urn", "value": urn, "condition": "GREATER_THAN"}
+    filter = search_body.get("filter") or {"or": [{"and": []}]}
+    return {
+        **search_body,
+        "filter": {
+            "or": [
+                {**criteria, "and": [*criteria.get("and", []), after_urn]}
+                for criteria in filter["or"]
+            ]
+        },
+    }
+
+
+def _get_search_result_pages(
+    session: Session, url: str, search_body: Dict[str, Any], page_size: int
+) -> Iterator[List[Dict]]:
+    # Sorting by urn keeps the order of the results the same from page to page.
+    search_body = {"sort": {"field": "urn", "order": "ASCENDING"}, **search_body}
+    window_body = search_body
+    start = 0
+    while True:
+        count = min(page_size, SEARCH_MAX_RESULTS - start)
+        payload = json.dumps({**window_body, "start": start, "count": count})
+        log.debug(payload)
+        response: Response = session.post(url, payload)
+        if response.status_code != 200:
+            log.error(f"Failed to execute search query with {str(response.content)}")
+            response.raise_for_status()
+            return
+        results = response.json()["value"]
+        entities = results["entities"]
+        if not entities:
+            return
+        yield entities
+        start += len(entities)
+        if start >= SEARCH_MAX_RESULTS:
+            # Only the first SEARCH_MAX_RESULTS results of a search can be fetched,
+            # and numEntities is capped at it too, so there may be more. They are
+            # searched for again, past the last urn fetched so far.
+            window_body = _search_after_urn(search_body, entities[-1]["entity"])
+            start = 0
+        elif start >= results["numEntities"]:
+            return
+
+
+def iterate_search_results(
+    search_body: Dict[str, Any],
+    page_size: int = SEARCH_PAGE_SIZE,
+    cached_session_host: Optional[Tuple[Session, str]] = None,
+) -> Iterator[str]:
+    """
+    Lazily yields the urns of the entities that match a search, fetching the results
+    from the search endpoint one page at a time. The next page is fetched in the
+    background while the current one is consumed.
+
+    Searches that match more than SEARCH_MAX_RESULTS entities, which is as many as
+    the search endpoint returns, are split into several searches by urn.
+
+    :param search_body: the body of the search request, without start and count
+    :param page_size: the number of results to fetch per request
+    """
+    session, gms_host = cached_session_host or get_session_and_host()
+    pages = PrefetchIterator(
+        _get_search_result_pages(
+            session, gms_host + "/entities?action=search", search_body, page_size
+        ),
+        buffer_size=1,
+    )
+    try:
+        for page in pages:
+            for x in page:
+                log.debug(f"yielding {x['entity']}")
+                yield x["entity"]
+    finally:
+        pages.close()
+
+
 def get_urns_by_filter(
     platform: Optional[str],
     env: Optional[str],
     entity_type: str = "dataset",
     search_query: str = "*",
     include_removed: bool = False,
+    page_size: int = SEARCH_PAGE_SIZE,
 ) -> Iterable[str]:
-    session, gms_host = get_session_and_host()
-    endpoint: str = "/entities?action=search"
-    url = gms_host + endpoint
     filter_criteria = []
     if env:
         filter_criteria.append({"field": "origin", "value": env, "condition": "EQUAL"})
@@ -370,39 +472,17 @@ def get_urns_by_filter(
     search_body = {
         "input": search_query,
         "entity": entity_type,
-        "start": 0,
-        "count": 10000,
         "filter": {"or": [{"and": filter_criteria}]},
     }
-    payload = json.dumps(search_body)
-    log.debug(payload)
-    response: Response = session.post(url, payload)
-    if response.status_code == 200:
-        assert response._content
-        results = json.loads(response._content)
-        num_entities = results["value"]["numEntities"]
-        entities_yielded: int = 0
-        for x in results["value"]["entities"]:
-            entities_yielded += 1
-            log.debug(f"yielding {x['entity']}")
-            yield x["entity"]
-        assert (
-            entities_yielded == num_entities
-        ), "Did not delete all entities, try running this command again!"
-    else:
-        log.error(f"Failed to execute search query with {str(response.content)}")
-        response.raise_for_status()
+    return iterate_search_results(search_body, page_size=page_size)
 
 
 def get_container_ids_by_filter(
     env: Optional[str],
     entity_type: str = "container",
     search_query: str = "*",
+    page_size: int = SEARCH_PAGE_SIZE,
 ) -> Iterable[str]:
-    session, gms_host = get_session_and_host()
-    endpoint: str = "/entities?action=search"
-    url = gms_host + endpoint
-
     container_filters = []
     for container_subtype in ["Database", "Schema", "Project", "Dataset"]:
         filter_criteria = []
@@ -426,29 +506,9 @@ def get_container_ids_by_filter(
     search_body = {
         "input": search_query,
         "entity": entity_type,
-        "start": 0,
-        "count": 10000,
         "filter": {"or": container_filters},
     }
-    payload = json.dumps(search_body)
-    log.debug(payload)
-    response: Response = session.post(url, payload)
-    if response.status_code == 200:
-        assert response._content
-        log.debug(response._content)
-        results = json.loads(response._content)
-        num_entities = results["value"]["numEntities"]
-        entities_yielded: int = 0
-        for x in results["value"]["entities"]:
-            entities_yielded += 1
-            log.debug(f"yielding {x['entity']}")
-            yield x["entity"]
-        assert (
-            entities_yielded == num_entities
-        ), "Did not delete all entities, try running this command again!"
-    else:
-        log.error(f"Failed to execute search query with {str(response.content)}")
-        response.raise_for_status()
+    return iterate_search_results(search_body, page_size=page_size)
 
 
 def batch_get_ids(
@@ -668,6 +728,60 @@ def get_latest_timeseries_aspect_values(
         return {}
 
 
+def _decode_aspects(
+    aspect_list: Iterable[Dict], typed: bool
+) -> Dict[str, Union[dict, DictWrapper]]:
+    aspect_map: Dict[str, Union[dict, DictWrapper]] = {}
+    for a in aspect_list:
+        aspect_name = a["name"]
+        aspect_py_class: Optional[Type[Any]] = _get_pydantic_class_from_aspect_name(
+            aspect_name
+        )
+        if aspect_name == "unknown":
+            print(f"Failed to find aspect_name for class {aspect_name}")
+
+        aspect_dict = a["value"]
+        if not typed:
+            aspect_map[aspect_name] = aspect_dict
+        elif aspect_py_class:
+            try:
+                post_json_obj = post_json_transform(aspect_dict)
+                aspect_map[aspect_name] = aspect_py_class.from_obj(post_json_obj)
+            except Exception as e:
+                log.error(f"Error on {json.dumps(aspect_dict)}", e)
+    return aspect_map
+
+
+def batch_get_aspects_for_entities(
+    entity_urns: List[str],
+    aspects: List[str],
+    typed: bool = False,
+    cached_session_host: Optional[Tuple[Session, str]] = None,
+) -> Dict[str, Dict[str, Union[dict, DictWrapper]]]:
+    """
+    Gets the given aspects of several entities, with one request per
+    BATCH_GET_SIZE entities. Returns the aspects by entity urn and aspect name;
+    entities that were not found are left out. Unlike get_aspects_for_entity,
+    this does not get timeseries aspects.
+    """
+    session, gms_host = cached_session_host or get_session_and_host()
+    aspects_by_urn: Dict[str, Dict[str, Union[dict, DictWrapper]]] = {}
+    for i in range(0, len(entity_urns), BATCH_GET_SIZE):
+        encoded_urns = ",".join(
+            Urn.url_encode(urn) for urn in entity_urns[i : i + BATCH_GET_SIZE]
+        )
+        response = session.get(
+            f"{gms_host}/entitiesV2?ids=List({encoded_urns})&aspects=List({','.join(aspects)})"
+        )
+        if response.status_code != 200:
+            log.error(f"Failed to execute batch get with {str(response.content)}")
+            response.raise_for_status()
+        for urn, entity in response.json()["results"].items():
+            aspect_map = _decode_aspects(entity.get("aspects", {}).values(), typed)
+            aspects_by_urn[urn] = {k: v for k, v in aspect_map.items() if k in aspects}
+    return aspects_by_urn
+
+
 def get_aspects_for_entity(
     entity_urn: str,
     aspects: List[str],
@@ -711,26 +825,65 @@ def get_aspects_for_entity(
                     }
                 )
 
-    aspect_map: Dict[str, Union[dict, DictWrapper]] = {}
-    for a in aspect_list.values():
-        aspect_name = a["name"]
-        aspect_py_class: Optional[Type[Any]] = _get_pydantic_class_from_aspect_name(
-            aspect_name
-        )
-        if aspect_name == "unknown":
-            print(f"Failed to find aspect_name for class {aspect_name}")
-
-        aspect_dict = a["value"]
-        if not typed:
-            aspect_map[aspect_name] = aspect_dict
-        elif aspect_py_class:
-            try:
-                post_json_obj = post_json_transform(aspect_dict)
-                aspect_map[aspect_name] = aspect_py_class.from_obj(post_json_obj)
-            except Exception as e:
-                log.error(f"Error on {json.dumps(aspect_dict)}", e)
-
+    aspect_map = _decode_aspects(aspect_list.values(), typed)
     if aspects:
         return {k: v for (k, v) in aspect_map.items() if k in aspects}
     else:
         return {k: v for (k, v) in aspect_map.items()}
+
+
+class UrnCheckpointFile:
+    """
+    Records the urns that a bulk command has processed in a file, so that running
+    the command again can skip them. The first line of the file holds the filters
+    of the command, to avoid resuming a different one.
+    """
+
+    def __init__(self, path: str, filters: Dict[str, Any]):
+        self.processed_urns: Set[str] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path) as f:
+                if json.loads(f.readline()) != filters:
+                    raise click.UsageError(
+                        f"The checkpoint file {path} belongs to a command with different filters: {filters}"
+                    )
+                self.processed_urns.update(line.strip() for line in f if line.strip())
+            self._file: TextIO = open(path, "a")
+        else:
+            self._file = open(path, "w")
+            self._file.write(json.dumps(filters) + "\n")
+            self._file.flush()
+
+    def record(self, urn: str) -> None:
+        with self._lock:
+            self._file.write(urn + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def process_urns_concurrently(
+    process: Callable[[str], T], urns: Iterable[str], workers: int
+) -> Iterator[T]:
+    """
+    Runs process on the urns in a pool of workers, yielding the results as they
+    complete. Only a couple of urns per worker are submitted ahead, so that an
+    error stops a bulk command soon.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: Set["concurrent.futures.Future[T]"] = set()
+        remaining_urns = iter(urns)
+        while True:
+            for urn in remaining_urns:
+                pending.add(executor.submit(process, urn))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                yield future.result()
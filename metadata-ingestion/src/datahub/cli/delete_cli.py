@@ -29,6 +29,8 @@ RUN_TABLE_COLUMNS = ["urn", "aspect name", "created at"]
 
 UNKNOWN_NUM_RECORDS = -1
 
+PROGRESS_LOG_INTERVAL_SECONDS = 30
+
 
 @dataclass
 class DeletionResult:
@@ -94,6 +96,19 @@ def delete_for_registry(
 @click.option("--registry-id", required=False, type=str)
 @click.option("-n", "--dry-run", required=False, is_flag=True)
 @click.option("--include-removed", required=False, is_flag=True)
+@click.option(
+    "--workers",
+    required=False,
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of entities to delete concurrently when deleting by filters",
+)
+@click.option(
+    "--checkpoint-file",
+    required=False,
+    type=click.Path(dir_okay=False),
+    help="File to record the entities deleted by filters in. Running the same delete with it again skips them, which resumes an interrupted delete.",
+)
 @telemetry.with_telemetry
 def delete(
     urn: str,
@@ -106,6 +121,8 @@ def delete(
     registry_id: str,
     dry_run: bool,
     include_removed: bool,
+    workers: int,
+    checkpoint_file: Optional[str],
 ) -> None:
     """Delete metadata from datahub using a single urn or a combination of filters"""
 
@@ -170,6 +187,8 @@ def delete(
             search_query=query,
             force=force,
             include_removed=include_removed,
+            workers=workers,
+            checkpoint_file=checkpoint_file,
         )
 
     if not dry_run:
@@ -201,6 +220,8 @@ def delete_with_filters(
     entity_type: str = "dataset",
     env: Optional[str] = None,
     platform: Optional[str] = None,
+    workers: int = 1,
+    checkpoint_file: Optional[str] = None,
 ) -> DeletionResult:
 
     session, gms_host = cli_utils.get_session_and_host()
@@ -209,6 +230,8 @@ def delete_with_filters(
     logger.info(f"datahub configured with {gms_host}")
     emitter = rest_emitter.DatahubRestEmitter(gms_server=gms_host, token=token)
     batch_deletion_result = DeletionResult()
+    # All urns are collected before deleting any of them, since deleting entities
+    # shifts the pages of the search results.
     urns = [
         u
         for u in cli_utils.get_urns_by_filter(
@@ -222,12 +245,32 @@ def delete_with_filters(
     logger.info(
         f"Filter matched {len(urns)} entities. Sample: {choices(urns, k=min(5, len(urns)))}"
     )
+
+    checkpoint: Optional[cli_utils.UrnCheckpointFile] = None
+    if checkpoint_file and not dry_run:
+        checkpoint = cli_utils.UrnCheckpointFile(
+            checkpoint_file,
+            filters={
+                "soft": soft,
+                "include_removed": include_removed,
+                "search_query": search_query,
+                "entity_type": entity_type,
+                "env": env,
+                "platform": platform,
+            },
+        )
+        if checkpoint.processed_urns:
+            logger.info(
+                f"Skipping {len(checkpoint.processed_urns)} entities that {checkpoint_file} records as deleted"
+            )
+            urns = [u for u in urns if u not in checkpoint.processed_urns]
+
     if not force:
         click.confirm(
             f"This will delete {len(urns)} entities. Are you sure?", abort=True
         )
 
-    for urn in progressbar.progressbar(urns, redirect_stdout=True):
+    def delete_urn(urn: str) -> DeletionResult:
         one_result = _delete_one_urn(
             urn,
             soft=soft,
@@ -236,7 +279,31 @@ def delete_with_filters(
             cached_session_host=(session, gms_host),
             cached_emitter=emitter,
         )
-        batch_deletion_result.merge(one_result)
+        if checkpoint:
+            checkpoint.record(urn)
+        return one_result
+
+    start_time = time.time()
+    last_progress_log_time = start_time
+    try:
+        with progressbar.ProgressBar(max_value=len(urns), redirect_stdout=True) as bar:
+            num_deleted = 0
+            for one_result in cli_utils.process_urns_concurrently(
+                delete_urn, urns, workers
+            ):
+                batch_deletion_result.merge(one_result)
+                num_deleted += 1
+                bar.update(num_deleted)
+
+                now = time.time()
+                if now - last_progress_log_time >= PROGRESS_LOG_INTERVAL_SECONDS:
+                    last_progress_log_time = now
+                    logger.info(
+                        f"Deleted {num_deleted} of {len(urns)} entities, at {num_deleted / (now - start_time):.1f} entities per second"
+                    )
+    finally:
+        if checkpoint:
+            checkpoint.close()
     batch_deletion_result.end()
 
     return batch_deletion_result
@@ -1,7 +1,8 @@
 import logging
 import random
+import threading
 import uuid
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import click
 import progressbar
@@ -44,25 +45,30 @@ class MigrationReport:
         self.entities_migrated: Dict[Tuple[str, str], int] = {}
         self.entities_created: Dict[Tuple[str, str], int] = {}
         self.entities_affected: Dict[Tuple[str, str], int] = {}
+        # Entities are migrated concurrently.
+        self._lock = threading.Lock()
 
     def on_entity_migrated(self, urn: str, aspect: str) -> None:
-        self.num_events += 1
-        if (urn, aspect) not in self.entities_migrated:
-            self.entities_migrated[(urn, aspect)] = 1
+        with self._lock:
+            self.num_events += 1
+            if (urn, aspect) not in self.entities_migrated:
+                self.entities_migrated[(urn, aspect)] = 1
 
     def on_entity_create(self, urn: str, aspect: str) -> None:
-        self.num_events += 1
-        if (urn, aspect) not in self.entities_created:
-            self.entities_created[(urn, aspect)] = 1
+        with self._lock:
+            self.num_events += 1
+            if (urn, aspect) not in self.entities_created:
+                self.entities_created[(urn, aspect)] = 1
 
     def on_entity_affected(self, urn: str, aspect: str) -> None:
-        self.num_events += 1
-        if (urn, aspect) not in self.entities_affected:
-            self.entities_affected[(urn, aspect)] = 1
-        else:
-            self.entities_affected[(urn, aspect)] = (
-                self.entities_affected[(urn, aspect)] + 1
-            )
+        with self._lock:
+            self.num_events += 1
+            if (urn, aspect) not in self.entities_affected:
+                self.entities_affected[(urn, aspect)] = 1
+            else:
+                self.entities_affected[(urn, aspect)] = (
+                    self.entities_affected[(urn, aspect)] + 1
+                )
 
     def _get_prefix(self) -> str:
         return "[Dry Run] " if self.dry_run else ""
@@ -91,6 +97,18 @@ def _get_type_from_urn(urn: str) -> str:
     return urn.split(":")[2]
 
 
+class _UrnLocks:
+    """Hands out a lock per urn, to serialize read-modify-writes of an entity."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def get(self, urn: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(urn, threading.Lock())
+
+
 @migrate.command()
 @click.option("--platform", type=str, required=True)
 @click.option("--instance", type=str, required=True)
@@ -111,6 +129,18 @@ def _get_type_from_urn(urn: str) -> str:
     default=False,
     help="When enabled, will not delete (hard/soft) the previous entities.",
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of entities to migrate concurrently.",
+)
+@click.option(
+    "--checkpoint-file",
+    type=click.Path(dir_okay=False),
+    required=False,
+    help="File to record the migrated entities in. Running the same migration with it again skips them, which resumes an interrupted migration.",
+)
 @telemetry.with_telemetry
 def dataplatform2instance(
     instance: str,
@@ -120,42 +150,34 @@ def dataplatform2instance(
     force: bool,
     hard: bool,
     keep: bool,
+    workers: int,
+    checkpoint_file: Optional[str],
 ) -> None:
     """Migrate entities from one dataplatform to a dataplatform instance."""
-    dataplatform2instance_func(instance, platform, dry_run, env, force, hard, keep)
-
-
-def dataplatform2instance_func(
-    instance: str,
-    platform: str,
-    dry_run: bool,
-    env: str,
-    force: bool,
-    hard: bool,
-    keep: bool,
-) -> None:
-    click.echo(
-        f"Starting migration: platform:{platform}, instance={instance}, force={force}, dry-run={dry_run}"
+    dataplatform2instance_func(
+        instance,
+        platform,
+        dry_run,
+        env,
+        force,
+        hard,
+        keep,
+        workers=workers,
+        checkpoint_file=checkpoint_file,
     )
-    run_id: str = f"migrate-{uuid.uuid4()}"
-    migration_report = MigrationReport(run_id, dry_run, keep)
-    system_metadata = SystemMetadataClass(runId=run_id)
 
-    if not dry_run:
-        rest_emitter = DatahubRestEmitter(
-            gms_server=cli_utils.get_session_and_host()[1]
-        )
 
+def _get_urns_to_migrate(platform: str, env: str) -> List[str]:
     urns_to_migrate = []
-
-    # we first calculate all the urns we will be migrating
-    for src_entity_urn in cli_utils.get_urns_by_filter(platform=platform, env=env):
+    src_entity_urns = list(cli_utils.get_urns_by_filter(platform=platform, env=env))
+    # Does each urn already have a platform instance associated with it?
+    responses = cli_utils.batch_get_aspects_for_entities(
+        src_entity_urns, aspects=["dataPlatformInstance"], typed=True
+    )
+    for src_entity_urn in src_entity_urns:
         key = dataset_urn_to_key(src_entity_urn)
         assert key
-        # Does this urn already have a platform instance associated with it?
-        response = cli_utils.get_aspects_for_entity(
-            entity_urn=src_entity_urn, aspects=["dataPlatformInstance"], typed=True
-        )
+        response = responses.get(src_entity_urn, {})
         if "dataPlatformInstance" in response:
             assert isinstance(
                 response["dataPlatformInstance"], DataPlatformInstanceClass
@@ -171,77 +193,71 @@ def dataplatform2instance_func(
                     f"{src_entity_urn} is not an instance specific urn. {response}"
                 )
                 urns_to_migrate.append(src_entity_urn)
+    return urns_to_migrate
 
-    if not force and not dry_run:
-        # get a confirmation from the operator before proceeding if this is not a dry run
-        sampled_urns_to_migrate = random.choices(
-            urns_to_migrate, k=min(10, len(urns_to_migrate))
-        )
-        sampled_new_urns: List[str] = [
-            make_dataset_urn_with_platform_instance(
-                platform=key.platform,
-                name=key.name,
-                platform_instance=instance,
-                env=str(key.origin),
-            )
-            for key in [dataset_urn_to_key(x) for x in sampled_urns_to_migrate]
-            if key
-        ]
-        click.echo(
-            f"Will migrate {len(urns_to_migrate)} urns such as {random.choices(urns_to_migrate, k=min(10, len(urns_to_migrate)))}"
-        )
-        click.echo(f"New urns will look like {sampled_new_urns}")
-        click.confirm("Ok to proceed?", abort=True)
 
-    for src_entity_urn in progressbar.progressbar(
-        urns_to_migrate, redirect_stdout=True
+def _migrate_dataset(
+    src_entity_urn: str,
+    instance: str,
+    platform: str,
+    dry_run: bool,
+    hard: bool,
+    keep: bool,
+    run_id: str,
+    rest_emitter: DatahubRestEmitter,
+    migration_report: MigrationReport,
+    target_locks: _UrnLocks,
+) -> None:
+    system_metadata = SystemMetadataClass(runId=run_id)
+    key = dataset_urn_to_key(src_entity_urn)
+    assert key
+    new_urn = make_dataset_urn_with_platform_instance(
+        platform=key.platform,
+        name=key.name,
+        platform_instance=instance,
+        env=str(key.origin),
+    )
+    log.debug(f"Will migrate {src_entity_urn} to {new_urn}")
+    relationships = list(migration_utils.get_incoming_relationships(src_entity_urn))
+
+    for mcp in migration_utils.clone_aspect(
+        src_entity_urn,
+        aspect_names=migration_utils.all_aspects,
+        entity_type="dataset",
+        dst_urn=new_urn,
+        dry_run=dry_run,
+        run_id=run_id,
     ):
-        key = dataset_urn_to_key(src_entity_urn)
-        assert key
-        new_urn = make_dataset_urn_with_platform_instance(
-            platform=key.platform,
-            name=key.name,
-            platform_instance=instance,
-            env=str(key.origin),
-        )
-        log.debug(f"Will migrate {src_entity_urn} to {new_urn}")
-        relationships = migration_utils.get_incoming_relationships(src_entity_urn)
-
-        for mcp in migration_utils.clone_aspect(
-            src_entity_urn,
-            aspect_names=migration_utils.all_aspects,
-            entity_type="dataset",
-            dst_urn=new_urn,
-            dry_run=dry_run,
-            run_id=run_id,
-        ):
-            if not dry_run:
-                rest_emitter.emit_mcp(mcp)
-            migration_report.on_entity_create(mcp.entityUrn, mcp.aspectName)  # type: ignore
-
         if not dry_run:
-            rest_emitter.emit_mcp(
-                MetadataChangeProposalWrapper(
-                    entityType="dataset",
-                    changeType=ChangeTypeClass.UPSERT,
-                    entityUrn=new_urn,
-                    aspectName="dataPlatformInstance",
-                    aspect=DataPlatformInstanceClass(
-                        platform=make_data_platform_urn(platform),
-                        instance=make_dataplatform_instance_urn(platform, instance),
-                    ),
-                    systemMetadata=system_metadata,
-                )
-            )
-        migration_report.on_entity_create(new_urn, "dataPlatformInstance")
-
-        for relationship in relationships:
-            target_urn = relationship["entity"]
-            entity_type = _get_type_from_urn(target_urn)
-            relationshipType = relationship["type"]
-            aspect_name = migration_utils.get_aspect_name_from_relationship(
-                relationshipType, entity_type
+            rest_emitter.emit_mcp(mcp)
+        migration_report.on_entity_create(mcp.entityUrn, mcp.aspectName)  # type: ignore
+
+    if not dry_run:
+        rest_emitter.emit_mcp(
+            MetadataChangeProposalWrapper(
+                entityType="dataset",
+                changeType=ChangeTypeClass.UPSERT,
+                entityUrn=new_urn,
+                aspectName="dataPlatformInstance",
+                aspect=DataPlatformInstanceClass(
+                    platform=make_data_platform_urn(platform),
+                    instance=make_dataplatform_instance_urn(platform, instance),
+                ),
+                systemMetadata=system_metadata,
             )
+        )
+    migration_report.on_entity_create(new_urn, "dataPlatformInstance")
+
+    for relationship in relationships:
+        target_urn = relationship["entity"]
+        entity_type = _get_type_from_urn(target_urn)
+        relationshipType = relationship["type"]
+        aspect_name = migration_utils.get_aspect_name_from_relationship(
+            relationshipType, entity_type
+        )
+        # Other workers may be rewiring other relationships of the same entity,
+        # whose changes to the aspect must not be overwritten.
+        with target_locks.get(target_urn):
             aspect_map = cli_utils.get_aspects_for_entity(
                 target_urn, aspects=[aspect_name], typed=True
             )
@@ -265,10 +281,107 @@ def dataplatform2instance_func(
             else:
                 log.debug(f"Didn't find aspect {aspect_name} for urn {target_urn}")
 
-        if not dry_run and not keep:
-            log.info(f"will {'hard' if hard else 'soft'} delete {src_entity_urn}")
-            delete_cli._delete_one_urn(src_entity_urn, soft=not hard, run_id=run_id)
-        migration_report.on_entity_migrated(src_entity_urn, "status")  # type: ignore
+    if not dry_run and not keep:
+        log.info(f"will {'hard' if hard else 'soft'} delete {src_entity_urn}")
+        delete_cli._delete_one_urn(src_entity_urn, soft=not hard, run_id=run_id)
+    migration_report.on_entity_migrated(src_entity_urn, "status")  # type: ignore
+
+
+def dataplatform2instance_func(
+    instance: str,
+    platform: str,
+    dry_run: bool,
+    env: str,
+    force: bool,
+    hard: bool,
+    keep: bool,
+    workers: int = 1,
+    checkpoint_file: Optional[str] = None,
+) -> None:
+    click.echo(
+        f"Starting migration: platform:{platform}, instance={instance}, force={force}, dry-run={dry_run}"
+    )
+    run_id: str = f"migrate-{uuid.uuid4()}"
+    migration_report = MigrationReport(run_id, dry_run, keep)
+
+    # Nothing is emitted in a dry run.
+    rest_emitter = DatahubRestEmitter(gms_server=cli_utils.get_session_and_host()[1])
+
+    # we first calculate all the urns we will be migrating
+    urns_to_migrate = _get_urns_to_migrate(platform, env)
+
+    checkpoint: Optional[cli_utils.UrnCheckpointFile] = None
+    if checkpoint_file and not dry_run:
+        checkpoint = cli_utils.UrnCheckpointFile(
+            checkpoint_file,
+            filters={
+                "platform": platform,
+                "instance": instance,
+                "env": env,
+                "hard": hard,
+                "keep": keep,
+            },
+        )
+        if checkpoint.processed_urns:
+            click.echo(
+                f"Skipping {len(checkpoint.processed_urns)} urns that {checkpoint_file} records as migrated"
+            )
+            urns_to_migrate = [
+                urn for urn in urns_to_migrate if urn not in checkpoint.processed_urns
+            ]
+
+    if not force and not dry_run:
+        # get a confirmation from the operator before proceeding if this is not a dry run
+        sampled_urns_to_migrate = random.choices(
+            urns_to_migrate, k=min(10, len(urns_to_migrate))
+        )
+        sampled_new_urns: List[str] = [
+            make_dataset_urn_with_platform_instance(
+                platform=key.platform,
+                name=key.name,
+                platform_instance=instance,
+                env=str(key.origin),
+            )
+            for key in [dataset_urn_to_key(x) for x in sampled_urns_to_migrate]
+            if key
+        ]
+        click.echo(
+            f"Will migrate {len(urns_to_migrate)} urns such as {random.choices(urns_to_migrate, k=min(10, len(urns_to_migrate)))}"
+        )
+        click.echo(f"New urns will look like {sampled_new_urns}")
+        click.confirm("Ok to proceed?", abort=True)
+
+    target_locks = _UrnLocks()
+
+    def migrate_dataset(src_entity_urn: str) -> None:
+        _migrate_dataset(
+            src_entity_urn,
+            instance=instance,
+            platform=platform,
+            dry_run=dry_run,
+            hard=hard,
+            keep=keep,
+            run_id=run_id,
+            rest_emitter=rest_emitter,
+            migration_report=migration_report,
+            target_locks=target_locks,
+        )
+        if checkpoint:
+            checkpoint.record(src_entity_urn)
+
+    try:
+        with progressbar.ProgressBar(
+            max_value=len(urns_to_migrate), redirect_stdout=True
+        ) as bar:
+            num_migrated = 0
+            for _ in cli_utils.process_urns_concurrently(
+                migrate_dataset, urns_to_migrate, workers
+            ):
+                num_migrated += 1
+                bar.update(num_migrated)
+    finally:
+        if checkpoint:
+            checkpoint.close()
 
     print(f"{migration_report}")
     migrate_containers(
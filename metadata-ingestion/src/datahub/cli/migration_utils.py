@@ -259,11 +259,13 @@ def clone_aspect(
                         runId=run_id,
                     ),
                 )
+                # The mcps are yielded in dry runs too, for reporting, but must
+                # not be emitted.
                 if not dry_run:
                     log.debug(f"Emitting mcp for {dst_urn}")
-                    yield new_mcp
                 else:
                     log.debug(f"Would update aspect {a} as {aspect_map[a]}")
+                yield new_mcp
             else:
                 log.debug(f"did not find aspect {a} in response, continuing...")
 
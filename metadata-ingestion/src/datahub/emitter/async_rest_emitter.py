@@ -0,0 +1,244 @@
+import asyncio
+import datetime
+import json
+import logging
+import ssl
+from typing import Dict, List, Optional, Tuple, Union
+
+from datahub.configuration.common import ConfigurationError, OperationalError
+from datahub.emitter.mcp import MetadataChangeProposalWrapper
+from datahub.emitter.rest_emitter import DataHubRestEmitter, DataHubRestSerializer
+from datahub.metadata.com.linkedin.pegasus2avro.mxe import (
+    MetadataChangeEvent,
+    MetadataChangeProposal,
+)
+from datahub.metadata.com.linkedin.pegasus2avro.usage import UsageAggregation
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# The same backoff as the blocking emitter's urllib3 Retry configuration.
+_RETRY_BACKOFF_FACTOR = 2
+_RETRY_BACKOFF_MAX_SEC = 120
+_RETRY_AFTER_STATUS_CODES = {413, 429, 503}
+
+
+class DataHubAsyncRestEmitter(DataHubRestSerializer):
+    """
+    An asyncio counterpart of DataHubRestEmitter, for emitting many records
+    concurrently from a single thread. Requests are sent over a pool of keep-alive
+    HTTP/1.1 connections, and failed requests are retried the same way as by the
+    blocking emitter. The emitter must be closed, or used as an async context
+    manager, to release its connections.
+    """
+
+    DEFAULT_MAX_CONNECTIONS = 100
+
+    _gms_server: str
+    _token: Optional[str]
+    _session: Optional["aiohttp.ClientSession"]
+    _connect_timeout_sec: float = DataHubRestEmitter.DEFAULT_CONNECT_TIMEOUT_SEC
+    _read_timeout_sec: float = DataHubRestEmitter.DEFAULT_READ_TIMEOUT_SEC
+    _retry_status_codes: List[int] = DataHubRestEmitter.DEFAULT_RETRY_STATUS_CODES
+    _retry_max_times: int = DataHubRestEmitter.DEFAULT_RETRY_MAX_TIMES
+
+    def __init__(
+        self,
+        gms_server: str,
+        token: Optional[str] = None,
+        connect_timeout_sec: Optional[float] = None,
+        read_timeout_sec: Optional[float] = None,
+        retry_status_codes: Optional[List[int]] = None,
+        retry_max_times: Optional[int] = None,
+        extra_headers: Optional[Dict[str, str]] = None,
+        ca_certificate_path: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        compression: Optional[str] = None,
+        compression_min_size_bytes: Optional[int] = None,
+    ):
+        if aiohttp is None:
+            raise ConfigurationError(
+                "The asyncio emitter requires the aiohttp package. Install it with `pip install 'acryl-datahub[datahub-rest-async]'`."
+            )
+
+        self._gms_server = gms_server
+        self._token = token
+        self._session = None
+
+        self._headers = {
+            "X-RestLi-Protocol-Version": "2.0.0",
+            "Content-Type": "application/json",
+        }
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        if extra_headers:
+            self._headers.update(extra_headers)
+
+        self._ca_certificate_path = ca_certificate_path
+        self._max_connections = max_connections
+
+        if connect_timeout_sec:
+            self._connect_timeout_sec = connect_timeout_sec
+
+        if read_timeout_sec:
+            self._read_timeout_sec = read_timeout_sec
+
+        if self._connect_timeout_sec < 1 or self._read_timeout_sec < 1:
+            logger.warning(
+                f"Setting timeout values lower than 1 second is not recommended. Your configuration is connect_timeout:{self._connect_timeout_sec}s, read_timeout:{self._read_timeout_sec}s"
+            )
+
+        if retry_status_codes is not None:  # Only if missing. Empty list is allowed
+            self._retry_status_codes = retry_status_codes
+
+        if retry_max_times:
+            self._retry_max_times = retry_max_times
+
+        self._set_compression(compression, compression_min_size_bytes)
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        # The session is bound to the event loop it is created in, so it is only
+        # created once the emitter is first used from within that loop.
+        if self._session is None:
+            ssl_context: Union[bool, ssl.SSLContext] = True
+            if self._ca_certificate_path:
+                ssl_context = ssl.create_default_context(
+                    cafile=self._ca_certificate_path
+                )
+            self._session = aiohttp.ClientSession(
+                headers=self._headers,
+                connector=aiohttp.TCPConnector(
+                    limit=self._max_connections, ssl=ssl_context
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self._connect_timeout_sec,
+                    sock_read=self._read_timeout_sec,
+                ),
+                raise_for_status=False,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "DataHubAsyncRestEmitter":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def test_connection(self) -> dict:
+        url = f"{self._gms_server}/config"
+        async with self._get_session().get(url) as response:
+            if response.status == 200:
+                config: dict = await response.json(content_type=None)
+                if config.get("noCode") == "true":
+                    self._negotiate_compression(config)
+                    return config
+                raise ConfigurationError(
+                    "You have either connected to a pre-v0.8.0 DataHub GMS instance, or to a different server altogether! Please check your configuration and make sure you are talking to the DataHub GMS endpoint."
+                )
+            auth_message = "Maybe you need to set up authentication? "
+            raise ConfigurationError(
+                f"Unable to connect to {url} with status_code: {response.status}. {auth_message if response.status == 401 else ''}Please check your configuration and make sure you are talking to the DataHub GMS (usually <datahub-gms-host>:8080) or Frontend GMS API (usually <frontend>:9002/api/gms)."
+            )
+
+    async def emit(
+        self,
+        item: Union[
+            MetadataChangeEvent,
+            MetadataChangeProposal,
+            MetadataChangeProposalWrapper,
+            UsageAggregation,
+        ],
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        return await self.emit_serialized(*self.serialize(item))
+
+    async def emit_serialized(
+        self, url: str, payload: str
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        start_time = datetime.datetime.now()
+        await self._emit_generic(url, payload)
+        return start_time, datetime.datetime.now()
+
+    async def emit_mce(self, mce: MetadataChangeEvent) -> None:
+        await self._emit_generic(*self._serialize_mce(mce))
+
+    async def emit_mces(self, mces: List[MetadataChangeEvent]) -> None:
+        await self._emit_generic(*self._serialize_mces(mces))
+
+    async def emit_mcp(
+        self, mcp: Union[MetadataChangeProposal, MetadataChangeProposalWrapper]
+    ) -> None:
+        await self._emit_generic(*self._serialize_mcp(mcp))
+
+    async def emit_usage(self, usageStats: UsageAggregation) -> None:
+        await self.emit_usages([usageStats])
+
+    async def emit_usages(self, usages: List[UsageAggregation]) -> None:
+        await self._emit_generic(*self._serialize_usages(usages))
+
+    @staticmethod
+    def _get_backoff_sec(retry_number: int, retry_after: Optional[str]) -> float:
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                # Retry-After can also be an HTTP date, which urllib3 honours but
+                # GMS does not send; fall back to the exponential backoff.
+                pass
+        # Like urllib3, retry immediately the first time and back off after that.
+        if retry_number <= 1:
+            return 0.0
+        return min(
+            _RETRY_BACKOFF_FACTOR * (2 ** (retry_number - 1)), _RETRY_BACKOFF_MAX_SEC
+        )
+
+    async def _emit_generic(self, url: str, payload: str) -> None:
+        logger.debug("Attempting to emit to DataHub GMS at %s:\n%s", url, payload)
+        session = self._get_session()
+        data, headers = self._compress_payload(payload)
+        retry_number = 0
+        while True:
+            try:
+                async with session.post(url, data=data, headers=headers) as response:
+                    if (
+                        response.status in self._retry_status_codes
+                        and retry_number < self._retry_max_times
+                    ):
+                        retry_number += 1
+                        retry_after = (
+                            response.headers.get("Retry-After")
+                            if response.status in _RETRY_AFTER_STATUS_CODES
+                            else None
+                        )
+                        await asyncio.sleep(
+                            self._get_backoff_sec(retry_number, retry_after)
+                        )
+                        continue
+                    if response.status >= 400:
+                        body = await response.text()
+                        try:
+                            info = json.loads(body)
+                        except ValueError:
+                            info = {
+                                "message": f"{response.status} Error: {response.reason} for url: {url}"
+                            }
+                        raise OperationalError(
+                            "Unable to emit metadata to DataHub GMS", info
+                        )
+                    return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if retry_number < self._retry_max_times:
+                    retry_number += 1
+                    await asyncio.sleep(self._get_backoff_sec(retry_number, None))
+                    continue
+                raise OperationalError(
+                    "Unable to emit metadata to DataHub GMS", {"message": str(e)}
+                ) from e
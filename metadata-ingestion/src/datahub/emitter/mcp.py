@@ -2,7 +2,7 @@ import dataclasses
 import json
 from typing import Union
 
-from datahub.emitter.serialization_helper import pre_json_transform
+from datahub.emitter.serialization_helper import to_restli_obj
 from datahub.metadata.schema_classes import (
     ChangeTypeClass,
     DictWrapper,
@@ -14,7 +14,7 @@ from datahub.metadata.schema_classes import (
 
 
 def _make_generic_aspect(codegen_obj: DictWrapper) -> GenericAspectClass:
-    serialized = json.dumps(pre_json_transform(codegen_obj.to_obj()))
+    serialized = json.dumps(to_restli_obj(codegen_obj))
     return GenericAspectClass(
         value=serialized.encode(),
         contentType="application/json",
@@ -1,6 +1,5 @@
 import datetime
 import itertools
-import json
 import logging
 import shlex
 from json.decoder import JSONDecodeError
@@ -12,15 +11,24 @@ from requests.exceptions import HTTPError, RequestException
 
 from datahub.configuration.common import ConfigurationError, OperationalError
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
-from datahub.emitter.serialization_helper import pre_json_transform
+from datahub.emitter.serialization_helper import json_dumps, to_restli_obj
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import (
     MetadataChangeEvent,
     MetadataChangeProposal,
 )
 from datahub.metadata.com.linkedin.pegasus2avro.usage import UsageAggregation
+from datahub.utilities.file_compression import (
+    FileCompression,
+    check_compression_supported,
+    compress,
+)
 
 logger = logging.getLogger(__name__)
 
+# The key of the server config listing the content encodings that GMS accepts for
+# request payloads, e.g. ["gzip", "zstd"].
+GMS_CONFIG_REQUEST_ENCODINGS_KEY = "supportedRequestEncodings"
+
 
 def _make_curl_command(
     session: requests.Session, method: str, url: str, payload: str
@@ -39,7 +47,136 @@ def _make_curl_command(
     return " ".join(shlex.quote(fragment) for fragment in fragments)
 
 
-class DataHubRestEmitter:
+class DataHubRestSerializer:
+    """
+    Serializes metadata into the urls and payloads of the GMS REST endpoints, and
+    compresses the payloads if the server accepts it. This is shared by the
+    blocking and the asyncio emitters.
+    """
+
+    DEFAULT_COMPRESSION_MIN_SIZE_BYTES = 16 * 1024
+
+    _gms_server: str
+    _requested_compression: Optional[FileCompression] = None
+    # Only set once test_connection has found the server to accept it.
+    _compression: Optional[FileCompression] = None
+    _compression_min_size_bytes: int = DEFAULT_COMPRESSION_MIN_SIZE_BYTES
+
+    def _set_compression(
+        self, compression: Optional[str], min_size_bytes: Optional[int]
+    ) -> None:
+        if compression:
+            try:
+                self._requested_compression = FileCompression(compression)
+            except ValueError:
+                raise ConfigurationError(
+                    f"Unsupported compression {compression}, use one of {[c.value for c in FileCompression]}"
+                )
+            check_compression_supported(self._requested_compression)
+
+        if min_size_bytes is not None:
+            self._compression_min_size_bytes = min_size_bytes
+
+    def _negotiate_compression(self, gms_config: dict) -> None:
+        compression = self._requested_compression
+        if compression is None:
+            return
+        if compression.value in gms_config.get(GMS_CONFIG_REQUEST_ENCODINGS_KEY, []):
+            self._compression = compression
+        else:
+            logger.warning(
+                f"DataHub GMS at {self._gms_server} does not accept {compression.value} compressed requests, sending them uncompressed"
+            )
+
+    def _compress_payload(
+        self, payload: str
+    ) -> Tuple[Union[str, bytes], Dict[str, str]]:
+        """Returns the request body to send for the payload, and its extra headers."""
+        data = payload.encode("utf-8")
+        if self._compression is None or len(data) < self._compression_min_size_bytes:
+            return payload, {}
+        return (
+            compress(data, self._compression),
+            {"Content-Encoding": self._compression.value},
+        )
+
+    def serialize(
+        self,
+        item: Union[
+            MetadataChangeEvent,
+            MetadataChangeProposal,
+            MetadataChangeProposalWrapper,
+            UsageAggregation,
+        ],
+    ) -> Tuple[str, str]:
+        """
+        Returns the url and payload that emit() would POST for the given item.
+        Together with emit_serialized, this lets callers serialize items ahead of
+        sending them, e.g. to account for their size.
+        """
+        if isinstance(item, UsageAggregation):
+            return self._serialize_usages([item])
+        elif isinstance(item, (MetadataChangeProposal, MetadataChangeProposalWrapper)):
+            return self._serialize_mcp(item)
+        else:
+            return self._serialize_mce(item)
+
+    def _serialize_mce(self, mce: MetadataChangeEvent) -> Tuple[str, str]:
+        url = f"{self._gms_server}/entities?action=ingest"
+
+        entity_obj, system_metadata_obj = self._make_mce_obj(mce)
+        snapshot = {
+            "entity": entity_obj,
+            "systemMetadata": system_metadata_obj,
+        }
+        return url, json_dumps(snapshot)
+
+    def _serialize_mces(self, mces: List[MetadataChangeEvent]) -> Tuple[str, str]:
+        url = f"{self._gms_server}/entities?action=batchIngest"
+
+        entities: List[dict] = []
+        system_metadata: List[dict] = []
+        for mce in mces:
+            entity_obj, system_metadata_obj = self._make_mce_obj(mce)
+            entities.append(entity_obj)
+            system_metadata.append(system_metadata_obj)
+        payload = json_dumps({"entities": entities, "systemMetadata": system_metadata})
+        return url, payload
+
+    @staticmethod
+    def _make_mce_obj(mce: MetadataChangeEvent) -> Tuple[dict, dict]:
+        mce_obj = to_restli_obj(mce.proposedSnapshot)
+        snapshot_fqn = (
+            f"com.linkedin.metadata.snapshot.{mce.proposedSnapshot.RECORD_SCHEMA.name}"
+        )
+        system_metadata_obj = {}
+        if mce.systemMetadata is not None:
+            system_metadata_obj = {
+                "lastObserved": mce.systemMetadata.lastObserved,
+                "runId": mce.systemMetadata.runId,
+            }
+        return {"value": {snapshot_fqn: mce_obj}}, system_metadata_obj
+
+    def _serialize_mcp(
+        self, mcp: Union[MetadataChangeProposal, MetadataChangeProposalWrapper]
+    ) -> Tuple[str, str]:
+        url = f"{self._gms_server}/aspects?action=ingestProposal"
+
+        mcp_obj = to_restli_obj(
+            mcp.make_mcp() if isinstance(mcp, MetadataChangeProposalWrapper) else mcp
+        )
+        return url, json_dumps({"proposal": mcp_obj})
+
+    def _serialize_usages(self, usages: List[UsageAggregation]) -> Tuple[str, str]:
+        url = f"{self._gms_server}/usageStats?action=batchIngest"
+
+        snapshot = {
+            "buckets": [to_restli_obj(usage) for usage in usages],
+        }
+        return url, json_dumps(snapshot)
+
+
+class DataHubRestEmitter(DataHubRestSerializer):
     DEFAULT_CONNECT_TIMEOUT_SEC = 30  # 30 seconds should be plenty to connect
     DEFAULT_READ_TIMEOUT_SEC = (
         30  # Any ingest call taking longer than 30 seconds should be abandoned
@@ -73,6 +210,8 @@ class DataHubRestEmitter:
         retry_max_times: Optional[int] = None,
         extra_headers: Optional[Dict[str, str]] = None,
         ca_certificate_path: Optional[str] = None,
+        compression: Optional[str] = None,
+        compression_min_size_bytes: Optional[int] = None,
     ):
         self._gms_server = gms_server
         self._token = token
@@ -114,6 +253,8 @@ class DataHubRestEmitter:
         if retry_max_times:
             self._retry_max_times = retry_max_times
 
+        self._set_compression(compression, compression_min_size_bytes)
+
         try:
             retry_strategy = Retry(
                 total=self._retry_max_times,
@@ -141,6 +282,7 @@ class DataHubRestEmitter:
         if response.status_code == 200:
             config: dict = response.json()
             if config.get("noCode") == "true":
+                self._negotiate_compression(config)
                 return config
 
             else:
@@ -178,51 +320,36 @@ class DataHubRestEmitter:
             self.emit_mce(item)
         return start_time, datetime.datetime.now()
 
+    def emit_serialized(
+        self, url: str, payload: str
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        start_time = datetime.datetime.now()
+        self._emit_generic(url, payload)
+        return start_time, datetime.datetime.now()
+
     def emit_mce(self, mce: MetadataChangeEvent) -> None:
-        url = f"{self._gms_server}/entities?action=ingest"
+        self._emit_generic(*self._serialize_mce(mce))
 
-        raw_mce_obj = mce.proposedSnapshot.to_obj()
-        mce_obj = pre_json_transform(raw_mce_obj)
-        snapshot_fqn = (
-            f"com.linkedin.metadata.snapshot.{mce.proposedSnapshot.RECORD_SCHEMA.name}"
-        )
-        system_metadata_obj = {}
-        if mce.systemMetadata is not None:
-            system_metadata_obj = {
-                "lastObserved": mce.systemMetadata.lastObserved,
-                "runId": mce.systemMetadata.runId,
-            }
-        snapshot = {
-            "entity": {"value": {snapshot_fqn: mce_obj}},
-            "systemMetadata": system_metadata_obj,
-        }
-        payload = json.dumps(snapshot)
+    def emit_mces(self, mces: List[MetadataChangeEvent]) -> None:
+        """
+        Emit several MCEs in a single request using the GMS batch ingest endpoint.
 
-        self._emit_generic(url, payload)
+        The batch is ingested as a whole: if any of the MCEs is rejected, an
+        OperationalError is raised and callers that need per-record results
+        should fall back to emit_mce.
+        """
+        self._emit_generic(*self._serialize_mces(mces))
 
     def emit_mcp(
         self, mcp: Union[MetadataChangeProposal, MetadataChangeProposalWrapper]
     ) -> None:
-        url = f"{self._gms_server}/aspects?action=ingestProposal"
-
-        mcp_obj = pre_json_transform(mcp.to_obj())
-        payload = json.dumps({"proposal": mcp_obj})
-
-        self._emit_generic(url, payload)
+        self._emit_generic(*self._serialize_mcp(mcp))
 
     def emit_usage(self, usageStats: UsageAggregation) -> None:
-        url = f"{self._gms_server}/usageStats?action=batchIngest"
+        self.emit_usages([usageStats])
 
-        raw_usage_obj = usageStats.to_obj()
-        usage_obj = pre_json_transform(raw_usage_obj)
-
-        snapshot = {
-            "buckets": [
-                usage_obj,
-            ]
-        }
-        payload = json.dumps(snapshot)
-        self._emit_generic(url, payload)
+    def emit_usages(self, usages: List[UsageAggregation]) -> None:
+        self._emit_generic(*self._serialize_usages(usages))
 
     def _emit_generic(self, url: str, payload: str) -> None:
         curl_command = _make_curl_command(self._session, "POST", url, payload)
@@ -230,10 +357,12 @@ class DataHubRestEmitter:
             "Attempting to emit to DataHub GMS; using curl equivalent to:\n%s",
             curl_command,
         )
+        data, headers = self._compress_payload(payload)
         try:
             response = self._session.post(
                 url,
-                data=payload,
+                data=data,
+                headers=headers,
                 timeout=(self._connect_timeout_sec, self._read_timeout_sec),
             )
 
@@ -1,5 +1,13 @@
+import json
 from collections import OrderedDict
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional
+
+import avro.schema
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 
 
 def _json_transform(obj: Any, from_pattern: str, to_pattern: str) -> Any:
@@ -41,3 +49,219 @@ def post_json_transform(obj: Any) -> Any:
     return _json_transform(
         obj, from_pattern="com.linkedin.", to_pattern="com.linkedin.pegasus2avro."
     )
+
+
+_PEGASUS2AVRO_PREFIX = "com.linkedin.pegasus2avro."
+_RESTLI_PREFIX = "com.linkedin."
+
+_INT_MIN, _INT_MAX = -(1 << 31), (1 << 31) - 1
+_LONG_MIN, _LONG_MAX = -(1 << 63), (1 << 63) - 1
+
+_Converter = Callable[[Any, bool], Any]
+
+# Keyed by id() of the schema objects, which live for as long as the generated classes do.
+_converters: Dict[int, _Converter] = {}
+
+
+def _union_branch_name(schema: avro.schema.Schema) -> str:
+    if isinstance(schema, avro.schema.NamedSchema):
+        name = schema.fullname.lstrip(".")
+        if name.startswith(_PEGASUS2AVRO_PREFIX):
+            name = name.replace(_PEGASUS2AVRO_PREFIX, _RESTLI_PREFIX, 1)
+        return name
+    return schema.type
+
+
+def _matches(schema: avro.schema.Schema, value: Any) -> bool:
+    # A shallow version of the avro validation used to pick a union branch.
+    schema_type = schema.type
+    if schema_type == "null":
+        return value is None
+    elif schema_type == "boolean":
+        return isinstance(value, bool)
+    elif schema_type == "string":
+        return isinstance(value, str)
+    elif schema_type == "bytes":
+        return isinstance(value, (bytes, str))
+    elif schema_type == "int":
+        return isinstance(value, int) and _INT_MIN <= value <= _INT_MAX
+    elif schema_type == "long":
+        return isinstance(value, int) and _LONG_MIN <= value <= _LONG_MAX
+    elif schema_type in ("float", "double"):
+        return isinstance(value, (int, float))
+    elif schema_type == "enum":
+        return value in schema.symbols
+    elif schema_type == "array":
+        return isinstance(value, list)
+    elif schema_type == "map":
+        return isinstance(value, dict)
+    elif schema_type in ("record", "error", "request"):
+        return isinstance(value, dict) or hasattr(value, "_inner_dict")
+    return False
+
+
+def _is_unambiguous_union(schema: avro.schema.UnionSchema) -> bool:
+    if any(isinstance(branch, avro.schema.EnumSchema) for branch in schema.schemas):
+        return len(schema.schemas) == 2 and any(
+            branch.type == "null" for branch in schema.schemas
+        )
+    return sum(1 for branch in schema.schemas if branch.type != "null") <= 1
+
+
+def _get_converter(schema: avro.schema.Schema) -> _Converter:
+    converter = _converters.get(id(schema))
+    if converter is None:
+        converter = _make_converter(schema)
+        _converters[id(schema)] = converter
+    return converter
+
+
+def _make_converter(schema: avro.schema.Schema) -> _Converter:
+    schema_type = schema.type
+    if schema_type in ("record", "error", "request"):
+        return _make_record_converter(schema)
+    elif schema_type == "union":
+        return _make_union_converter(schema)
+    elif schema_type == "array":
+        return _make_array_converter(schema)
+    elif schema_type == "map":
+        return _make_map_converter(schema)
+    elif schema_type in ("bytes", "fixed"):
+        return lambda value, within_array: (
+            value.decode() if isinstance(value, bytes) else value
+        )
+    else:
+        # Other primitives and enums are already in their json form.
+        return lambda value, within_array: value
+
+
+def _make_union_converter(schema: avro.schema.UnionSchema) -> _Converter:
+    branches: List[avro.schema.Schema] = schema.schemas
+    branch_names = [_union_branch_name(branch) for branch in branches]
+    branch_fullnames = [
+        branch.fullname if isinstance(branch, avro.schema.NamedSchema) else None
+        for branch in branches
+    ]
+    unambiguous = _is_unambiguous_union(schema)
+
+    def convert_union(value: Any, within_array: bool) -> Any:
+        if value is None:
+            return None
+        index = -1
+        record_schema = getattr(type(value), "RECORD_SCHEMA", None)
+        for i, branch in enumerate(branches):
+            if (
+                record_schema is not None
+                and branch_fullnames[i] == record_schema.fullname
+            ):
+                index = i
+                break
+            # Like avro, prefer the last matching branch unless it is a boolean.
+            if _matches(branch, value):
+                index = i
+                if branch.type == "boolean":
+                    break
+        if index < 0:
+            raise avro.schema.AvroException(
+                f"Value {value!r} does not match any branch of {schema}"
+            )
+        if branches[index].type == "null":
+            return None
+        converted = _get_converter(branches[index])(value, False)
+        if unambiguous and not within_array:
+            return converted
+        return {branch_names[index]: converted}
+
+    return convert_union
+
+
+def _make_array_converter(schema: avro.schema.ArraySchema) -> _Converter:
+    items_schema = schema.items
+
+    def convert_array(value: Any, within_array: bool) -> Any:
+        convert_item = _get_converter(items_schema)
+        return [convert_item(item, True) for item in value]
+
+    return convert_array
+
+
+def _make_map_converter(schema: avro.schema.MapSchema) -> _Converter:
+    values_schema = schema.values
+
+    def convert_map(value: Any, within_array: bool) -> Any:
+        convert_value = _get_converter(values_schema)
+        return {
+            key: converted
+            for key, converted in (
+                (key, convert_value(item, False)) for key, item in value.items()
+            )
+            if converted is not None
+        }
+
+    return convert_map
+
+
+def _make_record_converter(schema: avro.schema.RecordSchema) -> _Converter:
+    fields: Optional[List[tuple]] = None
+    discriminated = any(field.name == "fieldDiscriminator" for field in schema.fields)
+
+    def convert_record(value: Any, within_array: bool) -> Any:
+        nonlocal fields
+        if fields is None:
+            # Resolved lazily, since records may (indirectly) refer to themselves.
+            fields = [
+                (
+                    field.name,
+                    _get_converter(field.type),
+                    field.has_default,
+                    field.default,
+                )
+                for field in schema.fields
+            ]
+        inner: dict = value._inner_dict if hasattr(value, "_inner_dict") else value
+
+        if discriminated:
+            # Field discriminators are used for unions between primitive types.
+            field_name = inner["fieldDiscriminator"]
+            for name, convert, _, _ in fields:
+                if name == field_name:
+                    return {name: convert(inner.get(name), False)}
+
+        obj: dict = {}
+        for name, convert, has_default, default in fields:
+            if name in inner:
+                field_value = inner[name]
+                if field_value is None:
+                    continue
+                converted = convert(field_value, False)
+            elif has_default:
+                converted = default
+            else:
+                continue
+            if converted is not None:
+                obj[name] = converted
+        return obj
+
+    return convert_record
+
+
+def to_restli_obj(record: Any) -> Any:
+    """
+    Converts an avro-generated Python object straight into the json object that
+    the rest.li server expects, i.e. the equivalent of pre_json_transform(record.to_obj()).
+
+    Unlike to_obj, this walks the object only once, does not validate it against its
+    schema and does not build the intermediate avro json representation.
+    """
+    return _get_converter(type(record).RECORD_SCHEMA)(record, False)
+
+
+def json_dumps(obj: Any) -> str:
+    """Serializes a json object using orjson if it is installed, and the standard library otherwise."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson rejects some values the standard library handles, e.g. very large ints.
+            pass
+    return json.dumps(obj)
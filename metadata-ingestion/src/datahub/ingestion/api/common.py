@@ -49,12 +49,14 @@ class PipelineContext:
         pipeline_name: Optional[str] = None,
         dry_run: bool = False,
         preview_mode: bool = False,
+        transformer_state_dir: Optional[str] = None,
     ) -> None:
         self.run_id = run_id
         self.graph = DataHubGraph(datahub_api) if datahub_api is not None else None
         self.pipeline_name = pipeline_name
         self.dry_run_mode = dry_run
         self.preview_mode = preview_mode
+        self.transformer_state_dir = transformer_state_dir
         self.reporters: Dict[str, Committable] = dict()
         self.checkpointers: Dict[str, Committable] = dict()
         self._set_dataset_urn_to_lower_if_needed()
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Iterable
+from typing import Iterable, List
 
 from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
 
@@ -15,6 +15,20 @@ class Transformer:
         :return: 0 or more transformed records
         """
 
+    def prefetch(self, entity_urns: List[str]) -> None:
+        """
+        Called with the urns of the entities of upcoming records, before they are
+        transformed, so that transformers which look up the current state of these
+        entities on the server can fetch it in bulk. Does nothing by default.
+        :param entity_urns: the urns of the entities, in the order of the records
+        """
+
+    def close(self) -> None:
+        """
+        Called once the end of the stream has been transformed, to release what the
+        transformer holds on to. Does nothing by default.
+        """
+
     @classmethod
     @abstractmethod
     def create(cls, config_dict: dict, ctx: PipelineContext) -> "Transformer":
@@ -1,9 +1,14 @@
+import concurrent.futures
+import copy
 import json
 import logging
+import threading
+from collections import OrderedDict
 from json.decoder import JSONDecodeError
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
 from avro.schema import RecordSchema
+from avrogen.dict_wrapper import DictWrapper
 from deprecated import deprecated
 from requests.adapters import Response
 from requests.models import HTTPError
@@ -11,16 +16,21 @@ from requests.models import HTTPError
 from datahub.configuration.common import ConfigModel, OperationalError
 from datahub.emitter.mce_builder import Aspect
 from datahub.emitter.rest_emitter import DatahubRestEmitter
+from datahub.emitter.serialization_helper import post_json_transform
 from datahub.metadata.schema_classes import (
     DatasetUsageStatisticsClass,
     GlobalTagsClass,
     GlossaryTermsClass,
     OwnershipClass,
 )
+from datahub.utilities.file_compression import FileCompression
 from datahub.utilities.urns.urn import Urn
 
 logger = logging.getLogger(__name__)
 
+# Bounds the length of the urls of batch gets.
+_MAX_URNS_PER_BATCH_GET = 100
+
 
 class DatahubClientConfig(ConfigModel):
     """Configuration class for holding connectivity to datahub gms"""
@@ -33,6 +43,14 @@ class DatahubClientConfig(ConfigModel):
     extra_headers: Optional[Dict[str, str]]
     ca_certificate_path: Optional[str]
     max_threads: int = 1
+    # The number of prefetched aspects to keep, see DataHubGraph.prefetch_aspects.
+    aspect_cache_size: int = 10000
+    # Request payloads of at least compression_min_size_bytes are compressed, if
+    # the server advertises support for the compression in its config.
+    compression: Optional[FileCompression] = None
+    compression_min_size_bytes: int = (
+        DatahubRestEmitter.DEFAULT_COMPRESSION_MIN_SIZE_BYTES
+    )
 
 
 class DataHubGraph(DatahubRestEmitter):
@@ -47,7 +65,13 @@ class DataHubGraph(DatahubRestEmitter):
             retry_max_times=self.config.retry_max_times,
             extra_headers=self.config.extra_headers,
             ca_certificate_path=self.config.ca_certificate_path,
+            compression=self.config.compression,
+            compression_min_size_bytes=self.config.compression_min_size_bytes,
+        )
+        self._aspect_cache: "OrderedDict[Tuple[str, str], Optional[Aspect]]" = (
+            OrderedDict()
         )
+        self._aspect_cache_lock = threading.Lock()
         self.test_connection()
 
     def _get_generic(self, url: str) -> Dict:
@@ -70,8 +94,9 @@ class DataHubGraph(DatahubRestEmitter):
     def _post_generic(self, url: str, payload_dict: Dict) -> Dict:
         payload = json.dumps(payload_dict)
         logger.debug(payload)
+        data, headers = self._compress_payload(payload)
         try:
-            response: Response = self._session.post(url, payload)
+            response: Response = self._session.post(url, data, headers=headers)
             response.raise_for_status()
             return response.json()
         except HTTPError as e:
@@ -126,6 +151,9 @@ class DataHubGraph(DatahubRestEmitter):
         :rtype: Optional[Aspect]
         :raises HttpError: if the HTTP response is not a 200 or a 404
         """
+        found, cached_aspect = self._get_cached_aspect(entity_urn, aspect)
+        if found:
+            return cached_aspect
         url: str = f"{self._gms_server}/aspects/{Urn.url_encode(entity_urn)}?aspect={aspect}&version=0"
         response = self._session.get(url)
         if response.status_code == 404:
@@ -151,6 +179,137 @@ class DataHubGraph(DatahubRestEmitter):
                 f"Failed to find {aspect_type_name} in response {response_json}"
             )
 
+    def _get_cached_aspect(
+        self, entity_urn: str, aspect: str
+    ) -> Tuple[bool, Optional[Aspect]]:
+        with self._aspect_cache_lock:
+            key = (entity_urn, aspect)
+            if key not in self._aspect_cache:
+                return False, None
+            self._aspect_cache.move_to_end(key)
+            # Callers are free to modify the aspects they get.
+            return True, copy.deepcopy(self._aspect_cache[key])
+
+    def cache_aspect(
+        self, entity_urn: str, aspect: str, value: Optional[Aspect]
+    ) -> None:
+        """
+        Caches the value of an aspect, e.g. the value that a transformer with PATCH
+        semantics computed for it, so that later lookups see it rather than the value
+        that was prefetched.
+        """
+        if self.config.aspect_cache_size <= 0:
+            return
+        with self._aspect_cache_lock:
+            key = (entity_urn, aspect)
+            self._aspect_cache[key] = copy.deepcopy(value)
+            self._aspect_cache.move_to_end(key)
+            while len(self._aspect_cache) > self.config.aspect_cache_size:
+                self._aspect_cache.popitem(last=False)
+
+    def prefetch_aspects(
+        self, entity_urns: Iterable[str], aspect_type: Type[Aspect], aspect: str
+    ) -> None:
+        """
+        Fetches an aspect of several entities with batch gets and caches it, so that
+        get_aspect_v2 and the getters built on it, like get_ownership, do not need
+        to call the server for these entities. Entities which do not have the aspect
+        are cached as such. Aspects that are already cached are not fetched again.
+
+        :param Iterable[str] entity_urns: The urns of the entities
+        :param Type[Aspect] aspect_type: The type class of the aspect being requested
+        :param str aspect: The name of the aspect being requested (e.g. ownership)
+        """
+        if self.config.aspect_cache_size <= 0:
+            return
+        with self._aspect_cache_lock:
+            urns = [
+                urn
+                for urn in dict.fromkeys(entity_urns)
+                if (urn, aspect) not in self._aspect_cache
+            ]
+        # Fetching more than the cache holds would evict what was just fetched.
+        urns = urns[: self.config.aspect_cache_size]
+
+        for urn, value in self.batch_get_aspect(urns, aspect_type, aspect).items():
+            self.cache_aspect(urn, aspect, value)
+        logger.debug(f"Prefetched {aspect} of {len(urns)} entities")
+
+    def _batch_get_aspects_chunk(
+        self, entity_urns: List[str], aspect_types: Dict[str, Type[DictWrapper]]
+    ) -> Dict[str, Dict[str, Optional[DictWrapper]]]:
+        encoded_urns = ",".join(Urn.url_encode(urn) for urn in entity_urns)
+        response_json = self._get_generic(
+            f"{self._gms_server}/entitiesV2?ids=List({encoded_urns})&aspects=List({','.join(aspect_types)})"
+        )
+        results = response_json.get("results", {})
+        aspects_by_urn: Dict[str, Dict[str, Optional[DictWrapper]]] = {}
+        for urn in entity_urns:
+            aspects_json = results.get(urn, {}).get("aspects", {})
+            aspects_by_urn[urn] = {}
+            for aspect, aspect_type in aspect_types.items():
+                aspect_json = aspects_json.get(aspect)
+                aspects_by_urn[urn][aspect] = (
+                    aspect_type.from_obj(post_json_transform(aspect_json["value"]))
+                    if aspect_json
+                    else None
+                )
+        return aspects_by_urn
+
+    def batch_get_aspects(
+        self,
+        entity_urns: Iterable[str],
+        aspect_types: Dict[str, Type[DictWrapper]],
+    ) -> Dict[str, Dict[str, Optional[DictWrapper]]]:
+        """
+        Get several aspects of several entities, using batch gets of up to 100
+        entities each. If max_threads is more than 1, that many batch gets are made
+        concurrently; they share the connection pool of the session.
+
+        :param Iterable[str] entity_urns: The urns of the entities
+        :param Dict[str, Type[DictWrapper]] aspect_types: The type classes of the aspects being requested, by aspect name (e.g. {"ownership": OwnershipClass})
+        :return: the aspects by entity urn and aspect name, None for the aspects that an entity does not have, or for all aspects of an entity that does not exist
+        :rtype: Dict[str, Dict[str, Optional[DictWrapper]]]
+        :raises OperationalError: if any of the batch gets fails
+        """
+        urns = list(dict.fromkeys(entity_urns))
+        chunks = [
+            urns[i : i + _MAX_URNS_PER_BATCH_GET]
+            for i in range(0, len(urns), _MAX_URNS_PER_BATCH_GET)
+        ]
+        aspects_by_urn: Dict[str, Dict[str, Optional[DictWrapper]]] = {}
+        if self.config.max_threads > 1 and len(chunks) > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(self.config.max_threads, len(chunks))
+            ) as executor:
+                for chunk_aspects in executor.map(
+                    lambda chunk: self._batch_get_aspects_chunk(chunk, aspect_types),
+                    chunks,
+                ):
+                    aspects_by_urn.update(chunk_aspects)
+        else:
+            for chunk in chunks:
+                aspects_by_urn.update(
+                    self._batch_get_aspects_chunk(chunk, aspect_types)
+                )
+        return aspects_by_urn
+
+    def batch_get_aspect(
+        self, entity_urns: Iterable[str], aspect_type: Type[Aspect], aspect: str
+    ) -> Dict[str, Optional[Aspect]]:
+        """
+        Get an aspect of several entities, see batch_get_aspects.
+
+        :return: the aspects by entity urn, None for the entities that do not have the aspect
+        :rtype: Dict[str, Optional[Aspect]]
+        """
+        return {
+            urn: aspects[aspect]  # type: ignore
+            for urn, aspects in self.batch_get_aspects(
+                entity_urns, {aspect: aspect_type}
+            ).items()
+        }
+
     def get_config(self) -> Dict[str, Any]:
         return self._get_generic(f"{self.config.server}/config")
 
@@ -175,6 +334,27 @@ class DataHubGraph(DatahubRestEmitter):
             aspect_type=GlossaryTermsClass,
         )
 
+    def batch_get_ownership(
+        self, entity_urns: Iterable[str]
+    ) -> Dict[str, Optional[OwnershipClass]]:
+        return self.batch_get_aspect(
+            entity_urns, aspect_type=OwnershipClass, aspect="ownership"
+        )
+
+    def batch_get_tags(
+        self, entity_urns: Iterable[str]
+    ) -> Dict[str, Optional[GlobalTagsClass]]:
+        return self.batch_get_aspect(
+            entity_urns, aspect_type=GlobalTagsClass, aspect="globalTags"
+        )
+
+    def batch_get_glossary_terms(
+        self, entity_urns: Iterable[str]
+    ) -> Dict[str, Optional[GlossaryTermsClass]]:
+        return self.batch_get_aspect(
+            entity_urns, aspect_type=GlossaryTermsClass, aspect="glossaryTerms"
+        )
+
     def get_usage_aspects_from_urn(
         self, entity_urn: str, start_timestamp: int, end_timestamp: int
     ) -> Optional[List[DatasetUsageStatisticsClass]]:
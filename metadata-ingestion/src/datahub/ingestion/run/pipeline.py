@@ -1,9 +1,12 @@
 import datetime
+import functools
 import itertools
 import logging
+import queue
+import threading
 import uuid
 from math import log10
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 import click
 from pydantic import root_validator, validator
@@ -15,10 +18,16 @@ from datahub.configuration.common import (
     PipelineExecutionError,
 )
 from datahub.ingestion.api.committable import CommitPolicy
-from datahub.ingestion.api.common import EndOfStream, PipelineContext, RecordEnvelope
+from datahub.ingestion.api.common import (
+    EndOfStream,
+    PipelineContext,
+    RecordEnvelope,
+    WorkUnit,
+)
 from datahub.ingestion.api.sink import Sink, WriteCallback
 from datahub.ingestion.api.source import Extractor, Source
 from datahub.ingestion.api.transform import Transformer
+from datahub.ingestion.api.workunit import MetadataWorkUnit
 from datahub.ingestion.extractor.extractor_registry import extractor_registry
 from datahub.ingestion.graph.client import DatahubClientConfig
 from datahub.ingestion.reporting.reporting_provider_registry import (
@@ -27,6 +36,7 @@ from datahub.ingestion.reporting.reporting_provider_registry import (
 from datahub.ingestion.sink.sink_registry import sink_registry
 from datahub.ingestion.source.source_registry import source_registry
 from datahub.ingestion.transformer.transform_registry import transform_registry
+from datahub.metadata.schema_classes import MetadataChangeEventClass
 from datahub.telemetry import telemetry
 
 logger = logging.getLogger(__name__)
@@ -48,6 +58,17 @@ class PipelineConfig(ConfigModel):
     run_id: str = "__DEFAULT_RUN_ID"
     datahub_api: Optional[DatahubClientConfig] = None
     pipeline_name: Optional[str] = None
+    # Experimental: run the source, the transformers and the sink in separate
+    # threads connected by bounded queues, so that extraction and emission overlap.
+    pipelined_execution: bool = False
+    pipelined_queue_size: int = 1000
+    # The number of workunits whose entities transformers get to prefetch at once,
+    # e.g. to look up their current aspects in bulk for PATCH semantics. Workunits
+    # are only read ahead if some transformer implements prefetch.
+    transformer_prefetch_window: int = 100
+    # If set, transformers keep the state of the entities they have seen in a
+    # SQLite database in this directory, rather than in memory.
+    transformer_state_dir: Optional[str] = None
 
     @validator("run_id", pre=True, always=True)
     def run_id_should_be_semantic(
@@ -96,6 +117,52 @@ class PipelineConfig(ConfigModel):
         return v
 
 
+# Markers passed through the queues of the pipelined execution mode.
+_END_OF_STAGE = object()
+_WORKUNIT_START = "workunit_start"
+_RECORD = "record"
+_WORKUNIT_END = "workunit_end"
+
+
+class _PipelineStages:
+    """
+    The queues connecting the stages of a pipelined run, and the means to stop
+    all of them once one fails.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.stop = threading.Event()
+        self.errors: List[BaseException] = []
+        self.workunits: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.records: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+
+    def put(self, q: "queue.Queue[Any]", item: Any) -> bool:
+        """Returns False, without putting the item, if the run is stopped."""
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(self, q: "queue.Queue[Any]") -> Any:
+        """Returns _END_OF_STAGE if the run is stopped and nothing is left."""
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop.is_set():
+                    return _END_OF_STAGE
+
+    def run(self, stage: Callable[[], None]) -> None:
+        try:
+            stage()
+        except BaseException as e:
+            self.errors.append(e)
+            self.stop.set()
+
+
 class LoggingCallback(WriteCallback):
     def on_success(
         self, record_envelope: RecordEnvelope, success_metadata: dict
@@ -138,6 +205,7 @@ class Pipeline:
             pipeline_name=self.config.pipeline_name,
             dry_run=dry_run,
             preview_mode=preview_mode,
+            transformer_state_dir=self.config.transformer_state_dir,
         )
 
         sink_type = self.config.sink.type
@@ -207,29 +275,65 @@ class Pipeline:
             preview_workunits=preview_workunits,
         )
 
-    def run(self) -> None:
-
-        callback = LoggingCallback()
-        extractor: Extractor = self.extractor_class()
-        for wu in itertools.islice(
+    def _get_workunits(self) -> Iterable[WorkUnit]:
+        workunits = itertools.islice(
             self.source.get_workunits(),
             self.preview_workunits if self.preview_mode else None,
+        )
+        if self.config.transformer_prefetch_window > 1 and any(
+            type(transformer).prefetch is not Transformer.prefetch
+            for transformer in self.transformers
         ):
-            # TODO: change extractor interface
-            extractor.configure({}, self.ctx)
+            return self._prefetch_for_transformers(workunits)
+        return workunits
 
-            if not self.dry_run:
-                self.sink.handle_work_unit_start(wu)
+    def _prefetch_for_transformers(
+        self, workunits: Iterable[WorkUnit]
+    ) -> Iterable[WorkUnit]:
+        """
+        Reads workunits ahead in windows and lets the transformers prefetch what they
+        need for the entities in each window before its workunits are transformed.
+        """
+        window: List[WorkUnit] = []
+        for wu in workunits:
+            window.append(wu)
+            if len(window) >= self.config.transformer_prefetch_window:
+                self._prefetch_window(window)
+                yield from window
+                window = []
+        if window:
+            self._prefetch_window(window)
+            yield from window
+
+    def _prefetch_window(self, window: List[WorkUnit]) -> None:
+        entity_urns: List[str] = []
+        for wu in window:
+            if not isinstance(wu, MetadataWorkUnit):
+                continue
+            urn = (
+                wu.metadata.proposedSnapshot.urn
+                if isinstance(wu.metadata, MetadataChangeEventClass)
+                else wu.metadata.entityUrn
+            )
+            if urn:
+                entity_urns.append(urn)
+        if not entity_urns:
+            return
+        for transformer in self.transformers:
             try:
-                record_envelopes = extractor.get_records(wu)
-                for record_envelope in self.transform(record_envelopes):
-                    if not self.dry_run:
-                        self.sink.write_record_async(record_envelope, callback)
+                transformer.prefetch(entity_urns)
             except Exception as e:
-                logger.error(f"Failed to extract some records due to: {e}")
-            extractor.close()
-            if not self.dry_run:
-                self.sink.handle_work_unit_end(wu)
+                # Prefetching is an optimization: the transformer can still look
+                # the entities up one at a time.
+                logger.warning(f"Failed to prefetch for transformer {transformer}: {e}")
+
+    def run(self) -> None:
+
+        callback = LoggingCallback()
+        if self.config.pipelined_execution:
+            self._run_pipelined(callback)
+        else:
+            self._run_sequential(callback)
         self.source.close()
         # no more data is coming, we need to let the transformers produce any additional records if they are holding on to state
         for record_envelope in self.transform(
@@ -242,10 +346,122 @@ class Pipeline:
             if not self.dry_run and not isinstance(record_envelope.record, EndOfStream):
                 # TODO: propagate EndOfStream and other control events to sinks, to allow them to flush etc.
                 self.sink.write_record_async(record_envelope, callback)
+        for transformer in self.transformers:
+            transformer.close()
 
         self.sink.close()
         self.process_commits()
 
+    def _run_sequential(self, callback: WriteCallback) -> None:
+        extractor: Extractor = self.extractor_class()
+        for wu in self._get_workunits():
+            # TODO: change extractor interface
+            extractor.configure({}, self.ctx)
+
+            if not self.dry_run:
+                self.sink.handle_work_unit_start(wu)
+            try:
+                record_envelopes = extractor.get_records(wu)
+                for record_envelope in self.transform(record_envelopes):
+                    if not self.dry_run:
+                        self.sink.write_record_async(record_envelope, callback)
+            except Exception as e:
+                logger.error(f"Failed to extract some records due to: {e}")
+            extractor.close()
+            if not self.dry_run:
+                self.sink.handle_work_unit_end(wu)
+
+    def _run_pipelined(self, callback: WriteCallback) -> None:
+        """
+        Runs the source, the extractor + transformer chain and the sink as three
+        stages connected by bounded queues. A full queue blocks the stage that
+        feeds it, so a slow sink applies backpressure all the way up to the source.
+
+        The transformer chain runs on a single thread and the sink consumes its
+        output in order, so workunits and their records reach the sink in exactly
+        the order the sequential mode would produce them.
+        """
+        stages = _PipelineStages(self.config.pipelined_queue_size)
+        threads = [
+            threading.Thread(
+                target=stages.run,
+                args=(functools.partial(stage, stages),),
+                name=f"pipeline-{name}",
+                daemon=True,
+            )
+            for name, stage in [
+                ("source", self._source_stage),
+                ("transform", self._transform_stage),
+            ]
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._sink_stage(stages, callback)
+        finally:
+            # The stages are done by now unless something failed, in which case
+            # this unblocks whatever is left.
+            stages.stop.set()
+            for thread in threads:
+                thread.join()
+
+        if stages.errors:
+            raise stages.errors[0]
+
+    def _source_stage(self, stages: _PipelineStages) -> None:
+        try:
+            for wu in self._get_workunits():
+                if not stages.put(stages.workunits, wu):
+                    return
+        finally:
+            stages.put(stages.workunits, _END_OF_STAGE)
+
+    def _transform_stage(self, stages: _PipelineStages) -> None:
+        extractor: Extractor = self.extractor_class()
+        try:
+            while True:
+                wu = stages.get(stages.workunits)
+                if wu is _END_OF_STAGE or not self._transform_workunit(
+                    stages, extractor, wu
+                ):
+                    return
+        finally:
+            stages.put(stages.records, _END_OF_STAGE)
+
+    def _transform_workunit(
+        self, stages: _PipelineStages, extractor: Extractor, wu: WorkUnit
+    ) -> bool:
+        """Returns False if the run was stopped meanwhile."""
+        # TODO: change extractor interface
+        extractor.configure({}, self.ctx)
+        if not stages.put(stages.records, (_WORKUNIT_START, wu)):
+            return False
+        try:
+            record_envelopes = extractor.get_records(wu)
+            for record_envelope in self.transform(record_envelopes):
+                if not stages.put(stages.records, (_RECORD, record_envelope)):
+                    return False
+        except Exception as e:
+            logger.error(f"Failed to extract some records due to: {e}")
+        extractor.close()
+        return stages.put(stages.records, (_WORKUNIT_END, wu))
+
+    def _sink_stage(self, stages: _PipelineStages, callback: WriteCallback) -> None:
+        while True:
+            entry = stages.get(stages.records)
+            if entry is _END_OF_STAGE:
+                return
+            kind, item = entry
+            if self.dry_run:
+                continue
+            if kind == _WORKUNIT_START:
+                self.sink.handle_work_unit_start(item)
+            elif kind == _RECORD:
+                self.sink.write_record_async(item, callback)
+            elif kind == _WORKUNIT_END:
+                self.sink.handle_work_unit_end(item)
+
     def transform(self, records: Iterable[RecordEnvelope]) -> Iterable[RecordEnvelope]:
         """
         Transforms the given sequence of records by passing the records through the transformers
@@ -1,8 +1,13 @@
 import concurrent.futures
+import datetime
 import functools
 import logging
+import threading
+import time
 from dataclasses import dataclass
-from typing import Union, cast
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union, cast
+
+from requests.exceptions import HTTPError
 
 from datahub.cli.cli_utils import set_env_variables_override_config
 from datahub.configuration.common import ConfigurationError, OperationalError
@@ -23,18 +28,39 @@ logger = logging.getLogger(__name__)
 
 
 class DatahubRestSinkConfig(DatahubClientConfig):
-    pass
+    # Setting batch_size above 1 turns on batched ingestion of MCEs and usage
+    # aggregations; MCPs are always sent one request per record. A batch holding
+    # an MCE of the entity an MCP is about is sent off before the MCP, so with
+    # max_threads set to 1 records of an entity are written in order.
+    batch_size: int = 1
+    batch_max_wait_sec: float = 1.0
+    # write_record_async blocks once this many records are waiting to be written,
+    # or once their serialized payloads add up to max_pending_bytes.
+    max_pending_requests: int = 2000
+    max_pending_bytes: Optional[int] = None
 
 
 @dataclass
 class DataHubRestSinkReport(SinkReport):
     gms_version: str = ""
+    batches_written: int = 0
+    batch_fallbacks: int = 0
+    pending_requests_high_water_mark: int = 0
+    pending_bytes_high_water_mark: int = 0
+    time_blocked_on_pending_requests_sec: float = 0.0
 
 
-@dataclass
-class DatahubRestSink(Sink):
+# Status codes GMS returns when it does not know about a batch endpoint.
+_BATCH_UNSUPPORTED_STATUS_CODES = {400, 404, 405}
+
+
+class DatahubRestSinkBase(Sink):
+    """
+    What the REST sinks have in common: connecting to GMS, reporting the outcome
+    of writes, and bounding the number of records waiting to be written.
+    """
+
     config: DatahubRestSinkConfig
-    emitter: DatahubRestEmitter
     report: DataHubRestSinkReport
     treat_errors_as_warnings: bool = False
 
@@ -42,18 +68,16 @@ class DatahubRestSink(Sink):
         super().__init__(ctx)
         self.config = config
         self.report = DataHubRestSinkReport()
-        self.emitter = DatahubRestEmitter(
-            self.config.server,
-            self.config.token,
-            connect_timeout_sec=self.config.timeout_sec,  # reuse timeout_sec for connect timeout
-            read_timeout_sec=self.config.timeout_sec,
-            retry_status_codes=self.config.retry_status_codes,
-            retry_max_times=self.config.retry_max_times,
-            extra_headers=self.config.extra_headers,
-            ca_certificate_path=self.config.ca_certificate_path,
-        )
+        # Writes complete, and are reported, on other threads.
+        self._report_lock = threading.Lock()
+
+        self._pending_cond = threading.Condition()
+        self._pending_requests = 0
+        self._pending_bytes = 0
+
+    def _connect(self, test_connection: Callable[[], dict]) -> None:
         try:
-            gms_config = self.emitter.test_connection()
+            gms_config = test_connection()
         except Exception as exc:
             raise ConfigurationError(
                 f"💥 Failed to connect to DataHub@{self.config.server} (token:{'XXX-redacted' if self.config.token else 'empty'}) over REST",
@@ -69,14 +93,6 @@ class DatahubRestSink(Sink):
         set_env_variables_override_config(self.config.server, self.config.token)
         logger.debug("Setting gms config")
         set_gms_config(gms_config)
-        self.executor = concurrent.futures.ThreadPoolExecutor(
-            max_workers=self.config.max_threads
-        )
-
-    @classmethod
-    def create(cls, config_dict: dict, ctx: PipelineContext) -> "DatahubRestSink":
-        config = DatahubRestSinkConfig.parse_obj(config_dict)
-        return cls(ctx, config)
 
     def handle_work_unit_start(self, workunit: WorkUnit) -> None:
         if isinstance(workunit, MetadataWorkUnit):
@@ -93,21 +109,24 @@ class DatahubRestSink(Sink):
         future: concurrent.futures.Future,
     ) -> None:
         if future.cancelled():
-            self.report.report_failure({"error": "future was cancelled"})
+            with self._report_lock:
+                self.report.report_failure({"error": "future was cancelled"})
             write_callback.on_failure(
                 record_envelope, OperationalError("future was cancelled"), {}
             )
         elif future.done():
             e = future.exception()
             if not e:
-                self.report.report_record_written(record_envelope)
                 start_time, end_time = future.result()
-                self.report.report_downstream_latency(start_time, end_time)
+                with self._report_lock:
+                    self.report.report_record_written(record_envelope)
+                    self.report.report_downstream_latency(start_time, end_time)
                 write_callback.on_success(record_envelope, {})
             elif isinstance(e, OperationalError):
                 # only OperationalErrors should be ignored
                 if not self.treat_errors_as_warnings:
-                    self.report.report_failure({"error": e.message, "info": e.info})
+                    with self._report_lock:
+                        self.report.report_failure({"error": e.message, "info": e.info})
                 else:
                     # trim exception stacktraces when reporting warnings
                     if "stackTrace" in e.info:
@@ -127,12 +146,124 @@ class DatahubRestSink(Sink):
                         e.info["id"] = entity_id
                     else:
                         entity_id = None
-                    self.report.report_warning({"warning": e.message, "info": e.info})
+                    with self._report_lock:
+                        self.report.report_warning(
+                            {"warning": e.message, "info": e.info}
+                        )
                 write_callback.on_failure(record_envelope, e, e.info)
             else:
-                self.report.report_failure({"e": e})
+                with self._report_lock:
+                    self.report.report_failure({"e": e})
                 write_callback.on_failure(record_envelope, Exception(e), {})
 
+    def _has_pending_capacity(self, payload_size: int) -> bool:
+        if self._pending_requests == 0:
+            # Always let a single record through, however large it is.
+            return True
+        if self._pending_requests >= self.config.max_pending_requests:
+            return False
+        if (
+            self.config.max_pending_bytes
+            and self._pending_bytes + payload_size > self.config.max_pending_bytes
+        ):
+            return False
+        return True
+
+    def _acquire_pending(self, payload_size: int) -> None:
+        with self._pending_cond:
+            if not self._has_pending_capacity(payload_size):
+                # Records sitting in a partially filled batch count as pending,
+                # so send them off rather than waiting for the batch to fill up.
+                self._flush_all_batches()
+                blocked_start = time.time()
+                while not self._has_pending_capacity(payload_size):
+                    self._pending_cond.wait()
+                self.report.time_blocked_on_pending_requests_sec += (
+                    time.time() - blocked_start
+                )
+            self._pending_requests += 1
+            self._pending_bytes += payload_size
+            self.report.pending_requests_high_water_mark = max(
+                self.report.pending_requests_high_water_mark, self._pending_requests
+            )
+            self.report.pending_bytes_high_water_mark = max(
+                self.report.pending_bytes_high_water_mark, self._pending_bytes
+            )
+
+    def _release_pending(self, num_requests: int, payload_size: int) -> None:
+        with self._pending_cond:
+            self._pending_requests -= num_requests
+            self._pending_bytes -= payload_size
+            self._pending_cond.notify_all()
+
+    def _pending_request_done(
+        self, payload_size: int, future: concurrent.futures.Future
+    ) -> None:
+        self._release_pending(1, payload_size)
+
+    def _flush_all_batches(self) -> None:
+        """Sends off the records held back in partially filled batches, if any."""
+        pass
+
+    def _wait_for_pending(self) -> None:
+        with self._pending_cond:
+            while self._pending_requests > 0:
+                self._pending_cond.wait()
+
+    def get_report(self) -> SinkReport:
+        return self.report
+
+
+@dataclass
+class DatahubRestSink(DatahubRestSinkBase):
+    config: DatahubRestSinkConfig
+    emitter: DatahubRestEmitter
+    report: DataHubRestSinkReport
+    treat_errors_as_warnings: bool = False
+
+    def __init__(self, ctx: PipelineContext, config: DatahubRestSinkConfig):
+        super().__init__(ctx, config)
+        self.emitter = DatahubRestEmitter(
+            self.config.server,
+            self.config.token,
+            connect_timeout_sec=self.config.timeout_sec,  # reuse timeout_sec for connect timeout
+            read_timeout_sec=self.config.timeout_sec,
+            retry_status_codes=self.config.retry_status_codes,
+            retry_max_times=self.config.retry_max_times,
+            extra_headers=self.config.extra_headers,
+            ca_certificate_path=self.config.ca_certificate_path,
+            compression=self.config.compression,
+            compression_min_size_bytes=self.config.compression_min_size_bytes,
+        )
+        self._connect(self.emitter.test_connection)
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.config.max_threads
+        )
+
+        self._batch_lock = threading.Lock()
+        self._pending_batches: Dict[
+            str, List[Tuple[RecordEnvelope, WriteCallback]]
+        ] = {}
+        self._pending_batch_start: Dict[str, float] = {}
+        self._pending_batch_bytes: Dict[str, int] = {}
+        # The urns of the entities of the MCEs waiting in a batch.
+        self._pending_batch_urns: Set[str] = set()
+        self._batch_supported: Dict[str, bool] = {}
+        self._batch_flusher_stop = threading.Event()
+        self._batch_flusher: Optional[threading.Thread] = None
+        if self.config.batch_size > 1:
+            self._batch_flusher = threading.Thread(
+                target=self._flush_stale_batches_loop,
+                name="datahub-rest-batch-flusher",
+                daemon=True,
+            )
+            self._batch_flusher.start()
+
+    @classmethod
+    def create(cls, config_dict: dict, ctx: PipelineContext) -> "DatahubRestSink":
+        config = DatahubRestSinkConfig.parse_obj(config_dict)
+        return cls(ctx, config)
+
     def write_record_async(
         self,
         record_envelope: RecordEnvelope[
@@ -147,15 +278,181 @@ class DatahubRestSink(Sink):
     ) -> None:
         record = record_envelope.record
 
-        write_future = self.executor.submit(self.emitter.emit, record)
+        batch_kind = self._get_batch_kind(record)
+        if batch_kind is not None:
+            # A batch's payload is about the size of its records' own payloads.
+            payload_size = (
+                len(self.emitter.serialize(record)[1])
+                if self.config.max_pending_bytes
+                else 0
+            )
+            self._acquire_pending(payload_size)
+            self._add_to_batch(
+                batch_kind, record_envelope, write_callback, payload_size
+            )
+            return
+        if self.config.batch_size > 1:
+            self._flush_batch_of_entity(record)
+
+        if self.config.max_pending_bytes:
+            # Serialize up front so that the payload size is known before queueing.
+            url, payload = self.emitter.serialize(record)
+            payload_size = len(payload)
+            self._acquire_pending(payload_size)
+            write_future = self.executor.submit(
+                self.emitter.emit_serialized, url, payload
+            )
+        else:
+            payload_size = 0
+            self._acquire_pending(payload_size)
+            write_future = self.executor.submit(self.emitter.emit, record)
         write_future.add_done_callback(
             functools.partial(
                 self._write_done_callback, record_envelope, write_callback
             )
         )
+        write_future.add_done_callback(
+            functools.partial(self._pending_request_done, payload_size)
+        )
 
-    def get_report(self) -> SinkReport:
-        return self.report
+    def _flush_batch_of_entity(self, record: object) -> None:
+        # An MCP must not overtake a batched MCE of the same entity, or the MCE
+        # would overwrite the aspect the MCP sets once its batch is written.
+        urn = getattr(record, "entityUrn", None)
+        with self._batch_lock:
+            if self._pending_batches.get("mce") and (
+                urn is None or urn in self._pending_batch_urns
+            ):
+                self._submit_batch("mce")
+
+    def _get_batch_kind(self, record: object) -> Optional[str]:
+        if self.config.batch_size <= 1:
+            return None
+        if isinstance(record, MetadataChangeEvent):
+            kind = "mce"
+        elif isinstance(record, UsageAggregation):
+            kind = "usage"
+        else:
+            # There is no batch endpoint for MCPs.
+            return None
+        if not self._batch_supported.get(kind, True):
+            return None
+        return kind
+
+    def _add_to_batch(
+        self,
+        batch_kind: str,
+        record_envelope: RecordEnvelope,
+        write_callback: WriteCallback,
+        payload_size: int,
+    ) -> None:
+        with self._batch_lock:
+            batch = self._pending_batches.setdefault(batch_kind, [])
+            if not batch:
+                self._pending_batch_start[batch_kind] = time.time()
+            batch.append((record_envelope, write_callback))
+            self._pending_batch_bytes[batch_kind] = (
+                self._pending_batch_bytes.get(batch_kind, 0) + payload_size
+            )
+            if batch_kind == "mce":
+                self._pending_batch_urns.add(
+                    record_envelope.record.proposedSnapshot.urn
+                )
+            if len(batch) >= self.config.batch_size:
+                self._submit_batch(batch_kind)
+
+    def _submit_batch(self, batch_kind: str) -> None:
+        # Must be called with self._batch_lock held.
+        batch = self._pending_batches.pop(batch_kind, [])
+        self._pending_batch_start.pop(batch_kind, None)
+        payload_size = self._pending_batch_bytes.pop(batch_kind, 0)
+        if batch_kind == "mce":
+            self._pending_batch_urns.clear()
+        if not batch:
+            return
+        emit_batch: Callable[[list], None] = (
+            self.emitter.emit_mces if batch_kind == "mce" else self.emitter.emit_usages
+        )
+        self.executor.submit(
+            self._emit_batch, batch_kind, emit_batch, batch, payload_size
+        )
+
+    def _flush_stale_batches_loop(self) -> None:
+        while not self._batch_flusher_stop.wait(self.config.batch_max_wait_sec / 2):
+            now = time.time()
+            with self._batch_lock:
+                for batch_kind, batch_start in list(self._pending_batch_start.items()):
+                    if now - batch_start >= self.config.batch_max_wait_sec:
+                        self._submit_batch(batch_kind)
+
+    def _flush_all_batches(self) -> None:
+        with self._batch_lock:
+            for batch_kind in list(self._pending_batches.keys()):
+                self._submit_batch(batch_kind)
+
+    def _emit_batch(
+        self,
+        batch_kind: str,
+        emit_batch: Callable[[list], None],
+        batch: List[Tuple[RecordEnvelope, WriteCallback]],
+        payload_size: int,
+    ) -> None:
+        try:
+            self._emit_batch_records(batch_kind, emit_batch, batch)
+        finally:
+            self._release_pending(len(batch), payload_size)
+
+    def _emit_batch_records(
+        self,
+        batch_kind: str,
+        emit_batch: Callable[[list], None],
+        batch: List[Tuple[RecordEnvelope, WriteCallback]],
+    ) -> None:
+        start_time = datetime.datetime.now()
+        try:
+            emit_batch([record_envelope.record for record_envelope, _ in batch])
+        except Exception as e:
+            # The batch endpoints are all-or-nothing, so re-send each record on
+            # its own to find out which ones actually failed.
+            logger.debug(
+                f"Failed to emit batch of {len(batch)} {batch_kind} records, falling back to per-record requests: {e}"
+            )
+            with self._report_lock:
+                self.report.batch_fallbacks += 1
+            all_succeeded = True
+            for record_envelope, write_callback in batch:
+                future: concurrent.futures.Future = concurrent.futures.Future()
+                try:
+                    future.set_result(self.emitter.emit(record_envelope.record))
+                except Exception as record_exc:
+                    all_succeeded = False
+                    future.set_exception(record_exc)
+                self._write_done_callback(record_envelope, write_callback, future)
+
+            cause = e.__cause__
+            if (
+                all_succeeded
+                and isinstance(cause, HTTPError)
+                and cause.response is not None
+                and cause.response.status_code in _BATCH_UNSUPPORTED_STATUS_CODES
+            ):
+                logger.warning(
+                    f"DataHub GMS does not seem to support batch ingestion of {batch_kind} records, disabling batching for them"
+                )
+                self._batch_supported[batch_kind] = False
+            return
+
+        end_time = datetime.datetime.now()
+        with self._report_lock:
+            self.report.batches_written += 1
+        for record_envelope, write_callback in batch:
+            future = concurrent.futures.Future()
+            future.set_result((start_time, end_time))
+            self._write_done_callback(record_envelope, write_callback, future)
 
     def close(self):
+        if self._batch_flusher is not None:
+            self._batch_flusher_stop.set()
+            self._batch_flusher.join()
+        self._flush_all_batches()
         self.executor.shutdown(wait=True)
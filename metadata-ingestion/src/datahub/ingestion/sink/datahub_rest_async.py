@@ -0,0 +1,124 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+from typing import Any, Coroutine, TypeVar, Union
+
+import pydantic
+
+from datahub.emitter.async_rest_emitter import DataHubAsyncRestEmitter
+from datahub.emitter.mcp import MetadataChangeProposalWrapper
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import WriteCallback
+from datahub.ingestion.sink.datahub_rest import (
+    DatahubRestSinkBase,
+    DatahubRestSinkConfig,
+)
+from datahub.metadata.com.linkedin.pegasus2avro.mxe import (
+    MetadataChangeEvent,
+    MetadataChangeProposal,
+)
+from datahub.metadata.com.linkedin.pegasus2avro.usage import UsageAggregation
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DatahubRestAsyncSinkConfig(DatahubRestSinkConfig):
+    # Up to max_pending_requests records are in flight at once, sent over at most
+    # this many keep-alive connections.
+    max_connections: int = DataHubAsyncRestEmitter.DEFAULT_MAX_CONNECTIONS
+
+    @pydantic.validator("batch_size")
+    def batch_size_not_supported(cls, v: int) -> int:
+        if v != 1:
+            raise ValueError(
+                "batch_size is not supported by the datahub-rest-async sink"
+            )
+        return v
+
+
+class DatahubRestAsyncSink(DatahubRestSinkBase):
+    """
+    Writes records with the asyncio REST emitter, from an event loop running in a
+    background thread. Rather than being limited by max_threads, the number of
+    requests in flight is bounded by max_pending_requests.
+    """
+
+    config: DatahubRestAsyncSinkConfig
+
+    def __init__(self, ctx: PipelineContext, config: DatahubRestAsyncSinkConfig):
+        super().__init__(ctx, config)
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="datahub-rest-async-loop", daemon=True
+        )
+        self._loop_thread.start()
+
+        self.async_emitter = DataHubAsyncRestEmitter(
+            self.config.server,
+            self.config.token,
+            connect_timeout_sec=self.config.timeout_sec,  # reuse timeout_sec for connect timeout
+            read_timeout_sec=self.config.timeout_sec,
+            retry_status_codes=self.config.retry_status_codes,
+            retry_max_times=self.config.retry_max_times,
+            extra_headers=self.config.extra_headers,
+            ca_certificate_path=self.config.ca_certificate_path,
+            compression=self.config.compression,
+            compression_min_size_bytes=self.config.compression_min_size_bytes,
+            max_connections=self.config.max_connections,
+        )
+        try:
+            self._connect(lambda: self._run(self.async_emitter.test_connection()))
+        except Exception:
+            self._stop_loop()
+            raise
+
+    @classmethod
+    def create(cls, config_dict: dict, ctx: PipelineContext) -> "DatahubRestAsyncSink":
+        config = DatahubRestAsyncSinkConfig.parse_obj(config_dict)
+        return cls(ctx, config)
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop_loop(self) -> None:
+        self._run(self.async_emitter.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+
+    def write_record_async(
+        self,
+        record_envelope: RecordEnvelope[
+            Union[
+                MetadataChangeEvent,
+                MetadataChangeProposal,
+                MetadataChangeProposalWrapper,
+                UsageAggregation,
+            ]
+        ],
+        write_callback: WriteCallback,
+    ) -> None:
+        # Serializing here keeps the CPU-bound work off the event loop.
+        url, payload = self.async_emitter.serialize(record_envelope.record)
+        payload_size = len(payload) if self.config.max_pending_bytes else 0
+        self._acquire_pending(payload_size)
+        write_future: concurrent.futures.Future = asyncio.run_coroutine_threadsafe(
+            self.async_emitter.emit_serialized(url, payload), self._loop
+        )
+        write_future.add_done_callback(
+            functools.partial(
+                self._write_done_callback, record_envelope, write_callback
+            )
+        )
+        write_future.add_done_callback(
+            functools.partial(self._pending_request_done, payload_size)
+        )
+
+    def close(self):
+        self._wait_for_pending()
+        self._stop_loop()
@@ -1,10 +1,16 @@
+import enum
 import json
 import logging
+import os
 import pathlib
-from typing import Union
+from typing import IO, Optional, Union
+
+import pydantic
+from pydantic.fields import Field
 
 from datahub.configuration.common import ConfigModel
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
+from datahub.emitter.serialization_helper import json_dumps
 from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
 from datahub.ingestion.api.sink import Sink, SinkReport, WriteCallback
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import (
@@ -12,12 +18,63 @@ from datahub.metadata.com.linkedin.pegasus2avro.mxe import (
     MetadataChangeProposal,
 )
 from datahub.metadata.com.linkedin.pegasus2avro.usage import UsageAggregation
+from datahub.utilities.file_compression import FileCompression, wrap_for_writing
 
 logger = logging.getLogger(__name__)
 
 
+class FileSinkFormat(str, enum.Enum):
+    JSON = "json"
+    JSONL = "jsonl"
+
+
 class FileSinkConfig(ConfigModel):
     filename: str
+    format: FileSinkFormat = Field(
+        default=FileSinkFormat.JSON,
+        description="Either json, to write a single, pretty-printed JSON array, or jsonl, to write one compact JSON record per line. Records written in the jsonl format are flushed as they are written, so the file can be read back even if the run did not complete.",
+    )
+    compression: Optional[FileCompression] = Field(
+        default=None,
+        description="Compress the output with gzip or zstd. Only supported with the jsonl format.",
+    )
+    max_file_size_bytes: Optional[pydantic.PositiveInt] = Field(
+        default=None,
+        description="Start writing to a new file once this many bytes of records (before compression) were written to the current one. The n-th new file is named like the filename, with .n inserted before its extensions. Only supported with the jsonl format.",
+    )
+    fsync: bool = Field(
+        default=False,
+        description="Sync every record to disk as it is written, so that it survives a machine crash. Only supported with the jsonl format.",
+    )
+
+    @pydantic.root_validator()
+    def jsonl_options_require_jsonl_format(cls, values: dict) -> dict:
+        if values.get("format") != FileSinkFormat.JSONL:
+            for option in ["compression", "max_file_size_bytes", "fsync"]:
+                if values.get(option):
+                    raise ValueError(f"{option} requires the jsonl format")
+        return values
+
+
+class _JsonLinesFile:
+    def __init__(self, path: pathlib.Path, config: FileSinkConfig):
+        self.config = config
+        self.file: IO[bytes] = path.open("wb")
+        self.stream: IO[bytes] = self.file
+        if config.compression:
+            self.stream = wrap_for_writing(self.file, config.compression)
+        self.bytes_written = 0
+
+    def write(self, line: bytes) -> None:
+        self.stream.write(line)
+        self.stream.flush()
+        if self.config.fsync:
+            os.fsync(self.file.fileno())
+        self.bytes_written += len(line)
+
+    def close(self) -> None:
+        self.stream.close()
+        self.file.close()
 
 
 class FileSink(Sink):
@@ -30,9 +87,14 @@ class FileSink(Sink):
         self.report = SinkReport()
 
         fpath = pathlib.Path(self.config.filename)
-        self.file = fpath.open("w")
-        self.file.write("[\n")
-        self.wrote_something = False
+        if self.config.format == FileSinkFormat.JSONL:
+            self.jsonl_file: Optional[_JsonLinesFile] = _JsonLinesFile(fpath, config)
+            self.num_rotations = 0
+        else:
+            self.jsonl_file = None
+            self.file = fpath.open("w")
+            self.file.write("[\n")
+            self.wrote_something = False
 
     @classmethod
     def create(cls, config_dict: dict, ctx: PipelineContext) -> "FileSink":
@@ -60,6 +122,12 @@ class FileSink(Sink):
         record = record_envelope.record
         obj = record.to_obj()
 
+        if self.jsonl_file is not None:
+            self._write_json_line(obj)
+            self.report.report_record_written(record_envelope)
+            write_callback.on_success(record_envelope, {})
+            return
+
         if self.wrote_something:
             self.file.write(",\n")
 
@@ -73,9 +141,31 @@ class FileSink(Sink):
         self.report.report_record_written(record_envelope)
         write_callback.on_success(record_envelope, {})
 
+    def _write_json_line(self, obj: dict) -> None:
+        assert self.jsonl_file is not None
+        if (
+            self.config.max_file_size_bytes
+            and self.jsonl_file.bytes_written >= self.config.max_file_size_bytes
+        ):
+            self.jsonl_file.close()
+            self.num_rotations += 1
+            self.jsonl_file = _JsonLinesFile(
+                self._get_rotated_path(self.num_rotations), self.config
+            )
+        self.jsonl_file.write(f"{json_dumps(obj)}\n".encode())
+
+    def _get_rotated_path(self, index: int) -> pathlib.Path:
+        # e.g. out.jsonl.gz -> out.1.jsonl.gz
+        fpath = pathlib.Path(self.config.filename)
+        stem, dot, extensions = fpath.name.partition(".")
+        return fpath.with_name(f"{stem}.{index}{dot}{extensions}")
+
     def get_report(self):
         return self.report
 
     def close(self):
+        if self.jsonl_file is not None:
+            self.jsonl_file.close()
+            return
         self.file.write("\n]")
         self.file.close()
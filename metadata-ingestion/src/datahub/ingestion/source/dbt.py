@@ -1,10 +1,24 @@
+import contextlib
 import json
 import logging
 import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, cast
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
 
 import dateutil.parser
+import ijson
 import requests
 from pydantic import validator
 from pydantic.fields import Field
@@ -395,6 +409,129 @@ def load_file_as_json(uri: str) -> Any:
             return json.load(f)
 
 
+@contextlib.contextmanager
+def _open_json_stream(uri: str) -> Iterator[IO[bytes]]:
+    if re.match("^https?://", uri):
+        with requests.get(uri, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield response.raw
+    else:
+        with open(uri, "rb") as f:
+            yield f
+
+
+def load_json_sections(
+    uri: str,
+    sections: Dict[str, Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]],
+) -> Dict[str, Any]:
+    """
+    Reads the given top-level sections of a JSON file without loading the rest of
+    it into memory, and stops reading once they have all been read. The entries
+    of the sections mapped to a function are passed through it one by one as they
+    are parsed, so that only what the function returns is kept; the other
+    sections are kept as they are.
+    """
+    result: Dict[str, Any] = {}
+    remaining = set(sections)
+    section: Optional[str] = None
+    # The section and the key of the value about to be parsed, if it is kept.
+    pending: Optional[Tuple[str, Optional[str]]] = None
+    builder: Optional[ijson.ObjectBuilder] = None
+    depth = 0
+
+    with _open_json_stream(uri) as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if pending is not None and builder is None:
+                builder = ijson.ObjectBuilder()
+                depth = 0
+            if builder is not None:
+                assert pending is not None
+                builder.event(event, value)
+                if event in ("start_map", "start_array"):
+                    depth += 1
+                elif event in ("end_map", "end_array"):
+                    depth -= 1
+                if depth > 0:
+                    continue
+
+                pending_section, key = pending
+                transform = sections[pending_section]
+                if key is None:
+                    result[pending_section] = builder.value
+                    remaining.discard(pending_section)
+                else:
+                    assert transform is not None
+                    result[pending_section][key] = transform(builder.value)
+                pending = None
+                builder = None
+            elif event == "map_key" and prefix == "":
+                section = value
+                if section in sections:
+                    if sections[section] is None:
+                        pending = (section, None)
+                    else:
+                        result[section] = {}
+            elif event == "map_key" and prefix == section and section in result:
+                pending = (section, value)
+            elif event == "end_map" and prefix == section:
+                remaining.discard(section)
+
+            if not remaining:
+                break
+
+    return result
+
+
+# The fields of manifest nodes that are read by extract_dbt_entities, get_columns
+# and get_upstreams. Everything else, such as the compiled SQL, is dropped while
+# the manifest is read.
+_MANIFEST_NODE_FIELDS = {
+    "alias",
+    "database",
+    "description",
+    "identifier",
+    "meta",
+    "name",
+    "original_file_path",
+    "query_tag",
+    "raw_sql",
+    "resource_type",
+    "schema",
+    "tags",
+}
+
+
+def _pick(d: Dict[str, Any], keys: Iterable[str]) -> Dict[str, Any]:
+    return {key: d[key] for key in keys if key in d}
+
+
+def _compact_manifest_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    compact = _pick(node, _MANIFEST_NODE_FIELDS)
+    if "config" in node:
+        compact["config"] = _pick(node["config"], ["materialized", "meta"])
+    if "depends_on" in node:
+        compact["depends_on"] = _pick(node["depends_on"], ["nodes"])
+    if "columns" in node:
+        compact["columns"] = {
+            name: _pick(column, ["description", "tags"])
+            for name, column in node["columns"].items()
+        }
+    return compact
+
+
+def _compact_catalog_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    compact = {}
+    if "metadata" in node:
+        compact["metadata"] = _pick(node["metadata"], ["comment", "type"])
+    if "columns" in node:
+        compact["columns"] = {
+            name: _pick(column, ["name", "comment", "type", "index"])
+            for name, column in node["columns"].items()
+        }
+    return compact
+
+
 def loadManifestAndCatalog(
     manifest_path: str,
     catalog_path: str,
@@ -413,9 +550,23 @@ def loadManifestAndCatalog(
     Optional[str],
     Dict[str, Dict[str, Any]],
 ]:
-    dbt_manifest_json = load_file_as_json(manifest_path)
+    dbt_manifest_json = load_json_sections(
+        manifest_path,
+        {
+            "metadata": None,
+            "nodes": _compact_manifest_node,
+            "sources": _compact_manifest_node,
+        },
+    )
 
-    dbt_catalog_json = load_file_as_json(catalog_path)
+    dbt_catalog_json = load_json_sections(
+        catalog_path,
+        {
+            "metadata": None,
+            "nodes": _compact_catalog_node,
+            "sources": _compact_catalog_node,
+        },
+    )
 
     if sources_path is not None:
         dbt_sources_json = load_file_as_json(sources_path)
@@ -713,6 +864,9 @@ class DBTSource(StatefulIngestionSourceBase):
             self.compiled_owner_extraction_pattern = re.compile(
                 self.config.owner_extraction_pattern
             )
+        # The aspects that entities have in DataHub, by urn and aspect name, for
+        # patching them; see prefetch_existing_aspects.
+        self.existing_aspects: Dict[str, Dict[str, Any]] = {}
 
     # TODO: Consider refactoring this logic out for use across sources as it is leading to a significant amount of
     #  code duplication.
@@ -870,6 +1024,24 @@ class DBTSource(StatefulIngestionSourceBase):
             self.config.strip_user_ids_from_email,
         )
 
+        # Platform entities only get lineage when dbt entities are created too,
+        # so there is nothing to patch for them.
+        if self.config.write_semantics == "PATCH" and (
+            mce_platform == DBT_PLATFORM or self.config.disable_dbt_node_creation
+        ):
+            self.prefetch_existing_aspects(
+                [
+                    get_urn_from_dbtNode(
+                        node.database,
+                        node.schema,
+                        node.name,
+                        mce_platform,
+                        self.config.env,
+                    )
+                    for node in dbt_nodes
+                ]
+            )
+
         for node in dbt_nodes:
             node_datahub_urn = get_urn_from_dbtNode(
                 node.database,
@@ -1252,6 +1424,32 @@ class DBTSource(StatefulIngestionSourceBase):
             return get_upstream_lineage(upstream_urns)
         return None
 
+    def prefetch_existing_aspects(self, entity_urns: List[str]) -> None:
+        """
+        Fetches the ownership, tags and glossary terms of the entities with batch
+        gets, rather than one request per aspect and entity while patching.
+        """
+        if not self.ctx.graph:
+            return
+        self.existing_aspects.update(
+            self.ctx.graph.batch_get_aspects(
+                entity_urns,
+                {
+                    "ownership": OwnershipClass,
+                    "globalTags": GlobalTagsClass,
+                    "glossaryTerms": GlossaryTermsClass,
+                },
+            )
+        )
+        logger.debug(f"Prefetched the existing aspects of {len(entity_urns)} entities")
+
+    def _get_existing_aspect(
+        self, entity_urn: str, aspect: str, get_aspect: Callable[[str], Any]
+    ) -> Any:
+        if entity_urn in self.existing_aspects:
+            return self.existing_aspects[entity_urn][aspect]
+        return get_aspect(entity_urn)
+
     # This method attempts to read-modify and return the owners of a dataset.
     # From the existing owners it will remove the owners that are of the source_type_filter and
     # then add all the new owners to that list.
@@ -1262,7 +1460,9 @@ class DBTSource(StatefulIngestionSourceBase):
         if owners:
             transformed_owners += owners
         if self.ctx.graph:
-            existing_ownership = self.ctx.graph.get_ownership(entity_urn)
+            existing_ownership: Optional[OwnershipClass] = self._get_existing_aspect(
+                entity_urn, "ownership", self.ctx.graph.get_ownership
+            )
             if not existing_ownership or not existing_ownership.owners:
                 return transformed_owners
 
@@ -1296,7 +1496,9 @@ class DBTSource(StatefulIngestionSourceBase):
         tag_set = set([new_tag.tag for new_tag in new_tags])
 
         if self.ctx.graph:
-            existing_tags_class = self.ctx.graph.get_tags(entity_urn)
+            existing_tags_class: Optional[GlobalTagsClass] = self._get_existing_aspect(
+                entity_urn, "globalTags", self.ctx.graph.get_tags
+            )
             if existing_tags_class and existing_tags_class.tags:
                 for exiting_tag in existing_tags_class.tags:
                     if not exiting_tag.tag.startswith(tags_prefix_filter):
@@ -1310,7 +1512,11 @@ class DBTSource(StatefulIngestionSourceBase):
     ) -> List[GlossaryTermAssociation]:
         term_id_set = set([term.urn for term in new_terms])
         if self.ctx.graph:
-            existing_terms_class = self.ctx.graph.get_glossary_terms(entity_urn)
+            existing_terms_class: Optional[
+                GlossaryTermsClass
+            ] = self._get_existing_aspect(
+                entity_urn, "glossaryTerms", self.ctx.graph.get_glossary_terms
+            )
             if existing_terms_class and existing_terms_class.terms:
                 for existing_term in existing_terms_class.terms:
                     term_id_set.add(existing_term.urn)
@@ -1342,7 +1548,7 @@ class DBTSource(StatefulIngestionSourceBase):
         """
 
         project_id = (
-            load_file_as_json(self.config.manifest_path)
+            load_json_sections(self.config.manifest_path, {"metadata": None})
             .get("metadata", {})
             .get("project_id")
         )
@@ -1,6 +1,9 @@
+import collections
+import concurrent.futures
+import itertools
 import json
 from dataclasses import dataclass, field
-from typing import Iterable, Iterator, Union
+from typing import IO, Any, Deque, Iterable, Iterator, List, Optional, Union
 
 from pydantic.fields import Field
 
@@ -18,14 +21,74 @@ from datahub.metadata.com.linkedin.pegasus2avro.mxe import (
     MetadataChangeProposal,
 )
 from datahub.metadata.schema_classes import UsageAggregationClass
+from datahub.utilities.file_compression import open_text_for_reading
 
+_READ_CHUNK_SIZE = 1024 * 1024
+_DECODE_CHUNK_SIZE = 1000
 
-def _iterate_file(path: str) -> list:
-    with open(path, "r") as f:
-        obj_list = json.load(f)
-    if not isinstance(obj_list, list):
-        obj_list = [obj_list]
-    return obj_list
+_json_decoder = json.JSONDecoder()
+
+MetadataFileItem = Union[
+    MetadataChangeEvent, MetadataChangeProposal, UsageAggregationClass
+]
+
+
+def _iterate_json_values(f: IO[str]) -> Iterator[Any]:
+    """
+    Incrementally parses either a single JSON array, yielding its elements, or a
+    sequence of JSON values, e.g. in the JSON lines format. Only the value being
+    parsed is held in memory, regardless of the size of the file.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array: Optional[bool] = None
+
+    while True:
+        # Skip whitespace, as well as the commas between array elements.
+        while pos < len(buffer) and (
+            buffer[pos].isspace() or (in_array and buffer[pos] == ",")
+        ):
+            pos += 1
+
+        if pos < len(buffer):
+            if in_array is None:
+                in_array = buffer[pos] == "["
+                if in_array:
+                    pos += 1
+                continue
+            if in_array and buffer[pos] == "]":
+                return
+            try:
+                value, end = _json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number at the end of the buffer may be cut off, e.g. "1.5" may
+                # have been parsed as "1". In valid JSON, a value is never followed
+                # by a character that could continue a number.
+                if eof or (end < len(buffer) and buffer[end] not in "+-.0123456789eE"):
+                    pos = end
+                    yield value
+                    continue
+        elif eof:
+            if in_array:
+                raise json.JSONDecodeError("Expecting ']'", buffer, pos)
+            return
+
+        # Read more data. The read size grows with the buffer, so that parsing a
+        # very large value is not quadratic in its size.
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = f.read(max(_READ_CHUNK_SIZE, len(buffer)))
+        eof = not chunk
+        buffer += chunk
+
+
+def _iterate_file(path: str) -> Iterator[Any]:
+    with open_text_for_reading(path) as f:
+        yield from _iterate_json_values(f)
 
 
 def iterate_mce_file(path: str) -> Iterator[MetadataChangeEvent]:
@@ -34,26 +97,65 @@ def iterate_mce_file(path: str) -> Iterator[MetadataChangeEvent]:
         yield mce
 
 
+def _decode_obj(obj: dict, index: int) -> MetadataFileItem:
+    item: MetadataFileItem
+    if "proposedSnapshot" in obj:
+        item = MetadataChangeEvent.from_obj(obj)
+    elif "aspect" in obj:
+        item = MetadataChangeProposal.from_obj(obj)
+    else:
+        item = UsageAggregationClass.from_obj(obj)
+    if not item.validate():
+        raise ValueError(f"failed to parse: {obj} (index {index})")
+    return item
+
+
+def _decode_objs(objs: List[dict], start_index: int) -> List[MetadataFileItem]:
+    return [_decode_obj(obj, start_index + i) for i, obj in enumerate(objs)]
+
+
 def iterate_generic_file(
-    path: str,
-) -> Iterator[
-    Union[MetadataChangeEvent, MetadataChangeProposal, UsageAggregationClass]
-]:
-    for i, obj in enumerate(_iterate_file(path)):
-        item: Union[MetadataChangeEvent, MetadataChangeProposal, UsageAggregationClass]
-        if "proposedSnapshot" in obj:
-            item = MetadataChangeEvent.from_obj(obj)
-        elif "aspect" in obj:
-            item = MetadataChangeProposal.from_obj(obj)
-        else:
-            item = UsageAggregationClass.from_obj(obj)
-        if not item.validate():
-            raise ValueError(f"failed to parse: {obj} (index {i})")
-        yield item
+    path: str, decode_workers: int = 1
+) -> Iterator[MetadataFileItem]:
+    """
+    Iterates over the records of a file written by the file sink, or by
+    `datahub get`. With decode_workers > 1, records are decoded in chunks across
+    a pool of processes, while still being yielded in the order of the file.
+    """
+    if decode_workers <= 1:
+        for i, obj in enumerate(_iterate_file(path)):
+            yield _decode_obj(obj, i)
+        return
+
+    objs = _iterate_file(path)
+    chunks = (
+        (list(itertools.islice(objs, _DECODE_CHUNK_SIZE)), start_index)
+        for start_index in itertools.count(0, _DECODE_CHUNK_SIZE)
+    )
+    with concurrent.futures.ProcessPoolExecutor(decode_workers) as executor:
+        # Only keep a couple of chunks per worker in flight, so that memory use
+        # stays bounded.
+        pending: Deque[
+            "concurrent.futures.Future[List[MetadataFileItem]]"
+        ] = collections.deque()
+        for chunk, start_index in chunks:
+            if not chunk:
+                break
+            pending.append(executor.submit(_decode_objs, chunk, start_index))
+            if len(pending) >= 2 * decode_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 
 class FileSourceConfig(ConfigModel):
-    filename: str = Field(description="Path to file to ingest.")
+    filename: str = Field(
+        description="Path to file to ingest. The file can contain a JSON array or JSON lines, and can be gzip or zstd compressed."
+    )
+    decode_workers: int = Field(
+        default=1,
+        description="Number of processes to decode records with. Setting this above 1 speeds up ingesting large files.",
+    )
 
 
 @platform_name("File")
@@ -74,7 +176,9 @@ class GenericFileSource(Source):
         return cls(ctx, config)
 
     def get_workunits(self) -> Iterable[Union[MetadataWorkUnit, UsageStatsWorkUnit]]:
-        for i, obj in enumerate(iterate_generic_file(self.config.filename)):
+        for i, obj in enumerate(
+            iterate_generic_file(self.config.filename, self.config.decode_workers)
+        ):
             wu: Union[MetadataWorkUnit, UsageStatsWorkUnit]
             if isinstance(obj, UsageAggregationClass):
                 wu = UsageStatsWorkUnit(f"file://{self.config.filename}:{i}", obj)
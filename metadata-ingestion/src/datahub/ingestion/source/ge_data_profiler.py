@@ -686,6 +686,9 @@ class DatahubGEProfiler:
             catch_exceptions=self.config.catch_exceptions,
             is_single_row_query_method=_is_single_row_query_method,
             serial_execution_fallback_enabled=True,
+            max_queries_to_combine=self.config.query_combiner_max_queries,
+            max_columns_to_combine=self.config.query_combiner_max_columns,
+            max_combined_query_seconds=self.config.query_combiner_max_query_seconds,
         ).activate() as query_combiner:
             max_workers = min(max_workers, len(requests))
             logger.info(
@@ -95,6 +95,18 @@ class GEProfilingConfig(ConfigModel):
         default=True,
         description="*This feature is still experimental and can be disabled if it causes issues.* Reduces the total number of queries issued and speeds up profiling by dynamically combining SQL queries where possible.",
     )
+    query_combiner_max_queries: pydantic.PositiveInt = Field(
+        default=40,
+        description="Maximum number of queries that the query combiner combines into a single query.",
+    )
+    query_combiner_max_columns: pydantic.PositiveInt = Field(
+        default=400,
+        description="Maximum total number of columns selected by the queries that the query combiner combines into a single query.",
+    )
+    query_combiner_max_query_seconds: float = Field(
+        default=60,
+        description="If a combined query takes longer than this, or fails with a timeout or because it is too big, the query combiner combines fewer queries at once.",
+    )
 
     # Hidden option - used for debugging purposes.
     catch_exceptions: bool = Field(default=True, description="")
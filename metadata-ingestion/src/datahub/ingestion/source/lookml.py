@@ -1,11 +1,16 @@
+import concurrent.futures
 import glob
+import hashlib
 import importlib
 import itertools
+import json
 import logging
 import os
 import pathlib
 import re
+import sqlite3
 import sys
+import threading
 from dataclasses import dataclass
 from dataclasses import field as dataclass_field
 from dataclasses import replace
@@ -45,6 +50,7 @@ if sys.version_info >= (3, 7):
 else:
     raise ModuleNotFoundError("The lookml plugin requires Python 3.7 or newer.")
 
+import datahub
 import datahub.emitter.mce_builder as builder
 from datahub.configuration import ConfigModel
 from datahub.configuration.common import AllowDenyPattern, ConfigurationError
@@ -174,6 +180,14 @@ class LookMLSourceConfig(LookerCommonConfig):
         None,
         description="Populates the [TransportOptions](https://github.com/looker-open-source/sdk-codegen/blob/94d6047a0d52912ac082eb91616c1e7c379ab262/python/looker_sdk/rtl/transport.py#L70) struct for looker client",
     )
+    parse_workers: int = Field(
+        1,
+        description="Number of processes to parse LookML files with. If more than 1, all the `.lkml` files under `base_folder` are parsed in parallel up front.",
+    )
+    parse_cache_dir: Optional[str] = Field(
+        None,
+        description="Directory to keep parsed LookML files in, keyed by the hash of their contents, so that later runs skip parsing the files that did not change.",
+    )
 
     @validator("platform_instance")
     def platform_instance_not_supported(cls, v: str) -> str:
@@ -231,6 +245,8 @@ class LookMLSourceReport(SourceReport):
     models_dropped: List[str] = dataclass_field(default_factory=list)
     views_discovered: int = 0
     views_dropped: List[str] = dataclass_field(default_factory=list)
+    lkml_files_parsed: int = 0
+    lkml_parse_cache_hits: int = 0
 
     def report_models_scanned(self) -> None:
         self.models_discovered += 1
@@ -245,6 +261,161 @@ class LookMLSourceReport(SourceReport):
         self.views_dropped.append(view)
 
 
+def _parse_lkml(raw_file_content: str) -> Tuple[Optional[dict], Optional[str]]:
+    # This runs in the worker processes of LookMLFileCache.prefetch, so errors
+    # are returned rather than raised.
+    try:
+        return lkml.load(raw_file_content), None
+    except Exception as e:
+        return None, str(e)
+
+
+class LookMLFileCache:
+    """
+    Reads and parses each LookML file at most once per run, and resolves each
+    include glob once. Files can be parsed up front by a pool of processes. If a
+    cache directory is given, parses are also kept in a SQLite database in it,
+    keyed by the hash of the file's contents, so that later runs skip parsing the
+    files that did not change.
+    """
+
+    def __init__(
+        self,
+        reporter: LookMLSourceReport,
+        parse_workers: int = 1,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        self.reporter = reporter
+        self.parse_workers = parse_workers
+        # Keyed by the resolved path, holds the file's content and either its
+        # parse or the exception raised while reading or parsing it.
+        self._files: Dict[str, Tuple[str, Optional[dict], Optional[Exception]]] = {}
+        self._globs: Dict[str, List[str]] = {}
+        # With pipelined execution, the files are loaded in another thread than
+        # the one that creates and closes the cache.
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(cache_dir, "lookml_parse_cache.db"),
+                check_same_thread=False,
+                timeout=30,
+                isolation_level=None,
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_files (hash TEXT PRIMARY KEY, parsed TEXT)"
+            )
+
+    def resolve_glob(self, glob_expr: str) -> List[str]:
+        """Returns the resolved paths of the files an include glob matches."""
+        if glob_expr not in self._globs:
+            self._globs[glob_expr] = [
+                str(pathlib.Path(p).resolve())
+                for p in sorted(
+                    glob.glob(glob_expr, recursive=True)
+                    + glob.glob(f"{glob_expr}.lkml", recursive=True)
+                )
+            ]
+        return self._globs[glob_expr]
+
+    def load(self, path: str) -> Tuple[str, dict]:
+        """Returns the content of the file and its parse."""
+        path = str(pathlib.Path(path).resolve())
+        if path not in self._files:
+            self.prefetch([path])
+        raw_file_content, parsed, exception = self._files[path]
+        if exception is not None:
+            raise exception
+        assert parsed is not None
+        return raw_file_content, parsed
+
+    @staticmethod
+    def _hash(raw_file_content: str) -> str:
+        # The datahub version stands in for the version of lkml, which it pins.
+        return hashlib.sha256(
+            f"{datahub.__version__}\0{raw_file_content}".encode("utf-8")
+        ).hexdigest()
+
+    def _get_persisted(self, content_hash: str) -> Optional[dict]:
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT parsed FROM parsed_files WHERE hash = ?", (content_hash,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _persist(self, content_hash: str, parsed: dict) -> None:
+        try:
+            with self._lock:
+                if self._conn is None:
+                    return
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parsed_files VALUES (?, ?)",
+                    (content_hash, json.dumps(parsed)),
+                )
+        except sqlite3.Error as e:
+            # The on-disk cache is only an optimization.
+            logger.warning(f"Failed to persist parsed LookML file: {e}")
+
+    def prefetch(self, paths: Iterable[str]) -> None:
+        """Reads and parses the files that have not been loaded yet."""
+        to_parse: List[Tuple[str, str, str]] = []
+        for path in paths:
+            path = str(pathlib.Path(path).resolve())
+            if path in self._files:
+                continue
+            try:
+                with open(path, "r") as file:
+                    raw_file_content = file.read()
+            except Exception as e:
+                self._files[path] = ("", None, e)
+                continue
+            content_hash = self._hash(raw_file_content)
+            parsed = self._get_persisted(content_hash)
+            if parsed is not None:
+                self.reporter.lkml_parse_cache_hits += 1
+                self._files[path] = (raw_file_content, parsed, None)
+            else:
+                to_parse.append((path, raw_file_content, content_hash))
+
+        raw_file_contents = [raw_file_content for _, raw_file_content, _ in to_parse]
+        if self.parse_workers > 1 and len(to_parse) > 1:
+            logger.info(
+                f"Parsing {len(to_parse)} LookML files with {self.parse_workers} processes"
+            )
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.parse_workers
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _parse_lkml,
+                        raw_file_contents,
+                        chunksize=max(1, len(to_parse) // (self.parse_workers * 4)),
+                    )
+                )
+        else:
+            results = [_parse_lkml(content) for content in raw_file_contents]
+
+        for (path, raw_file_content, content_hash), (parsed, error) in zip(
+            to_parse, results
+        ):
+            self.reporter.lkml_files_parsed += 1
+            if error is not None:
+                self._files[path] = (raw_file_content, None, ValueError(error))
+            else:
+                assert parsed is not None
+                self._files[path] = (raw_file_content, parsed, None)
+                self._persist(content_hash, parsed)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 @dataclass
 class LookerModel:
     connection: str
@@ -258,6 +429,7 @@ class LookerModel:
         base_folder: str,
         path: str,
         reporter: LookMLSourceReport,
+        file_cache: Optional[LookMLFileCache] = None,
     ) -> "LookerModel":
         logger.debug(f"Loading model from {path}")
         connection = looker_model_dict["connection"]
@@ -269,6 +441,7 @@ class LookerModel:
             reporter,
             seen_so_far=set(),
             traversal_path=pathlib.Path(path).stem,
+            file_cache=file_cache,
         )
         logger.debug(f"{path} has resolved_includes: {resolved_includes}")
         explores = looker_model_dict.get("explores", [])
@@ -288,12 +461,14 @@ class LookerModel:
         reporter: LookMLSourceReport,
         seen_so_far: Set[str],
         traversal_path: str = "",  # a cosmetic parameter to aid debugging
+        file_cache: Optional[LookMLFileCache] = None,
     ) -> List[str]:
         """Resolve ``include`` statements in LookML model files to a list of ``.lkml`` files.
 
         For rules on how LookML ``include`` statements are written, see
             https://docs.looker.com/data-modeling/getting-started/ide-folders#wildcard_examples
         """
+        file_cache = file_cache or LookMLFileCache(reporter)
         resolved = []
         for inc in includes:
             # Filter out dashboards - we get those through the looker source.
@@ -313,13 +488,7 @@ class LookerModel:
                 glob_expr = str(pathlib.Path(path).parent / inc)
             # "**" matches an arbitrary number of directories in LookML
             # we also resolve these paths to absolute paths so we can de-dup effectively later on
-            included_files = [
-                str(pathlib.Path(p).resolve())
-                for p in sorted(
-                    glob.glob(glob_expr, recursive=True)
-                    + glob.glob(f"{glob_expr}.lkml", recursive=True)
-                )
-            ]
+            included_files = file_cache.resolve_glob(glob_expr)
             logger.debug(
                 f"traversal_path={traversal_path}, included_files = {included_files}, seen_so_far: {seen_so_far}"
             )
@@ -345,22 +514,22 @@ class LookerModel:
                     f"Will be loading {included_file}, traversed here via {traversal_path}"
                 )
                 try:
-                    with open(included_file, "r") as file:
-                        parsed = lkml.load(file)
-                        seen_so_far.add(included_file)
-                        if "includes" in parsed:  # we have more includes to resolve!
-                            resolved.extend(
-                                LookerModel.resolve_includes(
-                                    parsed["includes"],
-                                    base_folder,
-                                    included_file,
-                                    reporter,
-                                    seen_so_far,
-                                    traversal_path=traversal_path
-                                    + "."
-                                    + pathlib.Path(included_file).stem,
-                                )
+                    _, parsed = file_cache.load(included_file)
+                    seen_so_far.add(included_file)
+                    if "includes" in parsed:  # we have more includes to resolve!
+                        resolved.extend(
+                            LookerModel.resolve_includes(
+                                parsed["includes"],
+                                base_folder,
+                                included_file,
+                                reporter,
+                                seen_so_far,
+                                traversal_path=traversal_path
+                                + "."
+                                + pathlib.Path(included_file).stem,
+                                file_cache=file_cache,
                             )
+                        )
                 except Exception as e:
                     reporter.report_warning(
                         path, f"Failed to load {included_file} due to {e}"
@@ -389,6 +558,7 @@ class LookerViewFile:
         base_folder: str,
         raw_file_content: str,
         reporter: LookMLSourceReport,
+        file_cache: Optional[LookMLFileCache] = None,
     ) -> "LookerViewFile":
         logger.debug(f"Loading view file at {absolute_file_path}")
         includes = looker_view_file_dict.get("includes", [])
@@ -401,6 +571,7 @@ class LookerViewFile:
             absolute_file_path,
             reporter,
             seen_so_far=seen_so_far,
+            file_cache=file_cache,
         )
         logger.debug(
             f"resolved_includes for {absolute_file_path} is {resolved_includes}"
@@ -429,10 +600,16 @@ class LookerViewFileLoader:
     This is to avoid reloading the same file off of disk many times during the recursive include resolution process
     """
 
-    def __init__(self, base_folder: str, reporter: LookMLSourceReport) -> None:
+    def __init__(
+        self,
+        base_folder: str,
+        reporter: LookMLSourceReport,
+        file_cache: Optional[LookMLFileCache] = None,
+    ) -> None:
         self.viewfile_cache: Dict[str, LookerViewFile] = {}
         self._base_folder = base_folder
         self.reporter = reporter
+        self._file_cache = file_cache or LookMLFileCache(reporter)
 
     def is_view_seen(self, path: str) -> bool:
         return path in self.viewfile_cache
@@ -453,25 +630,19 @@ class LookerViewFileLoader:
             return self.viewfile_cache[path]
 
         try:
-            with open(path, "r") as file:
-                raw_file_content = file.read()
-        except Exception as e:
-            self.reporter.report_failure(path, f"failed to load view file: {e}")
-            return None
-        try:
-            with open(path, "r") as file:
-                logger.debug(f"Loading viewfile {path}")
-                parsed = lkml.load(file)
-                looker_viewfile = LookerViewFile.from_looker_dict(
-                    absolute_file_path=path,
-                    looker_view_file_dict=parsed,
-                    base_folder=self._base_folder,
-                    raw_file_content=raw_file_content,
-                    reporter=reporter,
-                )
-                logger.debug(f"adding viewfile for path {path} to the cache")
-                self.viewfile_cache[path] = looker_viewfile
-                return looker_viewfile
+            logger.debug(f"Loading viewfile {path}")
+            raw_file_content, parsed = self._file_cache.load(path)
+            looker_viewfile = LookerViewFile.from_looker_dict(
+                absolute_file_path=path,
+                looker_view_file_dict=parsed,
+                base_folder=self._base_folder,
+                raw_file_content=raw_file_content,
+                reporter=reporter,
+                file_cache=self._file_cache,
+            )
+            logger.debug(f"adding viewfile for path {path} to the cache")
+            self.viewfile_cache[path] = looker_viewfile
+            return looker_viewfile
         except Exception as e:
             self.reporter.report_failure(path, f"failed to load view file: {e}")
             return None
@@ -809,6 +980,11 @@ class LookMLSource(Source):
         super().__init__(ctx)
         self.source_config = config
         self.reporter = LookMLSourceReport()
+        self.file_cache = LookMLFileCache(
+            self.reporter,
+            parse_workers=self.source_config.parse_workers,
+            cache_dir=self.source_config.parse_cache_dir,
+        )
         if self.source_config.api:
             looker_api = LookerAPI(self.source_config.api)
             self.looker_client = looker_api.get_client()
@@ -820,12 +996,15 @@ class LookMLSource(Source):
                 )
 
     def _load_model(self, path: str) -> LookerModel:
-        with open(path, "r") as file:
-            logger.debug(f"Loading model from file {path}")
-            parsed = lkml.load(file)
-            looker_model = LookerModel.from_looker_dict(
-                parsed, str(self.source_config.base_folder), path, self.reporter
-            )
+        logger.debug(f"Loading model from file {path}")
+        _, parsed = self.file_cache.load(path)
+        looker_model = LookerModel.from_looker_dict(
+            parsed,
+            str(self.source_config.base_folder),
+            path,
+            self.reporter,
+            file_cache=self.file_cache,
+        )
         return looker_model
 
     def _platform_names_have_2_parts(self, platform: str) -> bool:
@@ -1066,9 +1245,18 @@ class LookMLSource(Source):
 
     def get_workunits(self) -> Iterable[MetadataWorkUnit]:  # noqa: C901
         viewfile_loader = LookerViewFileLoader(
-            str(self.source_config.base_folder), self.reporter
+            str(self.source_config.base_folder), self.reporter, self.file_cache
         )
 
+        if self.source_config.parse_workers > 1:
+            # Parse all the files in parallel, rather than one at a time as the
+            # includes are resolved.
+            self.file_cache.prefetch(
+                str(path)
+                for path in sorted(self.source_config.base_folder.glob("**/*.lkml"))
+                if not path.name.endswith(".dashboard.lkml")
+            )
+
         # some views can be mentioned by multiple 'include' statements, so this set is used to prevent
         # creating duplicate MCE messages
         processed_view_files: Set[str] = set()
@@ -1183,4 +1371,4 @@ class LookMLSource(Source):
         return self.reporter
 
     def close(self):
-        pass
+        self.file_cache.close()
@@ -0,0 +1,400 @@
+import logging
+import threading
+from collections import defaultdict
+from textwrap import dedent
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import sql
+from sqlalchemy.engine.reflection import Inspector
+from sqlalchemy.sql import sqltypes
+from sqlalchemy.sql.type_api import TypeEngine
+
+logger = logging.getLogger(__name__)
+
+# The per-schema queries below all expose the same column labels, so the rows can
+# be turned into SQLAlchemy reflection dicts without any dialect-specific code.
+
+_PG_COLUMNS_QUERY = dedent(
+    """
+    SELECT
+        c.table_name AS table_name,
+        c.column_name AS column_name,
+        c.data_type AS data_type,
+        c.is_nullable AS is_nullable,
+        c.column_default AS column_default,
+        c.character_maximum_length AS character_maximum_length,
+        c.numeric_precision AS numeric_precision,
+        c.numeric_scale AS numeric_scale,
+        d.description AS comment
+    FROM information_schema.columns c
+    LEFT JOIN pg_catalog.pg_namespace n ON n.nspname = c.table_schema
+    LEFT JOIN pg_catalog.pg_class pc
+        ON pc.relnamespace = n.oid AND pc.relname = c.table_name
+    LEFT JOIN pg_catalog.pg_description d
+        ON d.objoid = pc.oid AND d.objsubid = c.ordinal_position
+    WHERE c.table_schema = :schema
+    ORDER BY c.table_name, c.ordinal_position
+    """
+)
+
+_PG_TABLE_COMMENTS_QUERY = dedent(
+    """
+    SELECT c.relname AS table_name, d.description AS comment
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_description d
+        ON d.objoid = c.oid
+        AND d.objsubid = 0
+        AND d.classoid = 'pg_catalog.pg_class'::regclass
+    WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+    """
+)
+
+_BULK_QUERIES: Dict[str, Dict[str, str]] = {
+    "postgresql": {
+        "columns": _PG_COLUMNS_QUERY,
+        "pk_constraint": dedent(
+            """
+            SELECT
+                c.relname AS table_name,
+                con.conname AS name,
+                a.attname AS column_name
+            FROM pg_catalog.pg_constraint con
+            JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            CROSS JOIN generate_subscripts(con.conkey, 1) AS k(i)
+            JOIN pg_catalog.pg_attribute a
+                ON a.attrelid = con.conrelid AND a.attnum = con.conkey[k.i]
+            WHERE n.nspname = :schema AND con.contype = 'p'
+            ORDER BY c.relname, k.i
+            """
+        ),
+        "foreign_keys": dedent(
+            """
+            SELECT
+                c.relname AS table_name,
+                con.conname AS name,
+                a.attname AS column_name,
+                rn.nspname AS referred_schema,
+                rc.relname AS referred_table,
+                ra.attname AS referred_column
+            FROM pg_catalog.pg_constraint con
+            JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_catalog.pg_class rc ON rc.oid = con.confrelid
+            JOIN pg_catalog.pg_namespace rn ON rn.oid = rc.relnamespace
+            CROSS JOIN generate_subscripts(con.conkey, 1) AS k(i)
+            JOIN pg_catalog.pg_attribute a
+                ON a.attrelid = con.conrelid AND a.attnum = con.conkey[k.i]
+            JOIN pg_catalog.pg_attribute ra
+                ON ra.attrelid = con.confrelid AND ra.attnum = con.confkey[k.i]
+            WHERE n.nspname = :schema AND con.contype = 'f'
+            ORDER BY c.relname, con.conname, k.i
+            """
+        ),
+        "table_comment": _PG_TABLE_COMMENTS_QUERY,
+    },
+    # Redshift does not support generate_subscripts, so its constraints keep going
+    # through the per-table inspector calls.
+    "redshift": {
+        "columns": _PG_COLUMNS_QUERY,
+        "table_comment": _PG_TABLE_COMMENTS_QUERY,
+    },
+    "mysql": {
+        "columns": dedent(
+            """
+            SELECT
+                table_name AS table_name,
+                column_name AS column_name,
+                data_type AS data_type,
+                is_nullable AS is_nullable,
+                column_default AS column_default,
+                character_maximum_length AS character_maximum_length,
+                numeric_precision AS numeric_precision,
+                numeric_scale AS numeric_scale,
+                column_comment AS comment
+            FROM information_schema.columns
+            WHERE table_schema = :schema
+            ORDER BY table_name, ordinal_position
+            """
+        ),
+        "pk_constraint": dedent(
+            """
+            SELECT
+                table_name AS table_name,
+                NULL AS name,
+                column_name AS column_name
+            FROM information_schema.key_column_usage
+            WHERE table_schema = :schema AND constraint_name = 'PRIMARY'
+            ORDER BY table_name, ordinal_position
+            """
+        ),
+        "foreign_keys": dedent(
+            """
+            SELECT
+                table_name AS table_name,
+                constraint_name AS name,
+                column_name AS column_name,
+                referenced_table_schema AS referred_schema,
+                referenced_table_name AS referred_table,
+                referenced_column_name AS referred_column
+            FROM information_schema.key_column_usage
+            WHERE table_schema = :schema AND referenced_table_name IS NOT NULL
+            ORDER BY table_name, constraint_name, ordinal_position
+            """
+        ),
+        "table_comment": dedent(
+            """
+            SELECT table_name AS table_name, table_comment AS comment
+            FROM information_schema.tables
+            WHERE table_schema = :schema
+            """
+        ),
+    },
+    # The Snowflake dialect already reflects constraints per schema.
+    "snowflake": {
+        "columns": dedent(
+            """
+            SELECT
+                table_name AS table_name,
+                column_name AS column_name,
+                data_type AS data_type,
+                is_nullable AS is_nullable,
+                column_default AS column_default,
+                character_maximum_length AS character_maximum_length,
+                numeric_precision AS numeric_precision,
+                numeric_scale AS numeric_scale,
+                comment AS comment
+            FROM information_schema.columns
+            WHERE table_schema = :schema
+            ORDER BY table_name, ordinal_position
+            """
+        ),
+        "table_comment": dedent(
+            """
+            SELECT table_name AS table_name, comment AS comment
+            FROM information_schema.tables
+            WHERE table_schema = :schema
+            """
+        ),
+    },
+    # Trino has no constraints, and its table comments are served together with
+    # the table properties, which can only be read table by table.
+    "trino": {
+        "columns": dedent(
+            """
+            SELECT
+                "table_name" AS table_name,
+                "column_name" AS column_name,
+                "data_type" AS data_type,
+                UPPER("is_nullable") AS is_nullable,
+                "column_default" AS column_default,
+                NULL AS character_maximum_length,
+                NULL AS numeric_precision,
+                NULL AS numeric_scale,
+                "comment" AS comment
+            FROM "information_schema"."columns"
+            WHERE "table_schema" = :schema
+            ORDER BY "table_name", "ordinal_position"
+            """
+        ),
+    },
+}
+
+
+class BulkSchemaReflector:
+    """
+    Serves the per-table Inspector reflection calls from one catalog query per schema
+    and kind of metadata, i.e. columns, primary keys, foreign keys and table comments.
+
+    Every getter returns None when the dialect or the kind of metadata is not
+    supported, when the bulk query failed, or when the table could not be found in
+    its result. Callers are expected to fall back to the Inspector in that case.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, str, str], Optional[Dict[str, Any]]] = {}
+
+    @staticmethod
+    def is_supported(inspector: Inspector) -> bool:
+        return inspector.dialect.name in _BULK_QUERIES
+
+    def get_columns(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> Optional[List[dict]]:
+        return self._get(inspector, "columns", schema, table)
+
+    def get_pk_constraint(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> Optional[dict]:
+        schema_pk_constraints = self._get_schema_metadata(
+            inspector, "pk_constraint", schema
+        )
+        if schema_pk_constraints is None or not self._has_table(
+            inspector, schema, table
+        ):
+            return None
+        # Tables without a primary key do not show up in the query result.
+        return schema_pk_constraints.get(
+            table, {"constrained_columns": [], "name": None}
+        )
+
+    def get_foreign_keys(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> Optional[List[dict]]:
+        schema_foreign_keys = self._get_schema_metadata(
+            inspector, "foreign_keys", schema
+        )
+        if schema_foreign_keys is None or not self._has_table(inspector, schema, table):
+            return None
+        return schema_foreign_keys.get(table, [])
+
+    def get_table_comment(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> Optional[dict]:
+        return self._get(inspector, "table_comment", schema, table)
+
+    def evict(self, schema: str) -> None:
+        """Drops the cached metadata of a schema once it has been processed."""
+        with self._lock:
+            for key in [key for key in self._cache if key[1] == schema]:
+                del self._cache[key]
+
+    def _has_table(self, inspector: Inspector, schema: str, table: str) -> bool:
+        schema_columns = self._get_schema_metadata(inspector, "columns", schema)
+        return schema_columns is not None and table in schema_columns
+
+    def _get(self, inspector: Inspector, kind: str, schema: str, table: str) -> Any:
+        schema_metadata = self._get_schema_metadata(inspector, kind, schema)
+        if schema_metadata is None:
+            return None
+        return schema_metadata.get(table)
+
+    def _get_schema_metadata(
+        self, inspector: Inspector, kind: str, schema: str
+    ) -> Optional[Dict[str, Any]]:
+        query = _BULK_QUERIES.get(inspector.dialect.name, {}).get(kind)
+        if query is None:
+            return None
+
+        key = (str(inspector.engine.url), schema, kind)
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = self._fetch(inspector, kind, query, schema)
+            return self._cache[key]
+
+    def _fetch(
+        self, inspector: Inspector, kind: str, query: str, schema: str
+    ) -> Optional[Dict[str, Any]]:
+        dialect = inspector.dialect
+        try:
+            rows = inspector.bind.execute(
+                sql.text(query), schema=dialect.denormalize_name(schema)
+            ).fetchall()
+        except Exception as e:
+            logger.warning(
+                f"Unable to fetch {kind} of schema {schema} in bulk, falling back to per-table reflection: {e}"
+            )
+            return None
+
+        grouped: Dict[str, List[Any]] = defaultdict(list)
+        for row in rows:
+            grouped[dialect.normalize_name(row.table_name)].append(row)
+
+        if kind == "columns":
+            return {
+                table: self._make_columns(inspector, table_rows)
+                for table, table_rows in grouped.items()
+            }
+        elif kind == "pk_constraint":
+            return {
+                table: {
+                    "constrained_columns": [
+                        dialect.normalize_name(row.column_name) for row in table_rows
+                    ],
+                    "name": table_rows[0].name,
+                }
+                for table, table_rows in grouped.items()
+            }
+        elif kind == "foreign_keys":
+            return {
+                table: self._make_foreign_keys(inspector, table_rows)
+                for table, table_rows in grouped.items()
+            }
+        else:
+            return {
+                table: {"text": table_rows[0].comment or None}
+                for table, table_rows in grouped.items()
+            }
+
+    def _make_columns(
+        self, inspector: Inspector, rows: List[Any]
+    ) -> Optional[List[dict]]:
+        columns = []
+        for row in rows:
+            column_type = _get_column_type(inspector, row)
+            if column_type is None:
+                # Let the dialect work out the types it knows better than
+                # information_schema does, e.g. arrays and user-defined types.
+                return None
+            columns.append(
+                {
+                    "name": inspector.dialect.normalize_name(row.column_name),
+                    "type": column_type,
+                    "nullable": row.is_nullable == "YES",
+                    "default": row.column_default,
+                    "comment": row.comment or None,
+                }
+            )
+        return columns
+
+    def _make_foreign_keys(self, inspector: Inspector, rows: List[Any]) -> List[dict]:
+        normalize_name = inspector.dialect.normalize_name
+        foreign_keys: Dict[str, dict] = {}
+        for row in rows:
+            fk = foreign_keys.setdefault(
+                row.name,
+                {
+                    "name": row.name,
+                    "constrained_columns": [],
+                    "referred_schema": normalize_name(row.referred_schema),
+                    "referred_table": normalize_name(row.referred_table),
+                    "referred_columns": [],
+                },
+            )
+            fk["constrained_columns"].append(normalize_name(row.column_name))
+            fk["referred_columns"].append(normalize_name(row.referred_column))
+        return list(foreign_keys.values())
+
+
+def _get_column_type(inspector: Inspector, row: Any) -> Optional[TypeEngine]:
+    if inspector.dialect.name == "trino":
+        # The trino dialect is only in use when its package is installed.
+        from trino.sqlalchemy import datatype
+
+        return datatype.parse_sqltype(row.data_type)
+
+    type_class = inspector.dialect.ischema_names.get(row.data_type)
+    if not isinstance(type_class, type):
+        return None
+
+    kwargs: Dict[str, Any] = {}
+    if issubclass(type_class, (sqltypes.DateTime, sqltypes.Time)):
+        if row.data_type.endswith("with time zone"):
+            kwargs["timezone"] = True
+    elif issubclass(type_class, sqltypes.String):
+        if row.character_maximum_length is not None:
+            kwargs["length"] = row.character_maximum_length
+    elif issubclass(type_class, sqltypes.Float):
+        if row.numeric_precision is not None:
+            kwargs["precision"] = row.numeric_precision
+    elif issubclass(type_class, sqltypes.Numeric):
+        if row.numeric_precision is not None:
+            kwargs["precision"] = row.numeric_precision
+            kwargs["scale"] = row.numeric_scale
+
+    try:
+        return type_class(**kwargs)
+    except TypeError:
+        return type_class()
@@ -1,17 +1,22 @@
+import concurrent.futures
 import datetime
+import functools
 import logging
+import threading
 import traceback
 from abc import abstractmethod
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Deque,
     Dict,
     Iterable,
     List,
+    NamedTuple,
     Optional,
     Set,
     Tuple,
@@ -24,6 +29,7 @@ from urllib.parse import quote_plus
 import pydantic
 from pydantic.fields import Field
 from sqlalchemy import create_engine, dialects, inspect
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.sql import sqltypes as types
@@ -44,8 +50,9 @@ from datahub.emitter.mcp_builder import (
     add_domain_to_entity_wu,
     gen_containers,
 )
-from datahub.ingestion.api.common import PipelineContext
+from datahub.ingestion.api.common import PipelineContext, WorkUnit
 from datahub.ingestion.api.workunit import MetadataWorkUnit
+from datahub.ingestion.source.sql.sql_bulk_reflection import BulkSchemaReflector
 from datahub.ingestion.source.state.checkpoint import Checkpoint
 from datahub.ingestion.source.state.sql_common_state import (
     BaseSQLAlchemyCheckpointState,
@@ -179,6 +186,11 @@ class SqlContainerSubTypes(str, Enum):
     SCHEMA = "Schema"
 
 
+# With extraction_workers > 1, entities are extracted, and reported, in several
+# threads. The lock is not a field of the report, which is serialized as is.
+_report_lock = threading.RLock()
+
+
 @dataclass
 class SQLSourceReport(StatefulIngestionReport):
     tables_scanned: int = 0
@@ -189,22 +201,37 @@ class SQLSourceReport(StatefulIngestionReport):
 
     query_combiner: Optional[SQLAlchemyQueryCombinerReport] = None
 
+    def report_workunit(self, wu: WorkUnit) -> None:
+        with _report_lock:
+            super().report_workunit(wu)
+
+    def report_warning(self, key: str, reason: str) -> None:
+        with _report_lock:
+            super().report_warning(key, reason)
+
+    def report_failure(self, key: str, reason: str) -> None:
+        with _report_lock:
+            super().report_failure(key, reason)
+
     def report_entity_scanned(self, name: str, ent_type: str = "table") -> None:
         """
         Entity could be a view or a table
         """
-        if ent_type == "table":
-            self.tables_scanned += 1
-        elif ent_type == "view":
-            self.views_scanned += 1
-        else:
-            raise KeyError(f"Unknown entity {ent_type}.")
+        with _report_lock:
+            if ent_type == "table":
+                self.tables_scanned += 1
+            elif ent_type == "view":
+                self.views_scanned += 1
+            else:
+                raise KeyError(f"Unknown entity {ent_type}.")
 
     def report_entity_profiled(self, name: str) -> None:
-        self.entities_profiled += 1
+        with _report_lock:
+            self.entities_profiled += 1
 
     def report_dropped(self, ent_name: str) -> None:
-        self.filtered.append(ent_name)
+        with _report_lock:
+            self.filtered.append(ent_name)
 
     def report_from_query_combiner(
         self, query_combiner_report: SQLAlchemyQueryCombinerReport
@@ -212,7 +239,8 @@ class SQLSourceReport(StatefulIngestionReport):
         self.query_combiner = query_combiner_report
 
     def report_stale_entity_soft_deleted(self, urn: str) -> None:
-        self.soft_deleted_stale_entities.append(urn)
+        with _report_lock:
+            self.soft_deleted_stale_entities.append(urn)
 
 
 class SQLAlchemyStatefulIngestionConfig(StatefulIngestionConfig):
@@ -261,6 +289,14 @@ class SQLAlchemyConfig(StatefulIngestionConfigBase):
     include_tables: Optional[bool] = Field(
         default=True, description="Whether tables should be ingested."
     )
+    extraction_workers: int = Field(
+        default=1,
+        description="Number of threads used to extract table and view metadata concurrently. Each thread uses its own connection from the engine's pool. Workunits are still produced in the same order as with a single thread.",
+    )
+    bulk_reflection: bool = Field(
+        default=False,
+        description="Fetch the columns, constraints and comments of a whole schema with one catalog query per kind instead of one query per table. Supported for postgres, mysql, snowflake, redshift and trino. Anything the bulk queries cannot serve, e.g. columns of array or user-defined types, is still reflected table by table.",
+    )
 
     from datahub.ingestion.source.ge_data_profiler import GEProfilingConfig
 
@@ -314,6 +350,38 @@ class SqlWorkUnit(MetadataWorkUnit):
     pass
 
 
+class _EntityExtractionTask(NamedTuple):
+    key: str
+    description: str
+    process: Callable[..., Iterable[Union[SqlWorkUnit, MetadataWorkUnit]]]
+
+
+class _WorkerInspectors:
+    """Hands out one inspector per thread, each on its own connection from the engine's pool."""
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Connection] = []
+
+    def get(self) -> Inspector:
+        inspector = getattr(self._local, "inspector", None)
+        if inspector is None:
+            conn = self._engine.connect()
+            with self._lock:
+                self._connections.append(conn)
+            inspector = inspect(conn)
+            self._local.inspector = inspector
+        return inspector
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
 _field_type_mapping: Dict[Type[types.TypeEngine], Type] = {
     types.Integer: NumberTypeClass,
     types.Numeric: NumberTypeClass,
@@ -464,6 +532,9 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
         self.config = config
         self.platform = platform
         self.report: SQLSourceReport = SQLSourceReport()
+        self.bulk_reflector: Optional[BulkSchemaReflector] = (
+            BulkSchemaReflector() if config.bulk_reflection else None
+        )
 
         config_report = {
             config_option: config.dict().get(config_option)
@@ -697,10 +768,15 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
 
         # Extra default SQLAlchemy option for better connection pooling and threading.
         # https://docs.sqlalchemy.org/en/14/core/pooling.html#sqlalchemy.pool.QueuePool.params.max_overflow
+        # Profiling and extraction workers hold connections at different times, so
+        # the pool needs to cover the larger of the two.
+        max_overflow = 0
         if sql_config.profiling.enabled:
-            sql_config.options.setdefault(
-                "max_overflow", sql_config.profiling.max_workers
-            )
+            max_overflow = sql_config.profiling.max_workers
+        if sql_config.extraction_workers > 1:
+            max_overflow = max(max_overflow, sql_config.extraction_workers)
+        if max_overflow:
+            sql_config.options.setdefault("max_overflow", max_overflow)
 
         for inspector in self.get_inspectors():
             profiler = None
@@ -729,6 +805,9 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
                         self.loop_profiler_requests(inspector, schema, sql_config)
                     )
 
+                if self.bulk_reflector:
+                    self.bulk_reflector.evict(schema)
+
             if profiler and profile_requests:
                 yield from self.loop_profiler(profile_requests, profiler)
 
@@ -829,7 +908,9 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
         sql_config: SQLAlchemyConfig,
     ) -> Iterable[Union[SqlWorkUnit, MetadataWorkUnit]]:
         tables_seen: Set[str] = set()
-        try:
+
+        def get_table_tasks() -> Iterable[_EntityExtractionTask]:
+            nonlocal schema
             for table in inspector.get_table_names(schema):
                 schema, table = self.standardize_schema_table_names(
                     schema=schema, entity=table
@@ -852,19 +933,86 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
                     self.report.report_dropped(dataset_name)
                     continue
 
+                yield _EntityExtractionTask(
+                    key=f"{schema}.{table}",
+                    description=f"{schema}.{table}",
+                    process=functools.partial(
+                        self._process_table,
+                        dataset_name,
+                        schema=schema,
+                        table=table,
+                        sql_config=sql_config,
+                    ),
+                )
+
+        try:
+            yield from self._process_entities(inspector, get_table_tasks())
+        except Exception as e:
+            self.report.report_failure(f"{schema}", f"Tables error: {e}")
+
+    def _process_entities(
+        self, inspector: Inspector, tasks: Iterable[_EntityExtractionTask]
+    ) -> Iterable[Union[SqlWorkUnit, MetadataWorkUnit]]:
+        """
+        Runs the given table or view extraction tasks, either inline or on a pool of
+        extraction_workers threads. In the latter case the workunits of each entity are
+        buffered and yielded in task order, so the output does not depend on timing.
+        """
+        if self.config.extraction_workers <= 1:
+            for task in tasks:
                 try:
-                    yield from self._process_table(
-                        dataset_name, inspector, schema, table, sql_config
-                    )
+                    yield from task.process(inspector=inspector)
                 except Exception as e:
                     logger.warning(
-                        f"Unable to ingest {schema}.{table} due to an exception.\n {traceback.format_exc()}"
-                    )
-                    self.report.report_warning(
-                        f"{schema}.{table}", f"Ingestion error: {e}"
+                        f"Unable to ingest {task.description} due to an exception.\n {traceback.format_exc()}"
                     )
-        except Exception as e:
-            self.report.report_failure(f"{schema}", f"Tables error: {e}")
+                    self.report.report_warning(task.key, f"Ingestion error: {e}")
+            return
+
+        # The current checkpoint is created lazily; make sure that happens here rather
+        # than racing in the workers, which then only append urns to its state.
+        self.get_current_checkpoint(self.get_default_ingestion_job_id())
+
+        def run_task(
+            task: _EntityExtractionTask,
+        ) -> Tuple[List[Union[SqlWorkUnit, MetadataWorkUnit]], Optional[str]]:
+            workunits: List[Union[SqlWorkUnit, MetadataWorkUnit]] = []
+            try:
+                for wu in task.process(inspector=worker_inspectors.get()):
+                    workunits.append(wu)
+            except Exception as e:
+                logger.warning(
+                    f"Unable to ingest {task.description} due to an exception.\n {traceback.format_exc()}"
+                )
+                return workunits, f"Ingestion error: {e}"
+            return workunits, None
+
+        def collect(
+            task: _EntityExtractionTask, future: concurrent.futures.Future
+        ) -> Iterable[Union[SqlWorkUnit, MetadataWorkUnit]]:
+            workunits, error = future.result()
+            yield from workunits
+            if error is not None:
+                self.report.report_warning(task.key, error)
+
+        max_workers = self.config.extraction_workers
+        worker_inspectors = _WorkerInspectors(inspector.engine)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers
+            ) as executor:
+                # Bound the number of entities extracted ahead of the consumer.
+                pending: Deque[
+                    Tuple[_EntityExtractionTask, concurrent.futures.Future]
+                ] = deque()
+                for task in tasks:
+                    pending.append((task, executor.submit(run_task, task)))
+                    if len(pending) >= 2 * max_workers:
+                        yield from collect(*pending.popleft())
+                while pending:
+                    yield from collect(*pending.popleft())
+        finally:
+            worker_inspectors.close()
 
     def _process_table(
         self,
@@ -924,7 +1072,7 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
             self.report.report_workunit(lineage_wu)
             yield lineage_wu
 
-        pk_constraints: dict = inspector.get_pk_constraint(table, schema)
+        pk_constraints: dict = self._reflect_pk_constraint(inspector, schema, table)
         foreign_keys = self._get_foreign_keys(dataset_urn, inspector, schema, table)
         schema_fields = self.get_schema_fields(dataset_name, columns, pk_constraints)
         schema_metadata = get_schema_metadata(
@@ -971,9 +1119,7 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
     ) -> Tuple[Optional[str], Optional[Dict[str, str]], Optional[str]]:
         try:
             location: Optional[str] = None
-            # SQLALchemy stubs are incomplete and missing this method.
-            # PR: https://github.com/dropbox/sqlalchemy-stubs/pull/223.
-            table_info: dict = inspector.get_table_comment(table, schema)  # type: ignore
+            table_info: dict = self._reflect_table_comment(inspector, schema, table)
         except NotImplementedError:
             description: Optional[str] = None
             properties: Dict[str, str] = {}
@@ -1021,7 +1167,7 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
     ) -> List[dict]:
         columns = []
         try:
-            columns = inspector.get_columns(table, schema)
+            columns = self._reflect_columns(inspector, schema, table)
             if len(columns) == 0:
                 self.report.report_warning(dataset_name, "missing column information")
         except Exception as e:
@@ -1037,7 +1183,7 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
         try:
             foreign_keys = [
                 self.get_foreign_key_metadata(dataset_urn, schema, fk_rec, inspector)
-                for fk_rec in inspector.get_foreign_keys(table, schema)
+                for fk_rec in self._reflect_foreign_keys(inspector, schema, table)
             ]
         except KeyError:
             # certain databases like MySQL cause issues due to lower-case/upper-case irregularities
@@ -1047,6 +1193,53 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
             foreign_keys = []
         return foreign_keys
 
+    # The helpers below serve reflection calls from the bulk reflector when it is
+    # enabled, and fall back to the per-table inspector calls otherwise.
+
+    def _reflect_columns(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> List[dict]:
+        if self.bulk_reflector:
+            columns = self.bulk_reflector.get_columns(inspector, schema, table)
+            if columns is not None:
+                return columns
+        return inspector.get_columns(table, schema)
+
+    def _reflect_pk_constraint(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> dict:
+        if self.bulk_reflector:
+            pk_constraint = self.bulk_reflector.get_pk_constraint(
+                inspector, schema, table
+            )
+            if pk_constraint is not None:
+                return pk_constraint
+        return inspector.get_pk_constraint(table, schema)
+
+    def _reflect_foreign_keys(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> List[dict]:
+        if self.bulk_reflector:
+            foreign_keys = self.bulk_reflector.get_foreign_keys(
+                inspector, schema, table
+            )
+            if foreign_keys is not None:
+                return foreign_keys
+        return inspector.get_foreign_keys(table, schema)
+
+    def _reflect_table_comment(
+        self, inspector: Inspector, schema: str, table: str
+    ) -> dict:
+        if self.bulk_reflector:
+            table_comment = self.bulk_reflector.get_table_comment(
+                inspector, schema, table
+            )
+            if table_comment is not None:
+                return table_comment
+        # SQLALchemy stubs are incomplete and missing this method.
+        # PR: https://github.com/dropbox/sqlalchemy-stubs/pull/223.
+        return inspector.get_table_comment(table, schema)  # type: ignore
+
     def get_schema_fields(
         self, dataset_name: str, columns: List[dict], pk_constraints: dict = None
     ) -> List[SchemaField]:
@@ -1083,7 +1276,8 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
         schema: str,
         sql_config: SQLAlchemyConfig,
     ) -> Iterable[Union[SqlWorkUnit, MetadataWorkUnit]]:
-        try:
+        def get_view_tasks() -> Iterable[_EntityExtractionTask]:
+            nonlocal schema
             for view in inspector.get_view_names(schema):
                 schema, view = self.standardize_schema_table_names(
                     schema=schema, entity=view
@@ -1099,21 +1293,20 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
                     self.report.report_dropped(dataset_name)
                     continue
 
-                try:
-                    yield from self._process_view(
+                yield _EntityExtractionTask(
+                    key=f"{schema}.{view}",
+                    description=f"view {schema}.{view}",
+                    process=functools.partial(
+                        self._process_view,
                         dataset_name=dataset_name,
-                        inspector=inspector,
                         schema=schema,
                         view=view,
                         sql_config=sql_config,
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"Unable to ingest view {schema}.{view} due to an exception.\n {traceback.format_exc()}"
-                    )
-                    self.report.report_warning(
-                        f"{schema}.{view}", f"Ingestion error: {e}"
-                    )
+                    ),
+                )
+
+        try:
+            yield from self._process_entities(inspector, get_view_tasks())
         except Exception as e:
             self.report.report_failure(f"{schema}", f"Views error: {e}")
 
@@ -1126,7 +1319,7 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
         sql_config: SQLAlchemyConfig,
     ) -> Iterable[Union[SqlWorkUnit, MetadataWorkUnit]]:
         try:
-            columns = inspector.get_columns(view, schema)
+            columns = self._reflect_columns(inspector, schema, view)
         except KeyError:
             # For certain types of views, we are unable to fetch the list of columns.
             self.report.report_warning(
@@ -1143,9 +1336,7 @@ class SQLAlchemySource(StatefulIngestionSourceBase):
                 canonical_schema=schema_fields,
             )
         try:
-            # SQLALchemy stubs are incomplete and missing this method.
-            # PR: https://github.com/dropbox/sqlalchemy-stubs/pull/223.
-            view_info: dict = inspector.get_table_comment(view, schema)  # type: ignore
+            view_info: dict = self._reflect_table_comment(inspector, schema, view)
         except NotImplementedError:
             description: Optional[str] = None
             properties: Dict[str, str] = {}
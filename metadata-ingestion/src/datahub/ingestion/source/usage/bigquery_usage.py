@@ -1,15 +1,26 @@
 import atexit
-import collections
 import heapq
+import itertools
 import json
 import logging
 import os
 import re
 import textwrap
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, MutableMapping, Optional, Union, cast
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import cachetools
 from google.cloud.bigquery import Client as BigQueryClient
@@ -17,7 +28,6 @@ from google.cloud.logging_v2.client import Client as GCPLoggingClient
 from more_itertools import partition
 
 import datahub.emitter.mce_builder as builder
-from datahub.configuration.time_window_config import get_time_bucket
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.ingestion.api.common import PipelineContext
 from datahub.ingestion.api.decorators import (
@@ -28,7 +38,10 @@ from datahub.ingestion.api.decorators import (
 )
 from datahub.ingestion.api.source import Source
 from datahub.ingestion.api.workunit import MetadataWorkUnit
-from datahub.ingestion.source.usage.usage_common import GenericAggregatedDataset
+from datahub.ingestion.source.usage.usage_common import (
+    GenericAggregatedDataset,
+    UsageAggregator,
+)
 from datahub.ingestion.source_config.usage.bigquery_usage import BigQueryUsageConfig
 from datahub.ingestion.source_report.usage.bigquery_usage import (
     BigQueryUsageSourceReport,
@@ -43,6 +56,7 @@ from datahub.utilities.parsing_util import (
     get_first_missing_key,
     get_first_missing_key_any,
 )
+from datahub.utilities.prefetch_iter import PrefetchIterator
 
 logger = logging.getLogger(__name__)
 
@@ -219,7 +233,8 @@ def bigquery_audit_metadata_query_template(
         """
     audit_log_filter_timestamps = """AND (timestamp >= "{start_time}"
         AND timestamp < "{end_time}"
-    );
+    )
+    ORDER BY timestamp;
     """
     audit_log_filter_query_complete = f"""
     AND (
@@ -706,15 +721,14 @@ class BigQueryUsageSource(Source):
                 self.report.num_operational_stats_workunits_emitted += 1
 
         hydrated_read_events = self._join_events_by_job_id(parsed_events)
-        aggregated_info = self._aggregate_enriched_read_events(hydrated_read_events)
+        aggregates = self._aggregate_enriched_read_events(hydrated_read_events)
 
         self.report.num_usage_workunits_emitted = 0
-        for time_bucket in aggregated_info.values():
-            for aggregate in time_bucket.values():
-                wu = self._make_usage_stat(aggregate)
-                self.report.report_workunit(wu)
-                yield wu
-                self.report.num_usage_workunits_emitted += 1
+        for aggregate in aggregates:
+            wu = self._make_usage_stat(aggregate)
+            self.report.report_workunit(wu)
+            yield wu
+            self.report.num_usage_workunits_emitted += 1
 
     def _make_bigquery_clients(self) -> List[BigQueryClient]:
         if self.config.projects is None:
@@ -743,15 +757,25 @@ class BigQueryUsageSource(Source):
     def _get_bigquery_log_entries_via_exported_bigquery_audit_metadata(
         self, clients: List[BigQueryClient]
     ) -> Iterable[BigQueryAuditMetadata]:
-        list_entry_generators_across_clients: List[Iterable[BigQueryAuditMetadata]] = []
+        list_entry_generators_across_clients: List[
+            List[Iterable[BigQueryAuditMetadata]]
+        ] = []
+        time_slices = self._get_log_fetch_time_slices()
         for client in clients:
             try:
-                list_entries: Iterable[
-                    BigQueryAuditMetadata
-                ] = self._get_exported_bigquery_audit_metadata(
-                    client, self.config.get_allow_pattern_string()
-                )
-                list_entry_generators_across_clients.append(list_entries)
+                for dataset in self.config.bigquery_audit_metadata_datasets or []:
+                    list_entry_generators_across_clients.append(
+                        [
+                            self._get_exported_bigquery_audit_metadata(
+                                client,
+                                self.config.get_allow_pattern_string(),
+                                dataset,
+                                start_time,
+                                end_time,
+                            )
+                            for start_time, end_time in time_slices
+                        ]
+                    )
             except Exception as e:
                 logger.warning(
                     f"Encountered exception retrieving AuditLogEntries for project {client.project}",
@@ -764,10 +788,7 @@ class BigQueryUsageSource(Source):
         i: int = 0
         entry: BigQueryAuditMetadata
         for i, entry in enumerate(
-            heapq.merge(
-                *list_entry_generators_across_clients,
-                key=self._get_entry_timestamp,
-            )
+            self._merge_log_entry_streams(list_entry_generators_across_clients)
         ):
             if i == 0:
                 logger.info("Starting log load from BigQuery")
@@ -775,49 +796,94 @@ class BigQueryUsageSource(Source):
         logger.info(f"Finished loading {i} log entries from BigQuery")
 
     def _get_exported_bigquery_audit_metadata(
-        self, bigquery_client: BigQueryClient, allow_filter: str
+        self,
+        bigquery_client: BigQueryClient,
+        allow_filter: str,
+        dataset: str,
+        start: datetime,
+        end: datetime,
     ) -> Iterable[BigQueryAuditMetadata]:
-        if self.config.bigquery_audit_metadata_datasets is None:
-            return
-
-        start_time: str = (
-            self.config.start_time - self.config.max_query_duration
-        ).strftime(BQ_DATETIME_FORMAT)
-        end_time: str = (
-            self.config.end_time + self.config.max_query_duration
-        ).strftime(BQ_DATETIME_FORMAT)
-
-        for dataset in self.config.bigquery_audit_metadata_datasets:
-            logger.info(
-                f"Start loading log entries from BigQueryAuditMetadata in {dataset}"
-            )
-            query: str
-            if self.config.use_date_sharded_audit_log_tables:
-                start_date: str = (
-                    self.config.start_time - self.config.max_query_duration
-                ).strftime(BQ_DATE_SHARD_FORMAT)
-                end_date: str = (
-                    self.config.end_time + self.config.max_query_duration
-                ).strftime(BQ_DATE_SHARD_FORMAT)
-
-                query = bigquery_audit_metadata_query_template(
-                    dataset, self.config.use_date_sharded_audit_log_tables, allow_filter
-                ).format(
-                    start_time=start_time,
-                    end_time=end_time,
-                    start_date=start_date,
-                    end_date=end_date,
-                )
-            else:
-                query = bigquery_audit_metadata_query_template(
-                    dataset, self.config.use_date_sharded_audit_log_tables, allow_filter
-                ).format(start_time=start_time, end_time=end_time)
+        start_time: str = start.strftime(BQ_DATETIME_FORMAT)
+        end_time: str = end.strftime(BQ_DATETIME_FORMAT)
 
-            query_job = bigquery_client.query(query)
-            logger.info(
-                f"Finished loading log entries from BigQueryAuditMetadata in {dataset}"
+        logger.info(
+            f"Start loading log entries from BigQueryAuditMetadata in {dataset} "
+            f"between {start_time} and {end_time}"
+        )
+        query: str
+        if self.config.use_date_sharded_audit_log_tables:
+            start_date: str = start.strftime(BQ_DATE_SHARD_FORMAT)
+            end_date: str = end.strftime(BQ_DATE_SHARD_FORMAT)
+
+            query = bigquery_audit_metadata_query_template(
+                dataset, self.config.use_date_sharded_audit_log_tables, allow_filter
+            ).format(
+                start_time=start_time,
+                end_time=end_time,
+                start_date=start_date,
+                end_date=end_date,
             )
-            yield from query_job
+        else:
+            query = bigquery_audit_metadata_query_template(
+                dataset, self.config.use_date_sharded_audit_log_tables, allow_filter
+            ).format(start_time=start_time, end_time=end_time)
+
+        query_job = bigquery_client.query(query)
+        logger.info(
+            f"Finished loading log entries from BigQueryAuditMetadata in {dataset}"
+        )
+        yield from query_job
+
+    def _get_log_fetch_time_slices(self) -> List[Tuple[datetime, datetime]]:
+        """
+        Splits the time range to fetch audit logs for into log_fetch_time_slices
+        consecutive, half-open ranges. The range is widened by max_query_duration,
+        to make sure that the join between query events and read events is complete.
+        """
+        start = self.config.start_time - self.config.max_query_duration
+        end = self.config.end_time + self.config.max_query_duration
+        num_slices = self.config.log_fetch_time_slices
+        # The filters only have a precision of seconds.
+        bounds = [
+            (start + (end - start) * i / num_slices).replace(microsecond=0)
+            for i in range(num_slices)
+        ] + [end]
+        return [
+            (slice_start, slice_end)
+            for slice_start, slice_end in zip(bounds, bounds[1:])
+            if slice_start < slice_end
+        ]
+
+    def _merge_log_entry_streams(
+        self,
+        streams: List[List[Iterable[Union[AuditLogEntry, BigQueryAuditMetadata]]]],
+    ) -> Iterable[Union[AuditLogEntry, BigQueryAuditMetadata]]:
+        """
+        Merges per project (or dataset) streams of log entries, each given as the
+        list of its consecutive time slices, into a single time-ordered stream.
+
+        With log_fetch_parallelism > 1, the slices are fetched on background
+        threads ahead of being consumed, with at most log_fetch_parallelism of
+        them fetching at any time.
+        """
+        if self.config.log_fetch_parallelism > 1:
+            semaphore = threading.Semaphore(self.config.log_fetch_parallelism)
+            streams = [
+                [
+                    PrefetchIterator(
+                        time_slice,
+                        buffer_size=self.config.log_page_size,
+                        semaphore=semaphore,
+                    )
+                    for time_slice in stream
+                ]
+                for stream in streams
+            ]
+
+        return heapq.merge(
+            *(itertools.chain.from_iterable(stream) for stream in streams),
+            key=self._get_entry_timestamp,
+        )
 
     def _get_entry_timestamp(
         self, entry: Union[AuditLogEntry, BigQueryAuditMetadata]
@@ -863,33 +929,36 @@ class BigQueryUsageSource(Source):
             f"use_allow_filter={use_allow_filter}, use_deny_filter={use_deny_filter}, "
             f"allow_regex={allow_regex}, deny_regex={deny_regex}"
         )
-        start_time = (self.config.start_time - self.config.max_query_duration).strftime(
-            BQ_DATETIME_FORMAT
-        )
-        self.report.log_entry_start_time = start_time
-        end_time = (self.config.end_time + self.config.max_query_duration).strftime(
+        time_slices = self._get_log_fetch_time_slices()
+        self.report.log_entry_start_time = time_slices[0][0].strftime(
             BQ_DATETIME_FORMAT
         )
-        self.report.log_entry_end_time = end_time
-        filter = audit_templates["BQ_FILTER_RULE_TEMPLATE"].format(
-            start_time=start_time,
-            end_time=end_time,
-            allow_regex=allow_regex,
-            deny_regex=deny_regex,
-        )
-        logger.debug(filter)
+        self.report.log_entry_end_time = time_slices[-1][1].strftime(BQ_DATETIME_FORMAT)
+        filters: List[str] = [
+            audit_templates["BQ_FILTER_RULE_TEMPLATE"].format(
+                start_time=start_time.strftime(BQ_DATETIME_FORMAT),
+                end_time=end_time.strftime(BQ_DATETIME_FORMAT),
+                allow_regex=allow_regex,
+                deny_regex=deny_regex,
+            )
+            for start_time, end_time in time_slices
+        ]
+        for filter in filters:
+            logger.debug(filter)
 
         list_entry_generators_across_clients: List[
-            Iterable[Union[AuditLogEntry, BigQueryAuditMetadata]]
+            List[Iterable[Union[AuditLogEntry, BigQueryAuditMetadata]]]
         ] = list()
         for client in clients:
             try:
-                list_entries: Iterable[
-                    Union[AuditLogEntry, BigQueryAuditMetadata]
-                ] = client.list_entries(
-                    filter_=filter, page_size=self.config.log_page_size
+                list_entry_generators_across_clients.append(
+                    [
+                        client.list_entries(
+                            filter_=filter, page_size=self.config.log_page_size
+                        )
+                        for filter in filters
+                    ]
                 )
-                list_entry_generators_across_clients.append(list_entries)
             except Exception as e:
                 logger.warning(
                     f"Encountered exception retrieving AuditLogEntires for project {client.project}",
@@ -902,10 +971,7 @@ class BigQueryUsageSource(Source):
         i: int = 0
         entry: Union[AuditLogEntry, BigQueryAuditMetadata]
         for i, entry in enumerate(
-            heapq.merge(
-                *list_entry_generators_across_clients,
-                key=self._get_entry_timestamp,
-            )
+            self._merge_log_entry_streams(list_entry_generators_across_clients)
         ):
             if i == 0:
                 logger.info("Starting log load from GCP Logging")
@@ -1116,18 +1182,12 @@ class BigQueryUsageSource(Source):
 
     def _aggregate_enriched_read_events(
         self, events: Iterable[ReadEvent]
-    ) -> Dict[datetime, Dict[BigQueryTableRef, AggregatedDataset]]:
+    ) -> Iterable[AggregatedDataset]:
         # TODO: handle partitioned tables
-
-        # TODO: perhaps we need to continuously prune this, rather than
-        # storing it all in one big object.
-        datasets: Dict[
-            datetime, Dict[BigQueryTableRef, AggregatedDataset]
-        ] = collections.defaultdict(dict)
+        aggregator: UsageAggregator[BigQueryTableRef] = UsageAggregator(self.config)
 
         num_aggregated: int = 0
         for event in events:
-            floored_ts = get_time_bucket(event.timestamp, self.config.bucket_duration)
             resource: Optional[BigQueryTableRef] = None
             try:
                 resource = event.resource.remove_extras()
@@ -1143,28 +1203,20 @@ class BigQueryUsageSource(Source):
                 self.report.report_dropped(str(resource))
                 continue
 
-            agg_bucket = datasets[floored_ts].setdefault(
+            aggregator.add_read_entry(
+                event.timestamp,
                 resource,
-                AggregatedDataset(
-                    bucket_start_time=floored_ts,
-                    resource=resource,
-                    user_email_pattern=self.config.user_email_pattern,
-                ),
+                event.actor_email,
+                event.query,
+                event.fieldsRead,
             )
-            agg_bucket.add_read_entry(event.actor_email, event.query, event.fieldsRead)
             num_aggregated += 1
+            yield from aggregator.pop_finished_aggregates()
         logger.info(f"Total number of events aggregated = {num_aggregated}.")
-        bucket_level_stats: str = "\n\t" + "\n\t".join(
-            [
-                f'bucket:{db.strftime("%m-%d-%Y:%H:%M:%S")}, size={len(ads)}'
-                for db, ads in datasets.items()
-            ]
-        )
-        logger.debug(
-            f"Number of buckets created = {len(datasets)}. Per-bucket details:{bucket_level_stats}"
-        )
 
-        return datasets
+        yield from aggregator.pop_all_aggregates()
+        self.report.num_spilled_usage_buckets = aggregator.num_spilled_buckets
+        self.report.num_late_usage_events_dropped = aggregator.num_late_events_dropped
 
     def _make_usage_stat(self, agg: AggregatedDataset) -> MetadataWorkUnit:
         return agg.make_usage_workunit(
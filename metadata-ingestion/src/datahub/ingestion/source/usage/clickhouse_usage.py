@@ -1,8 +1,7 @@
-import collections
 import dataclasses
 import logging
 from datetime import datetime
-from typing import Dict, Iterable, List
+from typing import Iterable, List
 
 from dateutil import parser
 from pydantic.fields import Field
@@ -12,7 +11,6 @@ from sqlalchemy.engine import Engine
 
 import datahub.emitter.mce_builder as builder
 from datahub.configuration.source_common import EnvBasedSourceConfigBase
-from datahub.configuration.time_window_config import get_time_bucket
 from datahub.ingestion.api.decorators import (
     SourceCapability,
     SupportStatus,
@@ -27,6 +25,7 @@ from datahub.ingestion.source.sql.clickhouse import ClickHouseConfig
 from datahub.ingestion.source.usage.usage_common import (
     BaseUsageConfig,
     GenericAggregatedDataset,
+    UsageAggregator,
 )
 
 logger = logging.getLogger(__name__)
@@ -122,11 +121,10 @@ class ClickHouseUsageSource(Source):
         joined_access_event = self._get_joined_access_event(access_events)
         aggregated_info = self._aggregate_access_events(joined_access_event)
 
-        for time_bucket in aggregated_info.values():
-            for aggregate in time_bucket.values():
-                wu = self._make_usage_stat(aggregate)
-                self.report.report_workunit(wu)
-                yield wu
+        for aggregate in aggregated_info:
+            wu = self._make_usage_stat(aggregate)
+            self.report.report_workunit(wu)
+            yield wu
 
     def _make_usage_query(self) -> str:
         return clickhouse_usage_sql_comment.format(
@@ -214,35 +212,29 @@ class ClickHouseUsageSource(Source):
 
     def _aggregate_access_events(
         self, events: List[ClickHouseJoinedAccessEvent]
-    ) -> Dict[datetime, Dict[ClickHouseTableRef, AggregatedDataset]]:
-        datasets: Dict[
-            datetime, Dict[ClickHouseTableRef, AggregatedDataset]
-        ] = collections.defaultdict(dict)
+    ) -> Iterable[AggregatedDataset]:
+        aggregator: UsageAggregator[ClickHouseTableRef] = UsageAggregator(self.config)
 
         for event in events:
-            floored_ts = get_time_bucket(event.starttime, self.config.bucket_duration)
-
             resource = (
                 f'{self.config.platform_instance+"." if self.config.platform_instance else ""}'
                 f"{event.schema_}.{event.table}"
             )
 
-            agg_bucket = datasets[floored_ts].setdefault(
-                resource,
-                AggregatedDataset(bucket_start_time=floored_ts, resource=resource),
-            )
-
             # current limitation in user stats UI, we need to provide email to show users
             user_email = f"{event.usename if event.usename else 'unknown'}"
             if "@" not in user_email:
                 user_email += f"@{self.config.email_domain}"
             logger.info(f"user_email: {user_email}")
-            agg_bucket.add_read_entry(
+            aggregator.add_read_entry(
+                event.starttime,
+                resource,
                 user_email,
                 event.query,
                 event.columns,
             )
-        return datasets
+            yield from aggregator.pop_finished_aggregates()
+        yield from aggregator.pop_all_aggregates()
 
     def _make_usage_stat(self, agg: AggregatedDataset) -> MetadataWorkUnit:
         return agg.make_usage_workunit(
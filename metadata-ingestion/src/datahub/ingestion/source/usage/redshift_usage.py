@@ -1,4 +1,3 @@
-import collections
 import dataclasses
 import logging
 import time
@@ -13,7 +12,6 @@ from sqlalchemy.engine.result import ResultProxy, RowProxy
 
 import datahub.emitter.mce_builder as builder
 from datahub.configuration.source_common import EnvBasedSourceConfigBase
-from datahub.configuration.time_window_config import get_time_bucket
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.ingestion.api.common import PipelineContext
 from datahub.ingestion.api.decorators import (
@@ -30,6 +28,7 @@ from datahub.ingestion.source.sql.redshift import RedshiftConfig
 from datahub.ingestion.source.usage.usage_common import (
     BaseUsageConfig,
     GenericAggregatedDataset,
+    UsageAggregator,
 )
 from datahub.metadata.schema_classes import (
     ChangeTypeClass,
@@ -126,7 +125,6 @@ ORDER BY
 
 RedshiftTableRef = str
 AggregatedDataset = GenericAggregatedDataset[RedshiftTableRef]
-AggregatedAccessEvents = Dict[datetime, Dict[RedshiftTableRef, AggregatedDataset]]
 
 
 class RedshiftAccessEvent(BaseModel):
@@ -227,17 +225,16 @@ class RedshiftUsageSource(Source):
             RedshiftAccessEvent
         ] = self._gen_access_events_from_history_query(query, engine)
 
-        aggregated_events: AggregatedAccessEvents = self._aggregate_access_events(
+        aggregated_events: Iterable[AggregatedDataset] = self._aggregate_access_events(
             access_events_iterable
         )
         # Generate usage workunits from aggregated events.
         self.report.num_usage_workunits_emitted = 0
-        for time_bucket in aggregated_events.values():
-            for aggregate in time_bucket.values():
-                wu: MetadataWorkUnit = self._make_usage_stat(aggregate)
-                self.report.report_workunit(wu)
-                self.report.num_usage_workunits_emitted += 1
-                yield wu
+        for aggregate in aggregated_events:
+            wu: MetadataWorkUnit = self._make_usage_stat(aggregate)
+            self.report.report_workunit(wu)
+            self.report.num_usage_workunits_emitted += 1
+            yield wu
 
     def _gen_operation_aspect_workunits(
         self, engine: Engine
@@ -353,33 +350,24 @@ class RedshiftUsageSource(Source):
 
     def _aggregate_access_events(
         self, events_iterable: Iterable[RedshiftAccessEvent]
-    ) -> AggregatedAccessEvents:
-        datasets: AggregatedAccessEvents = collections.defaultdict(dict)
+    ) -> Iterable[AggregatedDataset]:
+        aggregator: UsageAggregator[RedshiftTableRef] = UsageAggregator(self.config)
         for event in events_iterable:
-            floored_ts: datetime = get_time_bucket(
-                event.starttime, self.config.bucket_duration
-            )
             resource: str = f"{event.database}.{event.schema_}.{event.table}"
-            # Get a reference to the bucket value(or initialize not yet in dict) and update it.
-            agg_bucket: AggregatedDataset = datasets[floored_ts].setdefault(
-                resource,
-                AggregatedDataset(
-                    bucket_start_time=floored_ts,
-                    resource=resource,
-                    user_email_pattern=self.config.user_email_pattern,
-                ),
-            )
             # current limitation in user stats UI, we need to provide email to show users
             user_email: str = f"{event.username if event.username else 'unknown'}"
             if "@" not in user_email:
                 user_email += f"@{self.config.email_domain}"
             logger.info(f"user_email: {user_email}")
-            agg_bucket.add_read_entry(
+            aggregator.add_read_entry(
+                event.starttime,
+                resource,
                 user_email,
                 event.text,
                 [],  # TODO: not currently supported by redshift; find column level changes
             )
-        return datasets
+            yield from aggregator.pop_finished_aggregates()
+        yield from aggregator.pop_all_aggregates()
 
     def _make_usage_stat(self, agg: AggregatedDataset) -> MetadataWorkUnit:
         return agg.make_usage_workunit(
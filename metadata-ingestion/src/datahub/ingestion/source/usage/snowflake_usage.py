@@ -1,4 +1,3 @@
-import collections
 import json
 import logging
 import time
@@ -6,13 +5,11 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Iterable, List, Optional, Union, cast
 
 import pydantic.dataclasses
-from more_itertools import partition
 from pydantic import BaseModel
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 
 import datahub.emitter.mce_builder as builder
-from datahub.configuration.time_window_config import get_time_bucket
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.ingestion.api.common import PipelineContext
 from datahub.ingestion.api.decorators import (
@@ -28,7 +25,10 @@ from datahub.ingestion.source.state.stateful_ingestion_base import (
     StatefulIngestionSourceBase,
 )
 from datahub.ingestion.source.state.usage_common_state import BaseUsageCheckpointState
-from datahub.ingestion.source.usage.usage_common import GenericAggregatedDataset
+from datahub.ingestion.source.usage.usage_common import (
+    GenericAggregatedDataset,
+    UsageAggregator,
+)
 from datahub.ingestion.source_config.usage.snowflake_usage import SnowflakeUsageConfig
 from datahub.ingestion.source_report.usage.snowflake_usage import SnowflakeUsageReport
 from datahub.metadata.schema_classes import (
@@ -44,7 +44,6 @@ logger = logging.getLogger(__name__)
 
 SnowflakeTableRef = str
 AggregatedDataset = GenericAggregatedDataset[SnowflakeTableRef]
-AggregatedAccessEvents = Dict[datetime, Dict[SnowflakeTableRef, AggregatedDataset]]
 
 SNOWFLAKE_USAGE_SQL_TEMPLATE = """
 SELECT
@@ -262,23 +261,14 @@ class SnowflakeUsageSource(StatefulIngestionSourceBase):
             self._init_checkpoints()
             # Generate the workunits.
             access_events = self._get_snowflake_history()
-            aggregated_info_items_raw, operation_aspect_work_units_raw = partition(
-                lambda x: isinstance(x, MetadataWorkUnit),
-                self._aggregate_access_events(access_events),
-            )
-            for wu in cast(Iterable[MetadataWorkUnit], operation_aspect_work_units_raw):
+            for item in self._aggregate_access_events(access_events):
+                wu = (
+                    item
+                    if isinstance(item, MetadataWorkUnit)
+                    else self._make_usage_stat(item)
+                )
                 self.report.report_workunit(wu)
                 yield wu
-            aggregated_info_items = list(aggregated_info_items_raw)
-            assert len(aggregated_info_items) == 1
-
-            for time_bucket in cast(
-                AggregatedAccessEvents, aggregated_info_items[0]
-            ).values():
-                for aggregate in time_bucket.values():
-                    wu = self._make_usage_stat(aggregate)
-                    self.report.report_workunit(wu)
-                    yield wu
 
     def _make_usage_query(self) -> str:
         start_time = int(self.config.start_time.timestamp() * 1000)
@@ -494,33 +484,22 @@ class SnowflakeUsageSource(StatefulIngestionSourceBase):
 
     def _aggregate_access_events(
         self, events: Iterable[SnowflakeJoinedAccessEvent]
-    ) -> Iterable[Union[AggregatedAccessEvents, MetadataWorkUnit]]:
+    ) -> Iterable[Union[AggregatedDataset, MetadataWorkUnit]]:
         """
         Emits aggregated access events combined with operational workunits from the events.
         """
-        datasets: AggregatedAccessEvents = collections.defaultdict(dict)
+        aggregator: UsageAggregator[SnowflakeTableRef] = UsageAggregator(self.config)
 
         for event in events:
-            floored_ts = get_time_bucket(
-                event.query_start_time, self.config.bucket_duration
-            )
-
             accessed_data = (
                 event.base_objects_accessed
                 if self.config.apply_view_usage_to_tables
                 else event.direct_objects_accessed
             )
             for object in accessed_data:
-                resource = object.objectName
-                agg_bucket = datasets[floored_ts].setdefault(
-                    resource,
-                    AggregatedDataset(
-                        bucket_start_time=floored_ts,
-                        resource=resource,
-                        user_email_pattern=self.config.user_email_pattern,
-                    ),
-                )
-                agg_bucket.add_read_entry(
+                aggregator.add_read_entry(
+                    event.query_start_time,
+                    object.objectName,
                     event.email,
                     event.query_text,
                     [colRef.columnName.lower() for colRef in object.columns]
@@ -529,8 +508,9 @@ class SnowflakeUsageSource(StatefulIngestionSourceBase):
                 )
             if self.config.include_operational_stats:
                 yield from self._get_operation_aspect_work_unit(event)
+            yield from aggregator.pop_finished_aggregates()
 
-        yield datasets
+        yield from aggregator.pop_all_aggregates()
 
     def _make_usage_stat(self, agg: AggregatedDataset) -> MetadataWorkUnit:
         return agg.make_usage_workunit(
@@ -1,10 +1,9 @@
-import collections
 import dataclasses
 import json
 import logging
 from datetime import datetime
 from email.utils import parseaddr
-from typing import Dict, Iterable, List
+from typing import Iterable, List
 
 from dateutil import parser
 from pydantic.fields import Field
@@ -13,7 +12,6 @@ from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 
 import datahub.emitter.mce_builder as builder
-from datahub.configuration.time_window_config import get_time_bucket
 from datahub.ingestion.api.decorators import (
     SourceCapability,
     SupportStatus,
@@ -28,6 +26,7 @@ from datahub.ingestion.source.sql.trino import TrinoConfig
 from datahub.ingestion.source.usage.usage_common import (
     BaseUsageConfig,
     GenericAggregatedDataset,
+    UsageAggregator,
 )
 
 logger = logging.getLogger(__name__)
@@ -142,11 +141,10 @@ class TrinoUsageSource(Source):
         joined_access_event = self._get_joined_access_event(access_events)
         aggregated_info = self._aggregate_access_events(joined_access_event)
 
-        for time_bucket in aggregated_info.values():
-            for aggregate in time_bucket.values():
-                wu = self._make_usage_stat(aggregate)
-                self.report.report_workunit(wu)
-                yield wu
+        for aggregate in aggregated_info:
+            wu = self._make_usage_stat(aggregate)
+            self.report.report_workunit(wu)
+            yield wu
 
     def _make_usage_query(self) -> str:
         return trino_usage_sql_comment.format(
@@ -228,13 +226,10 @@ class TrinoUsageSource(Source):
 
     def _aggregate_access_events(
         self, events: List[TrinoJoinedAccessEvent]
-    ) -> Dict[datetime, Dict[TrinoTableRef, AggregatedDataset]]:
-        datasets: Dict[
-            datetime, Dict[TrinoTableRef, AggregatedDataset]
-        ] = collections.defaultdict(dict)
+    ) -> Iterable[AggregatedDataset]:
+        aggregator: UsageAggregator[TrinoTableRef] = UsageAggregator(self.config)
 
         for event in events:
-            floored_ts = get_time_bucket(event.starttime, self.config.bucket_duration)
             for metadata in event.accessed_metadata:
 
                 # Skipping queries starting with $system@
@@ -252,15 +247,6 @@ class TrinoUsageSource(Source):
                     f"{metadata.catalog_name}.{metadata.schema_name}.{metadata.table}"
                 )
 
-                agg_bucket = datasets[floored_ts].setdefault(
-                    resource,
-                    AggregatedDataset(
-                        bucket_start_time=floored_ts,
-                        resource=resource,
-                        user_email_pattern=self.config.user_email_pattern,
-                    ),
-                )
-
                 # add @unknown.com to username
                 # current limitation in user stats UI, we need to provide email to show users
                 if "@" in parseaddr(event.usr)[1]:
@@ -268,12 +254,15 @@ class TrinoUsageSource(Source):
                 else:
                     username = f"{event.usr if event.usr else 'unknown'}@{self.config.email_domain}"
 
-                agg_bucket.add_read_entry(
+                aggregator.add_read_entry(
+                    event.starttime,
+                    resource,
                     username,
                     event.query,
                     metadata.columns,
                 )
-        return datasets
+            yield from aggregator.pop_finished_aggregates()
+        yield from aggregator.pop_all_aggregates()
 
     def _make_usage_stat(self, agg: AggregatedDataset) -> MetadataWorkUnit:
         return agg.make_usage_workunit(
@@ -1,8 +1,26 @@
 import collections
 import dataclasses
+import functools
+import heapq
 import logging
-from datetime import datetime
-from typing import Callable, Counter, Generic, List, Optional, TypeVar
+import os
+import pickle
+import tempfile
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import pydantic
 from pydantic.fields import Field
@@ -12,6 +30,8 @@ from datahub.configuration.common import AllowDenyPattern
 from datahub.configuration.time_window_config import (
     BaseTimeWindowConfig,
     BucketDuration,
+    get_bucket_duration_delta,
+    get_time_bucket,
 )
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.ingestion.api.workunit import MetadataWorkUnit
@@ -22,23 +42,80 @@ from datahub.metadata.schema_classes import (
     DatasetUserUsageCountsClass,
     TimeWindowSizeClass,
 )
-from datahub.utilities.sql_formatter import format_sql_query
+from datahub.utilities.sql_formatter import format_sql_query, get_query_fingerprint
 
 logger = logging.getLogger(__name__)
 
 ResourceType = TypeVar("ResourceType")
 
 
+# The same top queries tend to show up in many buckets and for many datasets.
+@functools.lru_cache(maxsize=1024)
+def _format_top_sql_query(query: str) -> str:
+    return format_sql_query(query, keyword_case="upper", reindent_aligned=True)
+
+
+class SpaceSavingCounter:
+    """
+    Approximate counter that tracks at most `capacity` distinct keys, following the
+    space-saving heavy-hitters algorithm: once full, a new key replaces the key with
+    the lowest count and inherits that count. Keys that are frequent enough are
+    guaranteed to be tracked, and counts are never underestimated.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._counts: Dict[str, int] = {}
+        # Min-heap over (count, key). Entries are not updated in place; outdated ones
+        # are skipped when popped and dropped when the heap is rebuilt.
+        self._heap: List[Tuple[int, str]] = []
+
+    def __getitem__(self, key: str) -> int:
+        return self._counts.get(key, 0)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            count = self._counts.get(key)
+            if count is None:
+                count = 0
+                if len(self._counts) >= self.capacity:
+                    count = self._pop_min()
+            count += 1
+            self._counts[key] = count
+            heapq.heappush(self._heap, (count, key))
+            if len(self._heap) > 4 * self.capacity:
+                self._heap = [(count, key) for key, count in self._counts.items()]
+                heapq.heapify(self._heap)
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        # Like Counter.most_common, ties are kept in insertion order.
+        items = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+
+    def _pop_min(self) -> int:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self._counts.get(key) == count:
+                del self._counts[key]
+                return count
+
+
 @dataclasses.dataclass
 class GenericAggregatedDataset(Generic[ResourceType]):
     bucket_start_time: datetime
     resource: ResourceType
     user_email_pattern: AllowDenyPattern = AllowDenyPattern.allow_all()
+    max_tracked_queries: Optional[int] = None
 
     readCount: int = 0
     queryCount: int = 0
 
-    queryFreq: Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    queryFreq: Union[Counter[str], SpaceSavingCounter] = dataclasses.field(
+        default_factory=collections.Counter
+    )
     userFreq: Counter[str] = dataclasses.field(default_factory=collections.Counter)
     columnFreq: Counter[str] = dataclasses.field(default_factory=collections.Counter)
 
@@ -46,6 +123,10 @@ class GenericAggregatedDataset(Generic[ResourceType]):
     query_trimmer_string_space: int = 10
     query_trimmer_string: str = " ..."
 
+    def __post_init__(self) -> None:
+        if self.max_tracked_queries is not None:
+            self.queryFreq = SpaceSavingCounter(self.max_tracked_queries)
+
     def add_read_entry(
         self,
         user_email: str,
@@ -61,7 +142,7 @@ class GenericAggregatedDataset(Generic[ResourceType]):
 
         if query:
             self.queryCount += 1
-            self.queryFreq[query] += 1
+            self.queryFreq.update((query,))
         for column in fields:
             self.columnFreq[column] += 1
 
@@ -93,9 +174,7 @@ class GenericAggregatedDataset(Generic[ResourceType]):
             totalSqlQueries=self.queryCount,
             topSqlQueries=[
                 self.trim_query(
-                    format_sql_query(query, keyword_case="upper", reindent_aligned=True)
-                    if format_sql_queries
-                    else query,
+                    _format_top_sql_query(query) if format_sql_queries else query,
                     budget_per_query,
                 )
                 for query, _ in self.queryFreq.most_common(top_n_queries)
@@ -130,6 +209,158 @@ class GenericAggregatedDataset(Generic[ResourceType]):
         )
 
 
+class UsageAggregator(Generic[ResourceType]):
+    """
+    Aggregates read events into GenericAggregatedDatasets, one per time bucket and
+    resource, while keeping memory usage bounded according to the usage config:
+
+    - `max_tracked_queries` caps the number of distinct queries kept per aggregate.
+    - `max_aggregates_in_memory` spills the aggregates of the least recently updated
+      time buckets to a temporary directory on local disk.
+    - `bucket_emit_lateness` lets pop_finished_aggregates hand out the aggregates of a
+      time bucket as soon as the event timestamps have moved far enough past it.
+      Events that arrive afterwards for that bucket are dropped and counted in
+      num_late_events_dropped.
+    - `query_fingerprinting` counts the queries that only differ in their literals,
+      comments or whitespace as one, represented by the first of them seen in the
+      time bucket.
+
+    Without any of these options, it behaves like a dict of dicts of aggregates that
+    is emitted in full once all events have been added.
+    """
+
+    def __init__(self, config: "BaseUsageConfig") -> None:
+        self.config = config
+        self.num_spilled_buckets = 0
+        self.num_late_events_dropped = 0
+
+        # All buckets that are not yet emitted, in the order they were first seen.
+        self._bucket_order: Dict[datetime, None] = {}
+        # The buckets held in memory, from least to most recently updated.
+        self._buckets: Dict[
+            datetime, Dict[ResourceType, GenericAggregatedDataset[ResourceType]]
+        ] = collections.OrderedDict()
+        self._num_aggregates_in_memory = 0
+        self._spilled_buckets: Dict[datetime, str] = {}
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._emitted_buckets: Set[datetime] = set()
+        self._max_event_time: Optional[datetime] = None
+        # The first query seen for each fingerprint, per bucket held in memory.
+        self._queries_by_fingerprint: Dict[datetime, Dict[str, str]] = {}
+
+    def add_read_entry(
+        self,
+        timestamp: datetime,
+        resource: ResourceType,
+        user_email: str,
+        query: Optional[str],
+        fields: List[str],
+    ) -> None:
+        bucket_start_time = get_time_bucket(timestamp, self.config.bucket_duration)
+        if bucket_start_time in self._emitted_buckets:
+            self.num_late_events_dropped += 1
+            return
+        if self._max_event_time is None or timestamp > self._max_event_time:
+            self._max_event_time = timestamp
+
+        bucket = self._get_bucket(bucket_start_time)
+        aggregate = bucket.get(resource)
+        if aggregate is None:
+            aggregate = GenericAggregatedDataset(
+                bucket_start_time=bucket_start_time,
+                resource=resource,
+                user_email_pattern=self.config.user_email_pattern,
+                max_tracked_queries=self.config.max_tracked_queries,
+            )
+            bucket[resource] = aggregate
+            self._num_aggregates_in_memory += 1
+            self._spill_cold_buckets()
+        if query and self.config.query_fingerprinting:
+            query = self._queries_by_fingerprint.setdefault(
+                bucket_start_time, {}
+            ).setdefault(get_query_fingerprint(query), query)
+        aggregate.add_read_entry(user_email, query, fields)
+
+    def pop_finished_aggregates(
+        self,
+    ) -> Iterable[GenericAggregatedDataset[ResourceType]]:
+        """Hands out the aggregates of the buckets that are complete by now."""
+        if self.config.bucket_emit_lateness is None or self._max_event_time is None:
+            return
+        bucket_duration = get_bucket_duration_delta(self.config.bucket_duration)
+        watermark = self._max_event_time - self.config.bucket_emit_lateness
+        for bucket_start_time in list(self._bucket_order):
+            if bucket_start_time + bucket_duration <= watermark:
+                yield from self._pop_bucket(bucket_start_time)
+
+    def pop_all_aggregates(self) -> Iterable[GenericAggregatedDataset[ResourceType]]:
+        for bucket_start_time in list(self._bucket_order):
+            yield from self._pop_bucket(bucket_start_time)
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+    def _get_bucket(
+        self, bucket_start_time: datetime
+    ) -> Dict[ResourceType, GenericAggregatedDataset[ResourceType]]:
+        bucket = self._buckets.pop(bucket_start_time, None)
+        if bucket is None:
+            bucket = self._load_bucket(bucket_start_time)
+            self._bucket_order.setdefault(bucket_start_time)
+        self._buckets[bucket_start_time] = bucket
+        return bucket
+
+    def _pop_bucket(
+        self, bucket_start_time: datetime
+    ) -> List[GenericAggregatedDataset[ResourceType]]:
+        del self._bucket_order[bucket_start_time]
+        self._emitted_buckets.add(bucket_start_time)
+        self._queries_by_fingerprint.pop(bucket_start_time, None)
+        bucket = self._buckets.pop(bucket_start_time, None)
+        if bucket is None:
+            bucket = self._load_bucket(bucket_start_time)
+        else:
+            self._num_aggregates_in_memory -= len(bucket)
+        return list(bucket.values())
+
+    def _spill_cold_buckets(self) -> None:
+        max_aggregates = self.config.max_aggregates_in_memory
+        if max_aggregates is None:
+            return
+        # The most recently updated bucket is never spilled.
+        while (
+            self._num_aggregates_in_memory > max_aggregates and len(self._buckets) > 1
+        ):
+            bucket_start_time = next(iter(self._buckets))
+            bucket = self._buckets.pop(bucket_start_time)
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.TemporaryDirectory(prefix="datahub-usage-")
+            path = os.path.join(
+                self._spill_dir.name, f"{int(bucket_start_time.timestamp())}.pickle"
+            )
+            queries = self._queries_by_fingerprint.pop(bucket_start_time, None)
+            with open(path, "wb") as f:
+                pickle.dump((bucket, queries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spilled_buckets[bucket_start_time] = path
+            self._num_aggregates_in_memory -= len(bucket)
+            self.num_spilled_buckets += 1
+            logger.debug(f"Spilled {len(bucket)} usage aggregates to {path}")
+
+    def _load_bucket(
+        self, bucket_start_time: datetime
+    ) -> Dict[ResourceType, GenericAggregatedDataset[ResourceType]]:
+        path = self._spilled_buckets.pop(bucket_start_time, None)
+        if path is None:
+            return {}
+        with open(path, "rb") as f:
+            bucket, queries = pickle.load(f)
+        os.remove(path)
+        if queries is not None:
+            self._queries_by_fingerprint[bucket_start_time] = queries
+        self._num_aggregates_in_memory += len(bucket)
+        return bucket
+
+
 class BaseUsageConfig(BaseTimeWindowConfig):
     top_n_queries: pydantic.PositiveInt = Field(
         default=10, description="Number of top queries to save to each table."
@@ -144,6 +375,22 @@ class BaseUsageConfig(BaseTimeWindowConfig):
     format_sql_queries: bool = Field(
         default=False, description="Whether to format sql queries"
     )
+    query_fingerprinting: bool = Field(
+        default=False,
+        description="Whether to count queries that only differ in their literal values, comments or whitespace as the same query. The first such query seen is the one reported among the top queries.",
+    )
+    max_tracked_queries: Optional[pydantic.PositiveInt] = Field(
+        default=None,
+        description="Maximum number of distinct queries tracked per table and time bucket. When set, the top queries are estimated with a heavy-hitters sketch instead of counting every distinct query. Must be at least top_n_queries.",
+    )
+    max_aggregates_in_memory: Optional[pydantic.PositiveInt] = Field(
+        default=None,
+        description="Maximum number of per-table usage aggregates held in memory. Beyond that, the aggregates of the least recently updated time buckets are spilled to a temporary directory on local disk.",
+    )
+    bucket_emit_lateness: Optional[timedelta] = Field(
+        default=None,
+        description="When set, the usage of a time bucket is emitted as soon as an event this long after the end of the bucket has been seen, instead of after all events were read. Later events for that bucket are dropped, so this should cover how far out of order the events may arrive.",
+    )
 
     @pydantic.validator("top_n_queries")
     def ensure_top_n_queries_is_not_too_big(cls, v: int) -> int:
@@ -160,3 +407,14 @@ class BaseUsageConfig(BaseTimeWindowConfig):
                 f"top_n_queries is set to {v} but it can be maximum {max_queries}"
             )
         return v
+
+    @pydantic.validator("max_tracked_queries")
+    def ensure_max_tracked_queries_covers_top_n_queries(
+        cls, v: Optional[int], values: Dict[str, Any]
+    ) -> Optional[int]:
+        top_n_queries = values.get("top_n_queries")
+        if v is not None and top_n_queries is not None and v < top_n_queries:
+            raise ValueError(
+                f"max_tracked_queries is set to {v} but it must be at least top_n_queries ({top_n_queries})"
+            )
+        return v
@@ -55,6 +55,14 @@ class BigQueryUsageConfig(DatasetSourceConfigBase, BaseUsageConfig):
     table_pattern: AllowDenyPattern = AllowDenyPattern.allow_all()
     dataset_pattern: AllowDenyPattern = AllowDenyPattern.allow_all()
     log_page_size: pydantic.PositiveInt = 1000
+    log_fetch_parallelism: pydantic.PositiveInt = pydantic.Field(
+        default=1,
+        description="Maximum number of audit log fetches (across projects, datasets and time slices) to run concurrently.",
+    )
+    log_fetch_time_slices: pydantic.PositiveInt = pydantic.Field(
+        default=1,
+        description="Number of consecutive time slices to split the audit log fetch of each project or dataset into. Together with log_fetch_parallelism, this allows fetching a long time range concurrently.",
+    )
 
     query_log_delay: Optional[pydantic.PositiveInt] = None
     max_query_duration: timedelta = timedelta(minutes=15)
@@ -24,6 +24,8 @@ class BigQueryUsageSourceReport(SourceReport):
     log_entry_end_time: Optional[str] = None
     num_usage_workunits_emitted: Optional[int] = None
     num_operational_stats_workunits_emitted: Optional[int] = None
+    num_spilled_usage_buckets: Optional[int] = None
+    num_late_usage_events_dropped: Optional[int] = None
 
     def report_dropped(self, key: str) -> None:
         self.dropped_table[key] += 1
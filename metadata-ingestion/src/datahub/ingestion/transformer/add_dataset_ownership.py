@@ -70,6 +70,19 @@ class AddDatasetOwnership(DatasetOwnershipTransformer):
         config = AddDatasetOwnershipConfig.parse_obj(config_dict)
         return cls(config, ctx)
 
+    def prefetch(self, entity_urns: List[str]) -> None:
+        if self.config.semantics == Semantics.PATCH:
+            assert self.ctx.graph
+            self.ctx.graph.prefetch_aspects(
+                [
+                    urn
+                    for urn in entity_urns
+                    if DataHubGraph._guess_entity_type(urn) in self.entity_types()
+                ],
+                aspect_type=OwnershipClass,
+                aspect="ownership",
+            )
+
     @staticmethod
     def get_ownership_to_set(
         graph: DataHubGraph, urn: str, mce_ownership: Optional[OwnershipClass]
@@ -124,6 +137,12 @@ class AddDatasetOwnership(DatasetOwnershipTransformer):
                 patch_ownership = AddDatasetOwnership.get_ownership_to_set(
                     self.ctx.graph, mce.proposedSnapshot.urn, ownership
                 )
+                if patch_ownership:
+                    # Later lookups of this entity, e.g. by a chained transformer,
+                    # see the ownership that is about to be written.
+                    self.ctx.graph.cache_aspect(
+                        mce.proposedSnapshot.urn, "ownership", patch_ownership
+                    )
                 builder.set_aspect(
                     mce, aspect=patch_ownership, aspect_type=OwnershipClass
                 )
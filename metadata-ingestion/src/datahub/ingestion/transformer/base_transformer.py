@@ -1,12 +1,18 @@
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Any, Dict, Iterable, List, Optional, Type, Union
+from typing import Dict, Iterable, List, Optional, Type, Union
 
 import datahub.emitter.mce_builder
 from datahub.emitter.mce_builder import Aspect
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
-from datahub.ingestion.api.common import ControlRecord, EndOfStream, RecordEnvelope
+from datahub.ingestion.api.common import (
+    ControlRecord,
+    EndOfStream,
+    PipelineContext,
+    RecordEnvelope,
+)
 from datahub.ingestion.api.transform import Transformer
+from datahub.ingestion.transformer.entity_state import EntityStateStore
 from datahub.metadata.schema_classes import (
     BrowsePathsClass,
     ChangeTypeClass,
@@ -95,7 +101,7 @@ class BaseTransformer(Transformer, metaclass=ABCMeta):
         return ["*"]
 
     def __init__(self):
-        self.entity_map: Dict[str, Dict[str, Any]] = {}
+        self._entity_state: Optional[EntityStateStore] = None
         self.entity_type_mappings: Dict[str, Type] = {
             "dataset": DatasetSnapshotClass,
             "dataFlow": DataFlowSnapshotClass,
@@ -110,6 +116,22 @@ class BaseTransformer(Transformer, metaclass=ABCMeta):
                 "Class does not implement one of required traits {self.allowed_mixins}"
             )
 
+    @property
+    def entity_state(self) -> EntityStateStore:
+        # Subclasses only set self.ctx after calling __init__, so the store is
+        # created on first use.
+        if self._entity_state is None:
+            ctx: Optional[PipelineContext] = getattr(self, "ctx", None)
+            self._entity_state = EntityStateStore(
+                ctx.transformer_state_dir if ctx else None
+            )
+        return self._entity_state
+
+    def close(self) -> None:
+        if self._entity_state is not None:
+            self._entity_state.close()
+            self._entity_state = None
+
     def _should_process(
         self,
         record: Union[
@@ -141,22 +163,17 @@ class BaseTransformer(Transformer, metaclass=ABCMeta):
         return True
 
     def _record_mce(self, mce: MetadataChangeEventClass) -> None:
-        record_entry = self.entity_map.get(mce.proposedSnapshot.urn, {"seen": {}})
-        if "seen" in record_entry:
-            # we just record the system metadata field from the mce, since we might need it later
-            record_entry["seen"]["mce"] = mce.systemMetadata
-            self.entity_map[mce.proposedSnapshot.urn] = record_entry
+        # we just record the system metadata field from the mce, since we might need it later
+        self.entity_state.record_mce(mce.proposedSnapshot.urn, mce.systemMetadata)
 
     def _record_mcp(self, mcp: MetadataChangeProposalWrapper) -> None:
         assert mcp.entityUrn
-        record_entry = self.entity_map.get(mcp.entityUrn, {"seen": {}})
-        if "seen" in record_entry and "mcp" not in record_entry["seen"]:
-            # only record the first mcp seen
-            record_entry["seen"]["mcp"] = mcp
-        self.entity_map[mcp.entityUrn] = record_entry
+        # only the system metadata of the first mcp seen is needed later on, since mcps
+        # carrying the aspect we are interested in mark the entity as processed
+        self.entity_state.record_mcp(mcp.entityUrn, mcp.systemMetadata)
 
     def _mark_processed(self, entity_urn: str) -> None:
-        self.entity_map[entity_urn] = {"processed": True}
+        self.entity_state.mark_processed(entity_urn)
 
     def _transform_or_record_mce(
         self,
@@ -249,42 +266,34 @@ class BaseTransformer(Transformer, metaclass=ABCMeta):
                 self, SingleAspectTransformer
             ):
                 # walk through state and call transform for any unprocessed entities
-                for urn, state in self.entity_map.items():
-                    if "seen" in state:
-                        # call transform on this entity_urn
-                        last_seen_mcp = state["seen"].get("mcp")
-                        last_seen_mce_system_metadata = state["seen"].get("mce")
-
-                        transformed_aspect = self.transform_aspect(
-                            entity_urn=urn,
-                            aspect_name=self.aspect_name(),
-                            aspect=last_seen_mcp.aspect
-                            if last_seen_mcp
-                            and last_seen_mcp.aspectName == self.aspect_name()
-                            else None,
+                for urn, system_metadata in self.entity_state.unprocessed():
+                    # call transform on this entity_urn; the aspect was not seen, since
+                    # seeing it would have marked the entity as processed
+                    transformed_aspect = self.transform_aspect(
+                        entity_urn=urn,
+                        aspect_name=self.aspect_name(),
+                        aspect=None,
+                    )
+                    if transformed_aspect:
+                        # for end of stream records, we modify the workunit-id
+                        structured_urn = Urn.create_from_string(urn)
+                        simple_name = "-".join(structured_urn.get_entity_id())
+                        record_metadata = envelope.metadata.copy()
+                        record_metadata.update(
+                            {
+                                "workunit_id": f"txform-{simple_name}-{self.aspect_name()}"
+                            }
+                        )
+                        yield RecordEnvelope(
+                            record=MetadataChangeProposalWrapper(
+                                entityUrn=urn,
+                                entityType=structured_urn.get_type(),
+                                changeType=ChangeTypeClass.UPSERT,
+                                systemMetadata=system_metadata,
+                                aspectName=self.aspect_name(),
+                                aspect=transformed_aspect,
+                            ),
+                            metadata=record_metadata,
                         )
-                        if transformed_aspect:
-                            # for end of stream records, we modify the workunit-id
-                            structured_urn = Urn.create_from_string(urn)
-                            simple_name = "-".join(structured_urn.get_entity_id())
-                            record_metadata = envelope.metadata.copy()
-                            record_metadata.update(
-                                {
-                                    "workunit_id": f"txform-{simple_name}-{self.aspect_name()}"
-                                }
-                            )
-                            yield RecordEnvelope(
-                                record=MetadataChangeProposalWrapper(
-                                    entityUrn=urn,
-                                    entityType=structured_urn.get_type(),
-                                    changeType=ChangeTypeClass.UPSERT,
-                                    systemMetadata=last_seen_mcp.systemMetadata
-                                    if last_seen_mcp
-                                    else last_seen_mce_system_metadata,
-                                    aspectName=self.aspect_name(),
-                                    aspect=transformed_aspect,
-                                ),
-                                metadata=record_metadata,
-                            )
-                    self._mark_processed(urn)
+                self.entity_state.mark_all_processed()
             yield envelope
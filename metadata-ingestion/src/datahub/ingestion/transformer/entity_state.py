@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from datahub.emitter.mce_builder import get_sys_time
+from datahub.metadata.schema_classes import SystemMetadataClass
+
+_PROCESSED = 0
+
+_SQLITE_FETCH_SIZE = 1000
+
+
+class _InMemoryStates:
+    def __init__(self) -> None:
+        self._states: Dict[str, int] = {}
+
+    def get(self, urn: str) -> Optional[int]:
+        return self._states.get(urn)
+
+    def set(self, urn: str, state: int) -> None:
+        self._states[sys.intern(urn)] = state
+
+    def unprocessed(self) -> Iterator[Tuple[str, int]]:
+        for urn, state in self._states.items():
+            if state != _PROCESSED:
+                yield urn, state
+
+    def mark_all_processed(self) -> None:
+        for urn in self._states:
+            self._states[urn] = _PROCESSED
+
+
+class _SqliteStates:
+    def __init__(self, state_dir: str) -> None:
+        self._tempdir = tempfile.TemporaryDirectory(dir=state_dir)
+        # With pipelined execution, the transformer runs in another thread than the
+        # one that emits the unprocessed entities at the end of the stream.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(self._tempdir.name, "state.db"), check_same_thread=False
+        )
+        # The database is scratch space, which does not need to survive a crash.
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute("CREATE TABLE states (urn TEXT PRIMARY KEY, state INTEGER)")
+
+    def get(self, urn: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM states WHERE urn = ?", (urn,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, urn: str, state: int) -> None:
+        with self._lock:
+            # Updating rather than replacing keeps the rowid, and with it the order
+            # in which the entities were first seen.
+            cursor = self._conn.execute(
+                "UPDATE states SET state = ? WHERE urn = ?", (state, urn)
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute("INSERT INTO states VALUES (?, ?)", (urn, state))
+
+    def unprocessed(self) -> Iterator[Tuple[str, int]]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT urn, state FROM states WHERE state != ? ORDER BY rowid",
+                (_PROCESSED,),
+            )
+        while True:
+            # The lock is not held while the rows are consumed.
+            with self._lock:
+                rows = cursor.fetchmany(_SQLITE_FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+    def mark_all_processed(self) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE states SET state = ?", (_PROCESSED,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        self._tempdir.cleanup()
+
+
+class EntityStateStore:
+    """
+    Keeps track of the entities that passed through a transformer: whether the
+    transformer processed them and, if not, the system metadata to emit the
+    entity's transformed aspect with at the end of the stream.
+
+    The system metadata is kept without its lastObserved time, which is stamped
+    anew when the aspect is emitted if there was one. Entity urns are interned, so
+    that chained transformers share them, and each distinct system metadata is
+    stored once, so that the state of an entity is a single small integer. If a
+    state directory is given, these integers are kept in a SQLite database in it
+    rather than in memory.
+    """
+
+    def __init__(self, state_dir: Optional[str] = None):
+        self._states = _SqliteStates(state_dir) if state_dir else _InMemoryStates()
+
+        # State s > 0 refers to self._seen[s - 1], which holds whether the system
+        # metadata came from an MCP, the system metadata without its lastObserved
+        # time, serialized, and whether it had a lastObserved time.
+        self._seen: List[Tuple[bool, Optional[str], bool]] = []
+        self._seen_ids: Dict[Tuple[bool, Optional[str], bool], int] = {}
+
+    def _get_seen_state(
+        self, from_mcp: bool, system_metadata: Optional[SystemMetadataClass]
+    ) -> int:
+        serialized: Optional[str] = None
+        if system_metadata is not None:
+            obj = system_metadata.to_obj()
+            obj.pop("lastObserved", None)
+            serialized = json.dumps(obj, sort_keys=True)
+        key = (
+            from_mcp,
+            serialized,
+            bool(system_metadata and system_metadata.lastObserved),
+        )
+        state = self._seen_ids.get(key)
+        if state is None:
+            self._seen.append(key)
+            state = len(self._seen)
+            self._seen_ids[key] = state
+        return state
+
+    def _get_system_metadata(self, state: int) -> Optional[SystemMetadataClass]:
+        _, serialized, observed = self._seen[state - 1]
+        if serialized is None:
+            return None
+        # Each aspect gets its own copy, which may be modified further down.
+        system_metadata = SystemMetadataClass.from_obj(json.loads(serialized))
+        if observed:
+            system_metadata.lastObserved = get_sys_time()
+        return system_metadata
+
+    def record_mcp(
+        self, urn: str, system_metadata: Optional[SystemMetadataClass]
+    ) -> None:
+        """Records an MCP of an unprocessed entity. Only the first one counts."""
+        state = self._states.get(urn)
+        if state is None or (state != _PROCESSED and not self._seen[state - 1][0]):
+            self._states.set(urn, self._get_seen_state(True, system_metadata))
+
+    def record_mce(
+        self, urn: str, system_metadata: Optional[SystemMetadataClass]
+    ) -> None:
+        """Records an MCE of an unprocessed entity. It counts until an MCP is seen."""
+        state = self._states.get(urn)
+        if state is None or (state != _PROCESSED and not self._seen[state - 1][0]):
+            self._states.set(urn, self._get_seen_state(False, system_metadata))
+
+    def mark_processed(self, urn: str) -> None:
+        self._states.set(urn, _PROCESSED)
+
+    def unprocessed(self) -> Iterator[Tuple[str, Optional[SystemMetadataClass]]]:
+        """
+        Yields the unprocessed entities, in the order they were first seen, along
+        with the system metadata to emit their transformed aspect with. States must
+        not be changed while iterating.
+        """
+        for urn, state in self._states.unprocessed():
+            yield urn, self._get_system_metadata(state)
+
+    def mark_all_processed(self) -> None:
+        self._states.mark_all_processed()
+
+    def close(self) -> None:
+        if isinstance(self._states, _SqliteStates):
+            self._states.close()
@@ -0,0 +1,124 @@
+import enum
+import gzip
+import io
+import logging
+import zlib
+from typing import IO, Any
+
+from datahub.configuration.common import ConfigurationError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_READ_CHUNK_SIZE = 1024 * 1024
+# Favours speed over ratio, like gzip's and zstd's own command line defaults.
+_GZIP_COMPRESS_LEVEL = 6
+
+
+class _GzipReader(io.RawIOBase):
+    # Unlike gzip.GzipFile, this returns the data of a truncated gzip stream rather
+    # than raising an EOFError, so that files from runs which did not complete can
+    # still be read.
+
+    def __init__(self, f: IO[bytes], name: str):
+        self._file = f
+        self._name = name
+        self._decompressor: Any = zlib.decompressobj(wbits=31)
+        self._in_member = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        data = b""
+        while not data:
+            if self._decompressor.eof:
+                # Files can contain several concatenated gzip members.
+                compressed = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(wbits=31)
+                self._in_member = False
+            else:
+                compressed = self._decompressor.unconsumed_tail
+            if not compressed:
+                compressed = self._file.read(_READ_CHUNK_SIZE)
+                if not compressed:
+                    if self._in_member:
+                        logger.warning(f"{self._name} is truncated")
+                        self._in_member = False
+                    return 0
+            self._in_member = True
+            data = self._decompressor.decompress(compressed, len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_text_for_reading(path: str) -> IO[str]:
+    """
+    Opens a text file for streaming reads, transparently decompressing it if it is
+    gzip or zstd compressed. The compression is detected from the file's contents
+    rather than its name.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+
+    if magic.startswith(_GZIP_MAGIC):
+        return io.TextIOWrapper(
+            io.BufferedReader(_GzipReader(open(path, "rb"), path)), encoding="utf-8"
+        )
+    elif magic.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ConfigurationError(
+                f"{path} is zstd compressed, which requires the zstandard package to be installed"
+            )
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+            encoding="utf-8",
+        )
+    return open(path, "r", encoding="utf-8")
+
+
+class FileCompression(str, enum.Enum):
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+def wrap_for_writing(f: IO[bytes], compression: FileCompression) -> IO[bytes]:
+    """
+    Wraps a binary file in a stream that compresses what is written to it. Flushing
+    the stream flushes the data written so far to the file, so that it can be
+    decompressed even if the stream is never closed. Closing it leaves the file
+    open.
+    """
+    if compression == FileCompression.GZIP:
+        return gzip.GzipFile(fileobj=f, mode="wb")
+    elif compression == FileCompression.ZSTD:
+        check_compression_supported(compression)
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def check_compression_supported(compression: FileCompression) -> None:
+    if compression == FileCompression.ZSTD and zstandard is None:
+        raise ConfigurationError(
+            "zstd compression requires the zstandard package to be installed"
+        )
+
+
+def compress(data: bytes, compression: FileCompression) -> bytes:
+    """Compresses data in one go, e.g. to send it as a request body."""
+    if compression == FileCompression.GZIP:
+        return gzip.compress(data, compresslevel=_GZIP_COMPRESS_LEVEL)
+    elif compression == FileCompression.ZSTD:
+        check_compression_supported(compression)
+        return zstandard.ZstdCompressor().compress(data)
+    raise ValueError(f"Unsupported compression: {compression}")
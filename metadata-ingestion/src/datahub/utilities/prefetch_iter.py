@@ -0,0 +1,96 @@
+import queue
+import threading
+from typing import Any, Generic, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+def _put(q: "queue.Queue[Any]", stop: threading.Event, item: Any) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce(
+    iterable: Iterable[Any],
+    q: "queue.Queue[Any]",
+    stop: threading.Event,
+    semaphore: Optional[threading.Semaphore],
+) -> None:
+    # This does not reference the PrefetchIterator itself, so that an abandoned
+    # iterator can be garbage collected, which stops this thread.
+    try:
+        iterator = iter(iterable)
+        while not stop.is_set():
+            if semaphore is None:
+                item = next(iterator, _END)
+            else:
+                with semaphore:
+                    item = next(iterator, _END)
+            if item is _END:
+                break
+            if not _put(q, stop, item):
+                return
+    except Exception as e:
+        _put(q, stop, _Failure(e))
+        return
+    _put(q, stop, _END)
+
+
+class PrefetchIterator(Generic[T], Iterator[T]):
+    """
+    Iterates over an iterable on a background thread, keeping up to `buffer_size`
+    items ahead of the consumer. The thread starts as soon as the iterator is
+    created, so several of these fetch concurrently even if they are consumed one
+    after another. Exceptions raised by the iterable are re-raised to the consumer.
+
+    If a semaphore is given, it is held while pulling each item from the iterable.
+    Sharing it between iterators bounds how many of them fetch at the same time,
+    without a thread that is waiting for its consumer blocking any of the others.
+    """
+
+    def __init__(
+        self,
+        iterable: Iterable[T],
+        buffer_size: int,
+        semaphore: Optional[threading.Semaphore] = None,
+    ):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._done = False
+        threading.Thread(
+            target=_produce,
+            args=(iterable, self._queue, self._stop, semaphore),
+            daemon=True,
+        ).start()
+
+    def __next__(self) -> T:
+        if self._done:
+            raise StopIteration
+        item = self._queue.get()
+        if item is _END:
+            self._done = True
+            raise StopIteration
+        if isinstance(item, _Failure):
+            self._done = True
+            raise item.exception
+        return item
+
+    def close(self) -> None:
+        """Stops the background thread early, e.g. when the consumer gives up."""
+        self._done = True
+        self._stop.set()
+
+    def __del__(self) -> None:
+        self._stop.set()
@@ -1,10 +1,26 @@
+import hashlib
 import logging
-from typing import Any
+import re
+from typing import Any, Match
 
 import sqlparse
 
 logger = logging.getLogger(__name__)
 
+# Scans a query left to right, so that quotes inside comments and comment markers
+# inside literals do not confuse the normalization.
+_QUERY_TOKEN_REGEX = re.compile(
+    r"""
+    (?P<identifier>"(?:[^"]|"")*"|`[^`]*`)
+    |(?P<string>'(?:[^'\\]|''|\\.)*')
+    |(?P<comment>--[^\n]*|/\*.*?\*/)
+    |(?P<number>\b\d+(?:\.\d*)?(?:[eE][-+]?\d+)?\b)
+    |(?P<whitespace>\s+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_VALUE_LIST_REGEX = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
 
 def format_sql_query(query: str, **options: Any) -> str:
     try:
@@ -12,3 +28,23 @@ def format_sql_query(query: str, **options: Any) -> str:
     except Exception as e:
         logger.debug(f"Exception:{e} while formatting query '{query}'.")
         return query
+
+
+def _normalize_query_token(match: Match) -> str:
+    kind = match.lastgroup
+    if kind in ("string", "number"):
+        return "?"
+    elif kind in ("comment", "whitespace"):
+        return " "
+    return match.group()
+
+
+def get_query_fingerprint(query: str) -> str:
+    """
+    Returns a fingerprint that is shared by queries differing only in their literal
+    values, comments or whitespace, e.g. the executions of a parameterized query.
+    """
+    normalized = _QUERY_TOKEN_REGEX.sub(_normalize_query_token, query)
+    normalized = _VALUE_LIST_REGEX.sub("(?)", normalized)
+    normalized = " ".join(normalized.split())
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()
@@ -1,13 +1,17 @@
 import logging
 import multiprocessing
 import re
-import sys
-import traceback
 from abc import ABCMeta, abstractmethod
-from multiprocessing import Process, Queue
-from typing import List, Optional, Tuple, Type
+from typing import List, Tuple
 
-from datahub.utilities.sql_lineage_parser_impl import SqlLineageSQLParserImpl
+from datahub.utilities.sql_parser_cache import (
+    get_default_sql_parse_cache,
+    make_cache_key,
+)
+from datahub.utilities.sql_parser_pool import (
+    get_default_sql_parser_pool,
+    parse_with_sql_lineage,
+)
 
 try:
     from sql_metadata import Parser as MetadataSQLParser
@@ -95,20 +99,7 @@ def sql_lineage_parser_impl_func_wrapper(
     :param sql_query: The SQL query to extract the tables & columns from.
     :return: None.
     """
-    exception_details: Optional[Tuple[Optional[Type[BaseException]], str]] = None
-    tables: List[str] = []
-    columns: List[str] = []
-    try:
-        parser = SqlLineageSQLParserImpl(sql_query)
-        tables = parser.get_tables()
-        columns = parser.get_columns()
-    except BaseException:
-        exc_info = sys.exc_info()
-        exc_msg: str = str(exc_info[1]) + "".join(traceback.format_tb(exc_info[2]))
-        exception_details = (exc_info[0], exc_msg)
-        logger.error(exc_msg)
-    finally:
-        queue.put((tables, columns, exception_details))
+    queue.put(parse_with_sql_lineage(sql_query))
 
 
 class SqlLineageSQLParser(SQLParser):
@@ -120,23 +111,18 @@ class SqlLineageSQLParser(SQLParser):
     def _get_tables_columns_process_wrapped(
         sql_query: str,
     ) -> Tuple[List[str], List[str]]:
-        # Invoke sql_lineage_parser_impl_func_wrapper in a separate process to avoid
-        # memory leaks from sqllineage module used by SqlLineageSQLParserImpl. This will help
+        # Parse in one of the long-lived worker processes of the shared pool to
+        # avoid memory leaks from sqllineage module used by SqlLineageSQLParserImpl. This will help
         # shield our sources like lookml & redash, that need to parse a large number of SQL statements,
         # from causing significant memory leaks in the datahub cli during ingestion.
-        queue: multiprocessing.Queue = Queue()
-        process: multiprocessing.Process = Process(
-            target=sql_lineage_parser_impl_func_wrapper,
-            args=(
-                queue,
-                sql_query,
-            ),
-        )
-        process.start()
-        tables, columns, exception_details = queue.get(block=True)
-        if exception_details is not None:
-            raise exception_details[0](f"Sub-process exception: {exception_details[1]}")
-        return tables, columns
+        # Identical queries are only parsed once, see get_default_sql_parse_cache.
+        cache = get_default_sql_parse_cache()
+        key = make_cache_key(SqlLineageSQLParser.__name__, sql_query)
+        result = cache.get(key)
+        if result is None:
+            result = get_default_sql_parser_pool().submit(sql_query).result()
+            cache.put(key, result)
+        return result
 
     def get_tables(self) -> List[str]:
         return self.tables
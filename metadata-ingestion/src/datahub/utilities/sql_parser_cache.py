@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import datahub
+
+logger = logging.getLogger(__name__)
+
+# If set, parse results are also kept in a SQLite database in this directory, so
+# that they are reused across runs.
+CACHE_DIR_ENV_VARIABLE = "DATAHUB_SQL_PARSE_CACHE_DIR"
+# The number of parse results kept in memory.
+CACHE_SIZE_ENV_VARIABLE = "DATAHUB_SQL_PARSE_CACHE_SIZE"
+
+_CACHE_FILE_NAME = "sql_parse_cache.db"
+
+_TablesColumns = Tuple[List[str], List[str]]
+
+
+# Quoted literals and identifiers, and comments, whose whitespace is kept as is.
+# An unterminated one runs to the end of the query.
+_VERBATIM_SQL_REGEX = re.compile(
+    r"""'(?:[^'\\]|\\.)*(?:'|\Z)"""
+    r"""|"(?:[^"\\]|\\.)*(?:"|\Z)"""
+    r"""|`[^`]*(?:`|\Z)"""
+    r"""|--[^\n]*"""
+    r"""|/\*.*?(?:\*/|\Z)""",
+    re.DOTALL,
+)
+
+
+def _normalize_whitespace(sql_fragment: str) -> str:
+    # Line breaks are kept since they end single line comments.
+    sql_fragment = re.sub(r"[ \t\f\v]+", " ", sql_fragment)
+    return re.sub(r" ?(\r?\n) ?", r"\1", sql_fragment)
+
+
+def _normalize_sql(sql_query: str) -> str:
+    # Only whitespace that cannot change how the query parses is normalized,
+    # which excludes the whitespace in literals and comments.
+    parts = []
+    end = 0
+    for match in _VERBATIM_SQL_REGEX.finditer(sql_query):
+        parts.append(_normalize_whitespace(sql_query[end : match.start()]))
+        parts.append(match.group())
+        end = match.end()
+    parts.append(_normalize_whitespace(sql_query[end:]))
+    return "".join(parts).strip()
+
+
+def make_cache_key(parser_name: str, sql_query: str) -> str:
+    """
+    Hashes the parser, the normalized query and the datahub version, which stands
+    in for the version of the parser's code.
+    """
+    key = "\0".join([datahub.__version__, parser_name, _normalize_sql(sql_query)])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class SqlParseCache:
+    """
+    A cache of the tables and columns parsed from SQL queries, keyed by
+    make_cache_key. It keeps the most recently used results in memory and, if a
+    cache directory is given, all results in a SQLite database in it.
+    """
+
+    def __init__(self, max_size: int = 10000, cache_dir: Optional[str] = None):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _TablesColumns]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(cache_dir, _CACHE_FILE_NAME),
+                check_same_thread=False,
+                # Several ingestion runs may share the cache directory.
+                timeout=30,
+                isolation_level=None,
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, tables TEXT, columns TEXT)"
+            )
+
+    def get(self, key: str) -> Optional[_TablesColumns]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT tables, columns FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    result = (json.loads(row[0]), json.loads(row[1]))
+                    self._put_in_memory(key, result)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Callers get copies, so that they are free to modify the lists.
+            return list(result[0]), list(result[1])
+
+    def put(self, key: str, result: _TablesColumns) -> None:
+        tables, columns = list(result[0]), list(result[1])
+        with self._lock:
+            self._put_in_memory(key, (tables, columns))
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                        (key, json.dumps(tables), json.dumps(columns)),
+                    )
+                except sqlite3.Error as e:
+                    # The on-disk tier is only an optimization.
+                    logger.warning(f"Failed to persist SQL parse result: {e}")
+
+    def _put_in_memory(self, key: str, result: _TablesColumns) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache: Optional[SqlParseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_sql_parse_cache() -> SqlParseCache:
+    """
+    Returns the cache shared by the SQL parsers. It is configured with the
+    DATAHUB_SQL_PARSE_CACHE_DIR and DATAHUB_SQL_PARSE_CACHE_SIZE environment
+    variables.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SqlParseCache(
+                max_size=int(os.getenv(CACHE_SIZE_ENV_VARIABLE, "10000")),
+                cache_dir=os.getenv(CACHE_DIR_ENV_VARIABLE),
+            )
+        return _default_cache
@@ -0,0 +1,255 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import traceback
+from multiprocessing.connection import Connection
+from typing import Iterable, List, Optional, Tuple, Type
+
+import psutil
+
+from datahub.utilities.sql_lineage_parser_impl import SqlLineageSQLParserImpl
+
+logger = logging.getLogger(__name__)
+
+# The number of worker processes of the pool that SqlLineageSQLParser uses.
+NUM_WORKERS_ENV_VARIABLE = "DATAHUB_SQL_PARSER_WORKERS"
+
+_ExceptionDetails = Tuple[Optional[Type[BaseException]], str]
+_ParseResult = Tuple[List[str], List[str], Optional[_ExceptionDetails]]
+_Task = Tuple[str, concurrent.futures.Future]
+
+
+def parse_with_sql_lineage(sql_query: str) -> _ParseResult:
+    """
+    Computes the tables and columns of the query using SqlLineageSQLParserImpl. Any
+    exception is returned rather than raised, along with its formatted traceback,
+    so that the result can be sent back from a worker process.
+    """
+    exception_details: Optional[_ExceptionDetails] = None
+    tables: List[str] = []
+    columns: List[str] = []
+    try:
+        parser = SqlLineageSQLParserImpl(sql_query)
+        tables = parser.get_tables()
+        columns = parser.get_columns()
+    except BaseException:
+        exc_info = sys.exc_info()
+        exc_msg: str = str(exc_info[1]) + "".join(traceback.format_tb(exc_info[2]))
+        exception_details = (exc_info[0], exc_msg)
+        logger.error(exc_msg)
+    return tables, columns, exception_details
+
+
+def _worker_main(conn: Connection, max_rss_bytes: int) -> None:
+    process = psutil.Process()
+    while True:
+        try:
+            sql_query = conn.recv()
+        except EOFError:
+            return
+        if sql_query is None:
+            return
+        result = parse_with_sql_lineage(sql_query)
+        # sqllineage leaks memory, so a worker that has grown too large retires.
+        retire = process.memory_info().rss > max_rss_bytes
+        conn.send((result, retire))
+        if retire:
+            return
+
+
+class _Worker:
+    def __init__(self, max_rss_bytes: int) -> None:
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, max_rss_bytes), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self.num_parses = 0
+
+    def parse(
+        self, sql_query: str, timeout_sec: Optional[float]
+    ) -> Tuple[_ParseResult, bool]:
+        self._conn.send(sql_query)
+        if not self._conn.poll(timeout_sec):
+            raise TimeoutError(f"Parsing the query took longer than {timeout_sec}s")
+        try:
+            result, retire = self._conn.recv()
+        except EOFError:
+            raise RuntimeError(
+                f"SQL parser worker exited unexpectedly with exit code {self._process.exitcode}"
+            )
+        self.num_parses += 1
+        return result, retire
+
+    def stop(self) -> None:
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+        self._process.join(timeout=5)
+        self.kill()
+
+    def kill(self) -> None:
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._conn.close()
+
+
+def _make_exception(exception_details: _ExceptionDetails) -> BaseException:
+    exception_type, exception_message = exception_details
+    message = f"Sub-process exception: {exception_message}"
+    try:
+        return (exception_type or Exception)(message)
+    except Exception:
+        # Not every exception type can be constructed from just a message.
+        return Exception(message)
+
+
+class SqlParserPool:
+    """
+    A pool of long-lived worker processes that parse SQL queries with sqllineage.
+    Parsing in separate processes shields the ingestion from sqllineage's memory
+    leaks; keeping the processes around, rather than starting one per query,
+    avoids paying for a process start-up on every query.
+
+    Workers are started on demand, and replaced after max_parses_per_worker
+    parses, once their resident memory exceeds max_worker_rss_bytes, or when a
+    query takes longer than parse_timeout_sec to parse.
+    """
+
+    DEFAULT_MAX_PARSES_PER_WORKER = 1000
+    DEFAULT_MAX_WORKER_RSS_BYTES = 1024 * 1024 * 1024
+    DEFAULT_PARSE_TIMEOUT_SEC = 300.0
+
+    def __init__(
+        self,
+        num_workers: int = 1,
+        max_parses_per_worker: int = DEFAULT_MAX_PARSES_PER_WORKER,
+        max_worker_rss_bytes: int = DEFAULT_MAX_WORKER_RSS_BYTES,
+        parse_timeout_sec: Optional[float] = DEFAULT_PARSE_TIMEOUT_SEC,
+    ) -> None:
+        self.max_parses_per_worker = max_parses_per_worker
+        self.max_worker_rss_bytes = max_worker_rss_bytes
+        self.parse_timeout_sec = parse_timeout_sec
+
+        self.workers_started = 0
+        self.workers_recycled = 0
+        self.parse_timeouts = 0
+
+        self._lock = threading.Lock()
+        self._closed = False
+        self._tasks: "queue.Queue[Optional[_Task]]" = queue.Queue()
+        # Each worker process is driven by a thread of its own.
+        self._threads = [
+            threading.Thread(
+                target=self._run_worker, name=f"sql-parser-pool-{i}", daemon=True
+            )
+            for i in range(num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, sql_query: str) -> concurrent.futures.Future:
+        """
+        Queues the query for parsing. The returned future resolves to its tables
+        and columns, or to the exception raised while parsing it.
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The SQL parser pool is closed")
+            self._tasks.put((sql_query, future))
+        return future
+
+    def parse_batch(
+        self, sql_queries: Iterable[str]
+    ) -> List[concurrent.futures.Future]:
+        return [self.submit(sql_query) for sql_query in sql_queries]
+
+    def close(self) -> None:
+        """Stops the workers once the queued queries have been parsed."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._threads:
+                self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> "SqlParserPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self.max_worker_rss_bytes)
+        with self._lock:
+            self.workers_started += 1
+        return worker
+
+    def _run_worker(self) -> None:
+        worker: Optional[_Worker] = None
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    return
+                sql_query, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if worker is None:
+                        worker = self._start_worker()
+                    result, retire = worker.parse(sql_query, self.parse_timeout_sec)
+                except Exception as e:
+                    # The worker is stuck or gone, and gets replaced.
+                    if isinstance(e, TimeoutError):
+                        with self._lock:
+                            self.parse_timeouts += 1
+                    if worker is not None:
+                        worker.kill()
+                        worker = None
+                    future.set_exception(e)
+                    continue
+
+                tables, columns, exception_details = result
+                if exception_details is not None:
+                    future.set_exception(_make_exception(exception_details))
+                else:
+                    future.set_result((tables, columns))
+
+                if retire or worker.num_parses >= self.max_parses_per_worker:
+                    worker.stop()
+                    worker = None
+                    with self._lock:
+                        self.workers_recycled += 1
+        finally:
+            if worker is not None:
+                worker.stop()
+
+
+_default_pool: Optional[SqlParserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_sql_parser_pool() -> SqlParserPool:
+    """
+    Returns the pool shared by SqlLineageSQLParser instances. Its number of workers
+    can be set with the DATAHUB_SQL_PARSER_WORKERS environment variable.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SqlParserPool(
+                num_workers=int(os.getenv(NUM_WORKERS_ENV_VARIABLE, "1"))
+            )
+        return _default_pool
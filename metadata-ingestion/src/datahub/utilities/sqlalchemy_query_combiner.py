@@ -6,12 +6,14 @@ import logging
 import random
 import string
 import threading
+import time
 import unittest.mock
 from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import greenlet
 import sqlalchemy
 import sqlalchemy.engine
+import sqlalchemy.exc
 import sqlalchemy.sql
 from sqlalchemy.engine import Connection
 from sqlalchemy.orm.exc import MultipleResultsFound, NoResultFound
@@ -21,6 +23,32 @@ from datahub.ingestion.api.report import Report
 logger: logging.Logger = logging.getLogger(__name__)
 
 MAX_QUERIES_TO_COMBINE_AT_ONCE = 40
+MAX_COLUMNS_TO_COMBINE_AT_ONCE = 400
+
+# Upper bounds, in seconds, of the buckets of the combined query latency histogram.
+_LATENCY_HISTOGRAM_BUCKETS = [0.1, 0.5, 1, 5, 10, 30, 60, 300]
+
+# Lowercased fragments of the messages of errors that databases raise when a
+# query takes too long or is too big, which combining fewer queries may avoid.
+_BATCH_SIZE_ERROR_MESSAGES = [
+    "timeout",
+    "timed out",
+    "too large",
+    "too long",
+    "too many",
+    "too complex",
+    "exceed",
+    "at most",
+    "out of memory",
+    "resources",
+]
+
+
+def _is_batch_size_error(e: Exception) -> bool:
+    if isinstance(e, sqlalchemy.exc.TimeoutError):
+        return True
+    message = str(e).lower()
+    return any(fragment in message for fragment in _BATCH_SIZE_ERROR_MESSAGES)
 
 
 # We need to make sure that only one query combiner attempts to patch
@@ -124,6 +152,21 @@ class SQLAlchemyQueryCombinerReport(Report):
 
     query_exceptions: int = 0
 
+    combined_query_batches_split: int = 0
+    combined_query_latency_histogram: Dict[str, int] = dataclasses.field(
+        default_factory=dict
+    )
+    batch_limits_by_dialect: Dict[str, int] = dataclasses.field(default_factory=dict)
+
+    def report_combined_query_latency(self, seconds: float) -> None:
+        bucket = next(
+            (f"<={b}s" for b in _LATENCY_HISTOGRAM_BUCKETS if seconds <= b),
+            f">{_LATENCY_HISTOGRAM_BUCKETS[-1]}s",
+        )
+        self.combined_query_latency_histogram[bucket] = (
+            self.combined_query_latency_histogram.get(bucket, 0) + 1
+        )
+
 
 @dataclasses.dataclass
 class SQLAlchemyQueryCombiner:
@@ -131,6 +174,15 @@ class SQLAlchemyQueryCombiner:
     This class adds support for dynamically combining multiple SQL queries into
     a single query. Specifically, it can combine queries which each return a
     single row. It uses greenlets to manage the execution lifecycle of the queries.
+
+    The number of queries combined at once is bounded by max_queries_to_combine and
+    by the total number of columns they select, max_columns_to_combine. If the
+    serial execution fallback is enabled, a failing combined query is split in
+    halves which are retried separately. If it failed with a timeout or because
+    it was too big, the number of queries combined at once is also lowered for
+    the dialect. The same happens for combined queries that take longer than
+    max_combined_query_seconds, and the limit is gradually raised again as
+    combined queries succeed quickly.
     """
 
     enabled: bool
@@ -138,6 +190,10 @@ class SQLAlchemyQueryCombiner:
     is_single_row_query_method: Callable[[Any], bool]
     serial_execution_fallback_enabled: bool
 
+    max_queries_to_combine: int = MAX_QUERIES_TO_COMBINE_AT_ONCE
+    max_columns_to_combine: int = MAX_COLUMNS_TO_COMBINE_AT_ONCE
+    max_combined_query_seconds: float = 60
+
     # The Python GIL ensures that modifications to the report's counters
     # are safe.
     report: SQLAlchemyQueryCombinerReport = dataclasses.field(
@@ -160,6 +216,13 @@ class SQLAlchemyQueryCombiner:
         greenlet.greenlet, Set[greenlet.greenlet]
     ] = dataclasses.field(default_factory=lambda: collections.defaultdict(set))
 
+    # The number of queries that can be combined at once, as learned from
+    # combined queries that were too slow or too big.
+    _batch_limits_lock: threading.Lock = dataclasses.field(
+        default_factory=lambda: threading.Lock()
+    )
+    _batch_limits_by_dialect: Dict[str, int] = dataclasses.field(default_factory=dict)
+
     @staticmethod
     def _generate_sql_safe_identifier() -> str:
         # The value of k=16 should be more than enough to ensure uniqueness.
@@ -287,66 +350,149 @@ class SQLAlchemyQueryCombiner:
             # If not enabled, run immediately.
             method()
 
+    def _get_batch_limit(self, dialect: str) -> int:
+        with self._batch_limits_lock:
+            return self._batch_limits_by_dialect.get(
+                dialect, self.max_queries_to_combine
+            )
+
+    def _set_batch_limit(self, dialect: str, limit: int) -> None:
+        limit = max(1, min(limit, self.max_queries_to_combine))
+        with self._batch_limits_lock:
+            if limit == self._batch_limits_by_dialect.get(
+                dialect, self.max_queries_to_combine
+            ):
+                return
+            self._batch_limits_by_dialect[dialect] = limit
+        self.report.batch_limits_by_dialect[dialect] = limit
+
     def _execute_queue(self, main_greenlet: greenlet.greenlet) -> None:
         full_queue = self._get_queue(main_greenlet)
 
-        pending_queue = {k: v for k, v in full_queue.items() if not v.done}
+        pending_queue = [v for v in full_queue.values() if not v.done]
+        if not pending_queue:
+            return
 
-        pending_queue = dict(
-            itertools.islice(pending_queue.items(), MAX_QUERIES_TO_COMBINE_AT_ONCE)
-        )
+        dialect = pending_queue[0].conn.dialect.name
+        limit = self._get_batch_limit(dialect)
+        batch: List[_QueryFuture] = []
+        num_columns = 0
+        for query_future in itertools.islice(pending_queue, limit):
+            num_columns += len(get_query_columns(query_future.query))
+            if batch and num_columns > self.max_columns_to_combine:
+                break
+            batch.append(query_future)
+
+        if self._execute_batch(dialect, batch) and len(batch) >= limit:
+            # The limit was hit without any trouble, so try combining more
+            # queries at once.
+            self._set_batch_limit(dialect, limit * 2)
+
+    def _execute_batch(self, dialect: str, batch: List[_QueryFuture]) -> bool:
+        # Returns True if the whole batch was executed as a single, fast enough
+        # combined query.
+        start_time = time.perf_counter()
+        try:
+            self._execute_combined_query(batch)
+        except Exception as e:
+            if not self.serial_execution_fallback_enabled:
+                raise e
+            self.report.query_exceptions += 1
+            if len(batch) == 1:
+                logger.debug(f"Failed to execute query using combiner: {str(e)}")
+                self._execute_query_uncombined(batch[0])
+                return False
 
-        if pending_queue:
-            queue_item = next(iter(pending_queue.values()))
-
-            # Actually combine these queries together. We do this by (1) putting
-            # each query into its own CTE, (2) selecting all the columns we need
-            # and (3) extracting the results once the query finishes.
-
-            ctes = {
-                k: query_future.query.cte(k)
-                for k, query_future in pending_queue.items()
-            }
-
-            combined_cols = itertools.chain(
-                *[
-                    [
-                        col  # .label(self._generate_sql_safe_identifier())
-                        for col in get_query_columns(cte)
-                    ]
-                    for _, cte in ctes.items()
+            logger.debug(
+                f"Failed to execute {len(batch)} queries using combiner, "
+                f"retrying them in two halves: {str(e)}"
+            )
+            self.report.combined_query_batches_split += 1
+            half = len(batch) // 2
+            # Other errors are down to some query of the batch, which the
+            # halves will narrow down.
+            if _is_batch_size_error(e):
+                self._set_batch_limit(dialect, half)
+            self._execute_batch(dialect, batch[:half])
+            self._execute_batch(dialect, batch[half:])
+            return False
+
+        seconds = time.perf_counter() - start_time
+        self.report.report_combined_query_latency(seconds)
+        if seconds > self.max_combined_query_seconds and len(batch) > 1:
+            self._set_batch_limit(dialect, len(batch) // 2)
+            return False
+        return True
+
+    def _execute_combined_query(self, batch: List[_QueryFuture]) -> None:
+        queue_item = batch[0]
+
+        # Actually combine these queries together. We do this by (1) putting
+        # each query into its own CTE, (2) selecting all the columns we need
+        # and (3) extracting the results once the query finishes.
+
+        ctes = [
+            query_future.query.cte(self._generate_sql_safe_identifier())
+            for query_future in batch
+        ]
+
+        combined_cols = itertools.chain(
+            *[
+                [
+                    col  # .label(self._generate_sql_safe_identifier())
+                    for col in get_query_columns(cte)
                 ]
+                for cte in ctes
+            ]
+        )
+        combined_query = sqlalchemy.select(combined_cols)
+        for cte in ctes:
+            combined_query.append_from(cte)
+
+        logger.debug(f"Executing combined query: {str(combined_query)}")
+        self.report.combined_queries_issued += 1
+        sa_res = _sa_execute_underlying_method(queue_item.conn, combined_query)
+
+        # Fetch the results and ensure that exactly one row is returned.
+        results = sa_res.fetchall()
+        assert len(results) == 1
+        row = results[0]
+
+        # Extract the results into a result for each query.
+        index = 0
+        query_results: List[_ResultProxyFake] = []
+        for query_future in batch:
+            cols = query_future.query.columns
+
+            data = {}
+            for col in cols:
+                data[col.name] = row[index]
+                index += 1
+
+            query_results.append(_ResultProxyFake([_RowProxyFake(data)]))
+
+        # Verify that we consumed all the columns.
+        assert index == len(row)
+
+        for query_future, res in zip(batch, query_results):
+            query_future.res = res
+            query_future.done = True
+
+    def _execute_query_uncombined(self, query_future: _QueryFuture) -> None:
+        logger.debug(f"Executing query via fallback: {str(query_future.query)}")
+        self.report.uncombined_queries_issued += 1
+        try:
+            res = _sa_execute_underlying_method(
+                query_future.conn,
+                query_future.query,
+                *query_future.multiparams,
+                **query_future.params,
             )
-            combined_query = sqlalchemy.select(combined_cols)
-            for cte in ctes.values():
-                combined_query.append_from(cte)
-
-            logger.debug(f"Executing combined query: {str(combined_query)}")
-            self.report.combined_queries_issued += 1
-            sa_res = _sa_execute_underlying_method(queue_item.conn, combined_query)
-
-            # Fetch the results and ensure that exactly one row is returned.
-            results = sa_res.fetchall()
-            assert len(results) == 1
-            row = results[0]
-
-            # Extract the results into a result for each query.
-            index = 0
-            for _, query_future in pending_queue.items():
-                cols = query_future.query.columns
-
-                data = {}
-                for col in cols:
-                    data[col.name] = row[index]
-                    index += 1
-
-                res = _ResultProxyFake([_RowProxyFake(data)])
-
-                query_future.res = res
-                query_future.done = True
-
-            # Verify that we consumed all the columns.
-            assert index == len(row)
+            query_future.res = res
+        except Exception as e:
+            query_future.exc = e
+        finally:
+            query_future.done = True
 
     def _execute_queue_fallback(self, main_greenlet: greenlet.greenlet) -> None:
         full_queue = self._get_queue(main_greenlet)
@@ -355,20 +501,7 @@ class SQLAlchemyQueryCombiner:
             if query_future.done:
                 continue
 
-            logger.debug(f"Executing query via fallback: {str(query_future.query)}")
-            self.report.uncombined_queries_issued += 1
-            try:
-                res = _sa_execute_underlying_method(
-                    query_future.conn,
-                    query_future.query,
-                    *query_future.multiparams,
-                    **query_future.params,
-                )
-                query_future.res = res
-            except Exception as e:
-                query_future.exc = e
-            finally:
-                query_future.done = True
+            self._execute_query_uncombined(query_future)
 
     def flush(self) -> None:
         """Executes until the queue and pool are empty."""
@@ -1,7 +1,7 @@
 import logging
 import pathlib
 import sys
-from typing import Any
+from typing import Any, cast
 from unittest import mock
 
 import pytest
@@ -10,6 +10,7 @@ from looker_sdk.sdk.api31.models import DBConnection
 
 from datahub.configuration.common import PipelineExecutionError
 from datahub.ingestion.run.pipeline import Pipeline
+from datahub.ingestion.source.lookml import LookMLSourceReport
 from tests.test_helpers import mce_helpers  # noqa: F401
 
 logging.getLogger("lkml").setLevel(logging.INFO)
@@ -103,6 +104,62 @@ def test_lookml_ingest_offline(pytestconfig, tmp_path, mock_time):
     )
 
 
+@freeze_time(FROZEN_TIME)
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="lkml requires Python 3.7+")
+def test_lookml_ingest_offline_parallel_parse(pytestconfig, tmp_path, mock_time):
+    """Parsing the files in parallel, or reusing their cached parses, must not change the output"""
+    test_resources_dir = pytestconfig.rootpath / "tests/integration/lookml"
+    mce_out = "lookml_mces_offline.json"
+    # The second run reuses the parses cached by the first one, from the thread
+    # that runs the source in a pipelined run.
+    for run in range(2):
+        pipeline = Pipeline.create(
+            {
+                "run_id": "lookml-test",
+                "pipelined_execution": run == 1,
+                "source": {
+                    "type": "lookml",
+                    "config": {
+                        "base_folder": str(test_resources_dir / "lkml_samples"),
+                        "connection_to_platform_map": {
+                            "my_connection": {
+                                "platform": "snowflake",
+                                "default_db": "default_db",
+                                "default_schema": "default_schema",
+                            }
+                        },
+                        "parse_table_names_from_sql": True,
+                        "project_name": "lkml_samples",
+                        "parse_workers": 2,
+                        "parse_cache_dir": f"{tmp_path}/parse_cache",
+                    },
+                },
+                "sink": {
+                    "type": "file",
+                    "config": {
+                        "filename": f"{tmp_path}/{run}_{mce_out}",
+                    },
+                },
+            }
+        )
+        pipeline.run()
+        pipeline.pretty_print_summary()
+        pipeline.raise_from_status(raise_warnings=True)
+
+        report = cast(LookMLSourceReport, pipeline.source.get_report())
+        if run == 0:
+            assert report.lkml_files_parsed > 0
+        else:
+            assert report.lkml_files_parsed == 0
+            assert report.lkml_parse_cache_hits > 0
+
+        mce_helpers.check_golden_file(
+            pytestconfig,
+            output_path=tmp_path / f"{run}_{mce_out}",
+            golden_path=test_resources_dir / mce_out,
+        )
+
+
 @freeze_time(FROZEN_TIME)
 @pytest.mark.skipif(sys.version_info < (3, 7), reason="lkml requires Python 3.7+")
 def test_lookml_ingest_offline_platform_instance(pytestconfig, tmp_path, mock_time):
@@ -0,0 +1,78 @@
+"""
+Compares the single-pass rest.li serializer used by the REST emitter against the
+original to_obj + pre_json_transform + json.dumps path on large SchemaMetadata aspects.
+
+Run with: python -m tests.performance.serialization_benchmark
+"""
+import json
+import timeit
+
+import datahub.metadata.schema_classes as models
+from datahub.emitter.mce_builder import make_dataset_urn
+from datahub.emitter.serialization_helper import (
+    json_dumps,
+    orjson,
+    pre_json_transform,
+    to_restli_obj,
+)
+
+
+def make_schema_metadata_mce(num_fields: int) -> models.MetadataChangeEventClass:
+    fields = [
+        models.SchemaFieldClass(
+            fieldPath=f"struct_{i // 100}.column_{i}",
+            type=models.SchemaFieldDataTypeClass(
+                type=models.StringTypeClass() if i % 2 else models.NumberTypeClass()
+            ),
+            nativeDataType="VARCHAR(256)" if i % 2 else "NUMBER(38, 0)",
+            description=f"Description of column {i}",
+            nullable=bool(i % 3),
+            globalTags=models.GlobalTagsClass(
+                tags=[models.TagAssociationClass(tag="urn:li:tag:pii")]
+            )
+            if i % 10 == 0
+            else None,
+        )
+        for i in range(num_fields)
+    ]
+    return models.MetadataChangeEventClass(
+        proposedSnapshot=models.DatasetSnapshotClass(
+            urn=make_dataset_urn("snowflake", "db.schema.wide_table"),
+            aspects=[
+                models.SchemaMetadataClass(
+                    schemaName="db.schema.wide_table",
+                    platform="urn:li:dataPlatform:snowflake",
+                    version=0,
+                    hash="",
+                    platformSchema=models.MySqlDDLClass(tableSchema=""),
+                    fields=fields,
+                )
+            ],
+        )
+    )
+
+
+def _original_path(mce: models.MetadataChangeEventClass) -> str:
+    return json.dumps(pre_json_transform(mce.proposedSnapshot.to_obj()))
+
+
+def _fast_path(mce: models.MetadataChangeEventClass) -> str:
+    return json_dumps(to_restli_obj(mce.proposedSnapshot))
+
+
+def run_benchmark(num_fields: int, repeat: int) -> None:
+    mce = make_schema_metadata_mce(num_fields)
+    assert json.loads(_original_path(mce)) == json.loads(_fast_path(mce))
+
+    original = min(timeit.repeat(lambda: _original_path(mce), number=1, repeat=repeat))
+    fast = min(timeit.repeat(lambda: _fast_path(mce), number=1, repeat=repeat))
+    print(
+        f"{num_fields:>6} fields: original {original * 1000:8.1f} ms, "
+        f"single-pass {fast * 1000:8.1f} ms ({original / fast:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    print(f"JSON backend: {'orjson' if orjson is not None else 'json'}")
+    for num_fields in [100, 1000, 5000]:
+        run_benchmark(num_fields, repeat=5)
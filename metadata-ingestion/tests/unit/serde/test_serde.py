@@ -1,6 +1,8 @@
+import gzip
 import io
 import json
 import pathlib
+from typing import Optional
 
 import fastavro
 import pytest
@@ -10,8 +12,9 @@ from freezegun import freeze_time
 import datahub.metadata.schema_classes as models
 from datahub.cli.json_file import check_mce_file
 from datahub.emitter import mce_builder
+from datahub.emitter.serialization_helper import pre_json_transform, to_restli_obj
 from datahub.ingestion.run.pipeline import Pipeline
-from datahub.ingestion.source.file import iterate_mce_file
+from datahub.ingestion.source.file import iterate_generic_file, iterate_mce_file
 from datahub.metadata.schema_classes import MetadataChangeEventClass
 from datahub.metadata.schemas import getMetadataChangeEventSchema
 from tests.test_helpers import mce_helpers
@@ -95,6 +98,89 @@ def test_serde_to_avro(pytestconfig: PytestConfig, json_filename: str) -> None:
         assert mces[i] == in_mces[i]
 
 
+@pytest.mark.parametrize(
+    "json_filename",
+    [
+        "tests/unit/serde/test_serde_large.json",
+        "tests/unit/serde/test_serde_chart_snapshot.json",
+        "tests/unit/serde/test_serde_usage.json",
+        "tests/unit/serde/test_serde_profile.json",
+        "examples/mce_files/bootstrap_mce.json",
+    ],
+)
+def test_serde_to_restli_obj(pytestconfig: PytestConfig, json_filename: str) -> None:
+    # The single-pass serializer must produce exactly what to_obj + pre_json_transform does.
+    json_path = pytestconfig.rootpath / json_filename
+
+    for record in iterate_generic_file(str(json_path)):
+        assert to_restli_obj(record) == json.loads(
+            json.dumps(pre_json_transform(record.to_obj()))
+        )
+
+
+@pytest.mark.parametrize(
+    "json_filename",
+    [
+        "tests/unit/serde/test_serde_large.json",
+        "tests/unit/serde/test_serde_usage.json",
+        "tests/unit/serde/test_serde_profile.json",
+    ],
+)
+@pytest.mark.parametrize("decode_workers", [1, 2])
+def test_serde_from_compressed_json_lines(
+    pytestconfig: PytestConfig,
+    tmp_path: pathlib.Path,
+    json_filename: str,
+    decode_workers: int,
+) -> None:
+    json_path = pytestconfig.rootpath / json_filename
+    with open(json_path) as f:
+        objs = json.load(f)
+
+    jsonl_path = tmp_path / "records.jsonl.gz"
+    with gzip.open(jsonl_path, "wt") as f:
+        for obj in objs:
+            f.write(json.dumps(obj) + "\n")
+
+    assert list(iterate_generic_file(str(json_path))) == list(
+        iterate_generic_file(str(jsonl_path), decode_workers=decode_workers)
+    )
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_serde_to_rotated_json_lines(
+    pytestconfig: PytestConfig, tmp_path: pathlib.Path, compression: Optional[str]
+) -> None:
+    golden_file = pytestconfig.rootpath / "tests/unit/serde/test_serde_large.json"
+    output_file = tmp_path / "output.jsonl"
+
+    pipeline = Pipeline.create(
+        {
+            "source": {"type": "file", "config": {"filename": str(golden_file)}},
+            "sink": {
+                "type": "file",
+                "config": {
+                    "filename": str(output_file),
+                    "format": "jsonl",
+                    "compression": compression,
+                    "max_file_size_bytes": 10000,
+                },
+            },
+            "run_id": "serde_test",
+        }
+    )
+    pipeline.run()
+    pipeline.raise_from_status()
+
+    output_files = [output_file] + sorted(
+        tmp_path.glob("output.*.jsonl"), key=lambda path: int(path.suffixes[0][1:])
+    )
+    assert len(output_files) > 1
+    assert list(iterate_generic_file(str(golden_file))) == [
+        record for path in output_files for record in iterate_generic_file(str(path))
+    ]
+
+
 @pytest.mark.parametrize(
     "json_filename",
     [
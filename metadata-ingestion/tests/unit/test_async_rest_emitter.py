@@ -0,0 +1,69 @@
+import asyncio
+from typing import List
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from datahub.configuration.common import OperationalError
+from datahub.emitter.async_rest_emitter import DataHubAsyncRestEmitter
+from datahub.emitter.mce_builder import make_dataset_urn
+from datahub.emitter.mcp import MetadataChangeProposalWrapper
+from datahub.metadata.schema_classes import ChangeTypeClass, StatusClass
+
+
+def _make_mcp(name: str) -> MetadataChangeProposalWrapper:
+    return MetadataChangeProposalWrapper(
+        entityType="dataset",
+        entityUrn=make_dataset_urn("hive", name),
+        changeType=ChangeTypeClass.UPSERT,
+        aspectName="status",
+        aspect=StatusClass(removed=False),
+    )
+
+
+async def test_async_rest_emitter_retries_and_emits_concurrently():
+    received: List[str] = []
+    attempts = 0
+
+    async def ingest_proposal(request: web.Request) -> web.Response:
+        nonlocal attempts
+        attempts += 1
+        if attempts <= 2:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        body = await request.json()
+        received.append(body["proposal"]["entityUrn"])
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post("/aspects", ingest_proposal)
+    async with TestServer(app) as server:
+        async with DataHubAsyncRestEmitter(
+            str(server.make_url("")).rstrip("/"), max_connections=10
+        ) as emitter:
+            # The first two attempts fail with a retryable status code.
+            await emitter.emit_mcp(_make_mcp("table0"))
+            assert attempts == 3
+
+            await asyncio.gather(
+                *[emitter.emit(_make_mcp(f"table{i}")) for i in range(1, 200)]
+            )
+
+    assert sorted(received) == sorted(
+        make_dataset_urn("hive", f"table{i}") for i in range(200)
+    )
+
+
+async def test_async_rest_emitter_raises_operational_error():
+    async def ingest_proposal(request: web.Request) -> web.Response:
+        return web.json_response({"message": "bad aspect"}, status=500)
+
+    app = web.Application()
+    app.router.add_post("/aspects", ingest_proposal)
+    async with TestServer(app) as server:
+        async with DataHubAsyncRestEmitter(
+            str(server.make_url("")).rstrip("/")
+        ) as emitter:
+            with pytest.raises(OperationalError) as e:
+                await emitter.emit_mcp(_make_mcp("table"))
+    assert e.value.info == {"message": "bad aspect"}
@@ -1,7 +1,14 @@
 import json
 import os
+from datetime import datetime, timedelta, timezone
+from typing import List
+from unittest.mock import Mock
 
-from datahub.ingestion.source.usage.bigquery_usage import BigQueryUsageConfig
+from datahub.ingestion.api.common import PipelineContext
+from datahub.ingestion.source.usage.bigquery_usage import (
+    BigQueryUsageConfig,
+    BigQueryUsageSource,
+)
 
 
 def test_bigquery_uri_with_credential():
@@ -47,3 +54,52 @@ def test_bigquery_uri_with_credential():
         if config._credentials_path:
             os.unlink(str(config._credentials_path))
         raise e
+
+
+def test_bigquery_log_fetch_time_slices_are_merged_in_order():
+    config = BigQueryUsageConfig.parse_obj(
+        {
+            "projects": ["project-1", "project-2"],
+            "start_time": "2022-01-01T00:00:00Z",
+            "end_time": "2022-01-02T00:00:00Z",
+            "max_query_duration": 0,
+            "log_fetch_parallelism": 3,
+            "log_fetch_time_slices": 4,
+        }
+    )
+    source = BigQueryUsageSource(config, PipelineContext(run_id="bq-usage-test"))
+
+    time_slices = source._get_log_fetch_time_slices()
+    assert len(time_slices) == 4
+    assert time_slices[0][0] == config.start_time
+    assert time_slices[-1][1] == config.end_time
+    assert all(a[1] == b[0] for a, b in zip(time_slices, time_slices[1:]))
+
+    def make_entries(offset_minutes: int) -> List[Mock]:
+        return [
+            Mock(
+                timestamp=start_time
+                + timedelta(minutes=offset_minutes + 10 * i, seconds=1)
+            )
+            for start_time, _ in time_slices
+            for i in range(3)
+        ]
+
+    streams = [make_entries(0), make_entries(5)]
+    merged = list(
+        source._merge_log_entry_streams(
+            [
+                [
+                    [e for e in stream if start <= e.timestamp < end]
+                    for start, end in time_slices
+                ]
+                for stream in streams
+            ]
+        )
+    )
+
+    assert len(merged) == 24
+    assert [e.timestamp for e in merged] == sorted(
+        e.timestamp for stream in streams for e in stream
+    )
+    assert merged[0].timestamp == datetime(2022, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
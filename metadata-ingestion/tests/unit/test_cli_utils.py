@@ -1,3 +1,7 @@
+import json
+from typing import List
+from unittest import mock
+
 from datahub.cli import cli_utils
 
 
@@ -9,3 +13,115 @@ def test_first_non_null():
     assert cli_utils.first_non_null(["3", "1", "2"]) == "3"
     assert cli_utils.first_non_null(["", "1", "2"]) == "1"
     assert cli_utils.first_non_null([" ", "1", "2"]) == "1"
+
+
+def _mock_search_session(urns: List[str], requests: List[dict]) -> mock.MagicMock:
+    # Imitates GMS, which only hands out the first SEARCH_MAX_RESULTS results of a
+    # search and caps numEntities at it too.
+    def search(url: str, payload: str) -> mock.MagicMock:
+        request = json.loads(payload)
+        requests.append(request)
+        start, count = request["start"], request["count"]
+        assert start + count <= cli_utils.SEARCH_MAX_RESULTS
+        matches = sorted(urns)
+        for criteria in request.get("filter", {}).get("or", []):
+            for criterion in criteria["and"]:
+                if criterion["field"] == "urn":
+                    assert criterion["condition"] == "GREATER_THAN"
+                    matches = [urn for urn in matches if urn > criterion["value"]]
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = {
+            "value": {
+                "numEntities": min(len(matches), cli_utils.SEARCH_MAX_RESULTS),
+                "entities": [{"entity": urn} for urn in matches[start : start + count]],
+            }
+        }
+        return response
+
+    session = mock.MagicMock()
+    session.post.side_effect = search
+    return session
+
+
+def test_iterate_search_results_pages():
+    urns = [
+        f"urn:li:dataset:(urn:li:dataPlatform:hive,table{i},PROD)" for i in range(7)
+    ]
+    requests: List[dict] = []
+    session = _mock_search_session(urns, requests)
+    results = cli_utils.iterate_search_results(
+        {"input": "*", "entity": "dataset"},
+        page_size=3,
+        cached_session_host=(session, "http://localhost:8080"),
+    )
+    assert list(results) == urns
+    assert [request["start"] for request in requests] == [0, 3, 6]
+    assert all(request["input"] == "*" for request in requests)
+    assert all(
+        request["sort"] == {"field": "urn", "order": "ASCENDING"}
+        for request in requests
+    )
+
+
+def test_get_urns_by_filter_pages_beyond_search_window(monkeypatch):
+    monkeypatch.setattr(cli_utils, "SEARCH_MAX_RESULTS", 5)
+    urns = [
+        f"urn:li:dataset:(urn:li:dataPlatform:hive,table{i:02},PROD)" for i in range(12)
+    ]
+    requests: List[dict] = []
+    session = _mock_search_session(urns, requests)
+    with mock.patch(
+        "datahub.cli.cli_utils.get_session_and_host",
+        return_value=(session, "http://localhost:8080"),
+    ):
+        results = cli_utils.get_urns_by_filter(platform="hive", env="PROD", page_size=2)
+        assert list(results) == urns
+
+    # Each search past the first one starts after the last urn of the previous one.
+    assert [(request["start"], request["count"]) for request in requests] == [
+        (0, 2),
+        (2, 2),
+        (4, 1),
+        (0, 2),
+        (2, 2),
+        (4, 1),
+        (0, 2),
+    ]
+    assert requests[5]["filter"]["or"][0]["and"][-1] == {
+        "field": "urn",
+        "value": urns[4],
+        "condition": "GREATER_THAN",
+    }
+    assert requests[6]["filter"]["or"][0]["and"][-1]["value"] == urns[9]
+    assert all(
+        request["filter"]["or"][0]["and"][0]["field"] == "origin"
+        for request in requests
+    )
+
+
+def test_get_container_ids_by_filter_pages_beyond_search_window(monkeypatch):
+    monkeypatch.setattr(cli_utils, "SEARCH_MAX_RESULTS", 4)
+    urns = [f"urn:li:container:{i:02}" for i in range(10)]
+    requests: List[dict] = []
+    session = _mock_search_session(urns, requests)
+    with mock.patch(
+        "datahub.cli.cli_utils.get_session_and_host",
+        return_value=(session, "http://localhost:8080"),
+    ):
+        assert list(cli_utils.get_container_ids_by_filter(env="PROD")) == urns
+
+    # Every subtype filter only matches the urns past the previous searches.
+    for criteria in requests[-1]["filter"]["or"]:
+        assert criteria["and"][:1] == [
+            {
+                "field": "customProperties",
+                "value": "instance=PROD",
+                "condition": "EQUAL",
+            }
+        ]
+        assert criteria["and"][-1] == {
+            "field": "urn",
+            "value": urns[7],
+            "condition": "GREATER_THAN",
+        }
+    assert len(requests[-1]["filter"]["or"]) == 4
@@ -0,0 +1,68 @@
+import urllib.parse
+from typing import Any, Dict
+from unittest import mock
+
+from datahub.emitter.mce_builder import (
+    make_dataset_urn,
+    make_ownership_aspect_from_urn_list,
+)
+from datahub.ingestion.graph.client import DatahubClientConfig, DataHubGraph
+from datahub.metadata.schema_classes import (
+    GlobalTagsClass,
+    OwnershipClass,
+    TagAssociationClass,
+)
+
+
+def _make_graph(server_aspects: Dict[str, Dict[str, Any]]) -> DataHubGraph:
+    def batch_get(url: str) -> mock.MagicMock:
+        ids = url.split("ids=List(")[1].split(")&")[0]
+        response = mock.MagicMock()
+        response.json.return_value = {
+            "results": {
+                urn: {
+                    "aspects": {
+                        name: {"name": name, "value": aspect.to_obj()}
+                        for name, aspect in server_aspects[urn].items()
+                    }
+                }
+                for urn in map(urllib.parse.unquote, ids.split(","))
+                if urn in server_aspects
+            }
+        }
+        return response
+
+    with mock.patch("datahub.emitter.rest_emitter.DatahubRestEmitter.test_connection"):
+        graph = DataHubGraph(DatahubClientConfig(max_threads=4))
+    graph._session = mock.MagicMock()
+    graph._session.get.side_effect = batch_get
+    return graph
+
+
+def test_batch_get_aspects():
+    urns = [make_dataset_urn("hive", f"table{i}") for i in range(250)]
+    ownership = make_ownership_aspect_from_urn_list(
+        ["urn:li:corpuser:foo"], source_type=None
+    )
+    tags = GlobalTagsClass(tags=[TagAssociationClass(tag="urn:li:tag:bar")])
+    graph = _make_graph(
+        {
+            urns[0]: {"ownership": ownership, "globalTags": tags},
+            urns[120]: {"globalTags": tags},
+        }
+    )
+
+    aspects = graph.batch_get_aspects(
+        urns + ["urn:li:dataset:(urn:li:dataPlatform:hive,missing,PROD)"],
+        {"ownership": OwnershipClass, "globalTags": GlobalTagsClass},
+    )
+
+    # The urns are fetched in chunks of at most 100.
+    assert graph._session.get.call_count == 3
+    assert len(aspects) == 251
+    assert aspects[urns[0]] == {"ownership": ownership, "globalTags": tags}
+    assert isinstance(aspects[urns[0]]["ownership"], OwnershipClass)
+    assert aspects[urns[120]] == {"ownership": None, "globalTags": tags}
+    assert aspects[urns[1]] == {"ownership": None, "globalTags": None}
+
+    assert graph.batch_get_tags([urns[0], urns[1]]) == {urns[0]: tags, urns[1]: None}
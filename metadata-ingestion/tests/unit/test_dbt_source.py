@@ -1,9 +1,10 @@
-from typing import Dict, List, Union
+import json
+from typing import Dict, List, Union, cast
 from unittest import mock
 
 from datahub.emitter import mce_builder
 from datahub.ingestion.api.common import PipelineContext
-from datahub.ingestion.source.dbt import DBTConfig, DBTSource
+from datahub.ingestion.source.dbt import DBTConfig, DBTSource, load_json_sections
 from datahub.metadata.schema_classes import (
     OwnerClass,
     OwnershipSourceClass,
@@ -168,3 +169,73 @@ def test_dbt_source_patching_terms():
     assert len(transformed_terms) == 3
     for transformed_term in transformed_terms:
         assert transformed_term.urn in expected_terms
+
+
+def test_dbt_source_patching_prefetched_aspects():
+    source = create_mocked_dbt_source()
+    graph = cast(mock.MagicMock, source.ctx.graph)
+    graph.batch_get_aspects.return_value = {
+        "urn:li:dataset:dummy": {
+            "ownership": mce_builder.make_ownership_aspect_from_urn_list(
+                ["urn:li:corpuser:prefetched_user"], "AUDIT"
+            ),
+            "globalTags": None,
+            "glossaryTerms": mce_builder.make_glossary_terms_aspect_from_urn_list(
+                ["urn:li:glossaryTerm:old"]
+            ),
+        }
+    }
+    source.prefetch_existing_aspects(["urn:li:dataset:dummy"])
+
+    transformed_owners = source.get_transformed_owners_by_source_type(
+        [], "urn:li:dataset:dummy", "SOURCE_CONTROL"
+    )
+    assert [owner.owner for owner in transformed_owners] == [
+        "urn:li:corpuser:prefetched_user"
+    ]
+    transformed_tags = source.get_transformed_tags_by_prefix(
+        [], "urn:li:dataset:dummy", "urn:li:tag:dbt:"
+    )
+    assert transformed_tags == []
+    transformed_terms = source.get_transformed_terms([], "urn:li:dataset:dummy")
+    assert [term.urn for term in transformed_terms] == ["urn:li:glossaryTerm:old"]
+
+    # Nothing is fetched one entity at a time, except for entities that were not
+    # prefetched.
+    assert graph.batch_get_aspects.call_count == 1
+    assert not graph.get_ownership.called
+    assert not graph.get_tags.called
+    assert not graph.get_glossary_terms.called
+    source.get_transformed_terms([], "urn:li:dataset:other")
+    graph.get_glossary_terms.assert_called_once_with("urn:li:dataset:other")
+
+
+def test_dbt_load_json_sections(tmp_path):
+    manifest = {
+        "metadata": {"dbt_schema_version": "v4", "project_id": "project"},
+        "nodes": {
+            "model.project.a": {"name": "a", "compiled_sql": "SELECT 1", "x": [1.5]},
+            "model.project.b": {"name": "b", "compiled_sql": "SELECT 2", "x": {}},
+        },
+        "macros": {"macro.project.m": {"name": "m"}},
+        "sources": {"source.project.s": {"name": "s"}},
+    }
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+
+    def drop_compiled_sql(node: dict) -> dict:
+        return {key: value for key, value in node.items() if key != "compiled_sql"}
+
+    sections = load_json_sections(
+        str(manifest_path),
+        {"metadata": None, "nodes": drop_compiled_sql, "sources": None},
+    )
+    assert sections == {
+        "metadata": manifest["metadata"],
+        "nodes": {
+            "model.project.a": {"name": "a", "x": [1.5]},
+            "model.project.b": {"name": "b", "x": {}},
+        },
+        "sources": manifest["sources"],
+    }
+    assert load_json_sections(str(manifest_path), {"missing": None}) == {}
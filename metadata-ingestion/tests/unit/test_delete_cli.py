@@ -0,0 +1,62 @@
+import threading
+from typing import Any, List
+from unittest import mock
+
+import click
+import pytest
+
+from datahub.cli import delete_cli
+from datahub.cli.delete_cli import DeletionResult, delete_with_filters
+
+URNS = [f"urn:li:dataset:(urn:li:dataPlatform:hive,table{i},PROD)" for i in range(20)]
+
+
+def _delete_with_filters(
+    tmp_path: Any, deleted: List[str], fail_on: str = "", **kwargs: Any
+) -> DeletionResult:
+    lock = threading.Lock()
+
+    def delete_one_urn(urn: str, **kwargs: Any) -> DeletionResult:
+        if urn == fail_on:
+            raise Exception(f"Failed to delete {urn}")
+        with lock:
+            deleted.append(urn)
+        result = DeletionResult(num_entities=1, num_records=2)
+        result.end()
+        return result
+
+    with mock.patch(
+        "datahub.cli.cli_utils.get_session_and_host",
+        return_value=(mock.MagicMock(), "http://localhost:8080"),
+    ), mock.patch("datahub.cli.cli_utils.get_token", return_value=None), mock.patch(
+        "datahub.cli.cli_utils.get_urns_by_filter", return_value=iter(URNS)
+    ), mock.patch.object(
+        delete_cli, "_delete_one_urn", side_effect=delete_one_urn
+    ):
+        return delete_with_filters(
+            dry_run=False,
+            soft=True,
+            force=True,
+            include_removed=False,
+            platform="hive",
+            workers=4,
+            checkpoint_file=str(tmp_path / "checkpoint"),
+            **kwargs,
+        )
+
+
+def test_delete_with_filters_resumes_from_checkpoint(tmp_path):
+    deleted: List[str] = []
+    with pytest.raises(Exception, match="Failed to delete"):
+        _delete_with_filters(tmp_path, deleted, fail_on=URNS[10])
+    assert URNS[10] not in deleted
+
+    resumed: List[str] = []
+    result = _delete_with_filters(tmp_path, resumed)
+    assert sorted(deleted + resumed) == sorted(URNS)
+    assert result.num_entities == len(resumed)
+    assert result.num_records == 2 * len(resumed)
+
+    # A checkpoint cannot be used to resume a different delete.
+    with pytest.raises(click.UsageError):
+        _delete_with_filters(tmp_path, [], entity_type="chart")
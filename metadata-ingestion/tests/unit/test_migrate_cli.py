@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+import pytest
+
+from datahub.cli import migrate
+from datahub.cli.migrate import MigrationReport
+from datahub.metadata.schema_classes import DataPlatformInstanceClass, StatusClass
+
+URNS = [f"urn:li:dataset:(urn:li:dataPlatform:hive,table{i},PROD)" for i in range(20)]
+DOWNSTREAM_URN = "urn:li:dataset:(urn:li:dataPlatform:hive,downstream,PROD)"
+
+
+def _migrate(
+    tmp_path: Any,
+    migrated: List[str],
+    fail_on: str = "",
+    dry_run: bool = False,
+    **kwargs: Any,
+) -> Tuple[mock.MagicMock, MigrationReport]:
+    lock = threading.Lock()
+    downstream_readers = 0
+
+    def get_aspects_for_entity(
+        entity_urn: str, aspects: List[str], typed: bool = False
+    ) -> Dict[str, Any]:
+        nonlocal downstream_readers
+        if entity_urn != DOWNSTREAM_URN:
+            return {"status": StatusClass(removed=False)}
+        # The relationships of the downstream are rewired one urn at a time.
+        with lock:
+            downstream_readers += 1
+            assert downstream_readers == 1
+        time.sleep(0.001)
+        with lock:
+            downstream_readers -= 1
+        return {}
+
+    def delete_one_urn(urn: str, **kwargs: Any) -> None:
+        if urn == fail_on:
+            raise Exception(f"Failed to delete {urn}")
+        with lock:
+            migrated.append(urn)
+
+    rest_emitter = mock.MagicMock()
+    reports: List[MigrationReport] = []
+
+    def make_report(*args: Any) -> MigrationReport:
+        reports.append(MigrationReport(*args))
+        return reports[-1]
+
+    with mock.patch(
+        "datahub.cli.cli_utils.get_session_and_host",
+        return_value=(mock.MagicMock(), "http://localhost:8080"),
+    ), mock.patch(
+        "datahub.cli.cli_utils.get_urns_by_filter", return_value=iter(URNS)
+    ), mock.patch(
+        "datahub.cli.cli_utils.batch_get_aspects_for_entities",
+        return_value={
+            urn: {
+                "dataPlatformInstance": DataPlatformInstanceClass(
+                    platform="urn:li:dataPlatform:hive", instance=None
+                )
+            }
+            for urn in URNS
+        },
+    ), mock.patch(
+        "datahub.cli.cli_utils.get_aspects_for_entity",
+        side_effect=get_aspects_for_entity,
+    ), mock.patch(
+        "datahub.cli.migration_utils.get_incoming_relationships",
+        return_value=[{"entity": DOWNSTREAM_URN, "type": "DownstreamOf"}],
+    ), mock.patch(
+        "datahub.cli.delete_cli._delete_one_urn", side_effect=delete_one_urn
+    ), mock.patch.object(
+        migrate, "DatahubRestEmitter", return_value=rest_emitter
+    ), mock.patch.object(
+        migrate, "MigrationReport", side_effect=make_report
+    ), mock.patch.object(
+        migrate, "migrate_containers"
+    ):
+        migrate.dataplatform2instance_func(
+            instance="instance",
+            platform="hive",
+            dry_run=dry_run,
+            env="PROD",
+            force=True,
+            hard=False,
+            keep=False,
+            workers=4,
+            checkpoint_file=str(tmp_path / "checkpoint"),
+            **kwargs,
+        )
+    return rest_emitter, reports[0]
+
+
+def test_dataplatform2instance_resumes_from_checkpoint(tmp_path):
+    migrated: List[str] = []
+    with pytest.raises(Exception, match="Failed to delete"):
+        _migrate(tmp_path, migrated, fail_on=URNS[10])
+    assert URNS[10] not in migrated
+
+    resumed: List[str] = []
+    rest_emitter, report = _migrate(tmp_path, resumed)
+    assert sorted(migrated + resumed) == sorted(URNS)
+    # The status and the platform instance of each new urn.
+    assert rest_emitter.emit_mcp.call_count == 2 * len(resumed)
+    assert len(report.entities_migrated) == len(resumed)
+
+
+def test_dataplatform2instance_dry_run_emits_nothing(tmp_path):
+    migrated: List[str] = []
+    rest_emitter, report = _migrate(tmp_path, migrated, dry_run=True)
+    assert migrated == []
+    rest_emitter.emit_mcp.assert_not_called()
+    # A dry run does not write a checkpoint to resume from.
+    assert not (tmp_path / "checkpoint").exists()
+
+    # The report still tells what the migration would do.
+    assert len({urn for urn, _ in report.entities_created}) == len(URNS)
+    assert len(report.entities_migrated) == len(URNS)
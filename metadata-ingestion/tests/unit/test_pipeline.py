@@ -1,3 +1,5 @@
+import os
+import threading
 from typing import Iterable, List, cast
 from unittest.mock import patch
 
@@ -5,23 +7,28 @@ import pytest
 from freezegun import freeze_time
 
 from datahub.configuration.common import DynamicTypedConfig
+from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.ingestion.api.committable import CommitPolicy, Committable
 from datahub.ingestion.api.common import RecordEnvelope, WorkUnit
+from datahub.ingestion.api.sink import WriteCallback
 from datahub.ingestion.api.source import Source, SourceReport
 from datahub.ingestion.api.transform import Transformer
 from datahub.ingestion.api.workunit import MetadataWorkUnit
 from datahub.ingestion.run.pipeline import Pipeline, PipelineContext
 from datahub.metadata.com.linkedin.pegasus2avro.mxe import SystemMetadata
 from datahub.metadata.schema_classes import (
+    ChangeTypeClass,
     DatasetPropertiesClass,
     DatasetSnapshotClass,
     MetadataChangeEventClass,
     StatusClass,
 )
-from tests.test_helpers.sink_helpers import RecordingSinkReport
+from tests.test_helpers.sink_helpers import RecordingSink, RecordingSinkReport
 
 FROZEN_TIME = "2020-04-14 07:00:00"
 
+MCP_DATASET_URN = "urn:li:dataset:(urn:li:dataPlatform:test_platform,mcp_test,PROD)"
+
 
 class TestPipeline(object):
     @patch("datahub.ingestion.source.kafka.KafkaSource.get_workunits", autospec=True)
@@ -157,6 +164,78 @@ class TestPipeline(object):
         assert len(sink_report.received_records) == 1
         assert expected_mce == sink_report.received_records[0].record
 
+    @pytest.mark.parametrize(
+        "source,sink,error",
+        [
+            pytest.param(
+                "FakeSourceWithError",
+                "tests.test_helpers.sink_helpers.RecordingSink",
+                "source failed",
+                id="source-error",
+            ),
+            pytest.param(
+                "FakeSourceWithManyWorkUnits",
+                "tests.unit.test_pipeline.FailingSink",
+                "sink failed",
+                id="sink-error",
+            ),
+        ],
+    )
+    @freeze_time(FROZEN_TIME)
+    def test_run_pipelined_raises_stage_errors(self, source, sink, error):
+        pipeline = Pipeline.create(
+            {
+                "source": {"type": f"tests.unit.test_pipeline.{source}"},
+                "transformers": [
+                    {"type": "tests.unit.test_pipeline.AddStatusRemovedTransformer"}
+                ],
+                "sink": {"type": sink},
+                "run_id": "pipeline_test",
+                "pipelined_execution": True,
+                "pipelined_queue_size": 1,
+            }
+        )
+        with pytest.raises(ValueError, match=error):
+            pipeline.run()
+
+        # The other stages are stopped, even those blocked on a full queue.
+        assert not [
+            thread
+            for thread in threading.enumerate()
+            if thread.name.startswith("pipeline-")
+        ]
+
+    @freeze_time(FROZEN_TIME)
+    def test_run_pipelined_with_transformer_state_dir(self, tmp_path):
+        pipeline = Pipeline.create(
+            {
+                "source": {"type": "tests.unit.test_pipeline.FakeSourceWithMcp"},
+                "transformers": [
+                    {
+                        "type": "simple_add_dataset_tags",
+                        "config": {"tag_urns": ["urn:li:tag:Legacy"]},
+                    }
+                ],
+                "sink": {"type": "tests.test_helpers.sink_helpers.RecordingSink"},
+                "run_id": "pipeline_test",
+                "pipelined_execution": True,
+                "transformer_state_dir": str(tmp_path),
+            }
+        )
+        # The transformer's state is kept in the transform stage's thread, and
+        # read and closed at the end of the stream in this one.
+        pipeline.run()
+        pipeline.raise_from_status()
+
+        sink_report = cast(RecordingSinkReport, pipeline.sink.get_report())
+        assert [
+            record_envelope.record.aspectName
+            for record_envelope in sink_report.received_records
+            if isinstance(record_envelope.record, MetadataChangeProposalWrapper)
+            and record_envelope.record.entityUrn == MCP_DATASET_URN
+        ] == ["status", "globalTags"]
+        assert os.listdir(tmp_path) == []
+
     @freeze_time(FROZEN_TIME)
     def test_run_including_registered_transformation(self):
         # This is not testing functionality, but just the transformer registration system.
@@ -175,6 +254,38 @@ class TestPipeline(object):
         )
         assert pipeline
 
+    @pytest.mark.parametrize(
+        "transformer,reads_ahead",
+        [("AddStatusRemovedTransformer", False), ("PrefetchingTransformer", True)],
+    )
+    @freeze_time(FROZEN_TIME)
+    def test_run_prefetches_only_for_prefetching_transformers(
+        self, transformer, reads_ahead
+    ):
+        pipeline = Pipeline.create(
+            {
+                "source": {"type": "tests.unit.test_pipeline.FakeSource"},
+                "transformers": [
+                    {"type": "tests.unit.test_pipeline.AddStatusRemovedTransformer"},
+                    {"type": f"tests.unit.test_pipeline.{transformer}"},
+                ],
+                "sink": {"type": "tests.test_helpers.sink_helpers.RecordingSink"},
+            }
+        )
+        with patch.object(
+            pipeline,
+            "_prefetch_for_transformers",
+            wraps=pipeline._prefetch_for_transformers,
+        ) as prefetch_for_transformers:
+            pipeline.run()
+        pipeline.raise_from_status()
+
+        assert prefetch_for_transformers.called == reads_ahead
+        if reads_ahead:
+            assert pipeline.transformers[1].prefetched == [  # type: ignore
+                [get_initial_mce().proposedSnapshot.urn]
+            ]
+
     @pytest.mark.parametrize(
         "commit_policy,source,should_commit",
         [
@@ -286,6 +397,14 @@ class AddStatusRemovedTransformer(Transformer):
             yield record_envelope
 
 
+class PrefetchingTransformer(AddStatusRemovedTransformer):
+    def __init__(self):
+        self.prefetched: List[List[str]] = []
+
+    def prefetch(self, entity_urns: List[str]) -> None:
+        self.prefetched.append(entity_urns)
+
+
 class FakeSource(Source):
     def __init__(self):
         self.source_report = SourceReport()
@@ -308,6 +427,45 @@ class FakeSource(Source):
         pass
 
 
+class FakeSourceWithManyWorkUnits(FakeSource):
+    def __init__(self):
+        super().__init__()
+        self.work_units = [
+            MetadataWorkUnit(id=f"workunit-{i}", mce=get_initial_mce())
+            for i in range(100)
+        ]
+
+
+class FakeSourceWithMcp(FakeSource):
+    def __init__(self):
+        super().__init__()
+        self.work_units = [
+            MetadataWorkUnit(
+                id="workunit-1",
+                mcp=MetadataChangeProposalWrapper(
+                    entityType="dataset",
+                    changeType=ChangeTypeClass.UPSERT,
+                    entityUrn=MCP_DATASET_URN,
+                    aspectName="status",
+                    aspect=get_status_removed_aspect(),
+                ),
+            )
+        ]
+
+
+class FakeSourceWithError(FakeSource):
+    def get_workunits(self) -> Iterable[WorkUnit]:
+        yield from self.work_units
+        raise ValueError("source failed")
+
+
+class FailingSink(RecordingSink):
+    def write_record_async(
+        self, record_envelope: RecordEnvelope, callback: WriteCallback
+    ) -> None:
+        raise ValueError("sink failed")
+
+
 class FakeSourceWithWarnings(FakeSource):
     def __init__(self):
         super().__init__()
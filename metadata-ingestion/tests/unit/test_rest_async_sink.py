@@ -0,0 +1,87 @@
+import asyncio
+from typing import List
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from datahub.emitter.mce_builder import make_dataset_urn
+from datahub.emitter.mcp import MetadataChangeProposalWrapper
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import WriteCallback
+from datahub.ingestion.sink.datahub_rest_async import (
+    DatahubRestAsyncSink,
+    DatahubRestAsyncSinkConfig,
+)
+from datahub.metadata.schema_classes import ChangeTypeClass, StatusClass
+
+
+def _make_mcp(name: str) -> MetadataChangeProposalWrapper:
+    return MetadataChangeProposalWrapper(
+        entityType="dataset",
+        entityUrn=make_dataset_urn("hive", name),
+        changeType=ChangeTypeClass.UPSERT,
+        aspectName="status",
+        aspect=StatusClass(removed=False),
+    )
+
+
+async def test_async_rest_sink_writes_records():
+    received: List[str] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_config(request: web.Request) -> web.Response:
+        return web.json_response(
+            {"noCode": "true", "versions": {"linkedin/datahub": {"version": "v1"}}}
+        )
+
+    async def ingest_proposal(request: web.Request) -> web.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            body = await request.json()
+            # Give the sink a chance to send more requests meanwhile.
+            await asyncio.sleep(0.01)
+        finally:
+            in_flight -= 1
+        urn = body["proposal"]["entityUrn"]
+        if urn == make_dataset_urn("hive", "bad"):
+            return web.json_response({"message": "bad aspect"}, status=500)
+        received.append(urn)
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/config", get_config)
+    app.router.add_post("/aspects", ingest_proposal)
+    callback = mock.MagicMock(spec=WriteCallback)
+    loop = asyncio.get_running_loop()
+    async with TestServer(app) as server:
+        config = DatahubRestAsyncSinkConfig(
+            server=str(server.make_url("")).rstrip("/"), max_pending_requests=5
+        )
+
+        # The sink blocks while it waits for its own event loop, so it is driven
+        # from another thread than the one serving the requests.
+        def write_records() -> DatahubRestAsyncSink:
+            sink = DatahubRestAsyncSink(PipelineContext(run_id="test-run"), config)
+            for name in ["bad", *[f"table{i}" for i in range(20)]]:
+                sink.write_record_async(
+                    RecordEnvelope(_make_mcp(name), metadata={}), callback
+                )
+            sink.close()
+            return sink
+
+        sink = await loop.run_in_executor(None, write_records)
+
+    assert sorted(received) == sorted(
+        make_dataset_urn("hive", f"table{i}") for i in range(20)
+    )
+    assert max_in_flight <= 5
+    assert callback.on_success.call_count == 20
+    assert callback.on_failure.call_count == 1
+    assert sink.report.gms_version == "v1"
+    assert sink.report.records_written == 20
+    assert len(sink.report.failures) == 1
+    assert sink.report.pending_requests_high_water_mark <= 5
@@ -1,11 +1,20 @@
+import datetime
+import gzip
 import json
+import threading
+from typing import List, Tuple
+from unittest import mock
 
 import pytest
 import requests
 
 import datahub.metadata.schema_classes as models
+from datahub.configuration.common import OperationalError
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.emitter.rest_emitter import DatahubRestEmitter
+from datahub.ingestion.api.common import PipelineContext, RecordEnvelope
+from datahub.ingestion.api.sink import WriteCallback
+from datahub.ingestion.sink.datahub_rest import DatahubRestSink, DatahubRestSinkConfig
 
 MOCK_GMS_ENDPOINT = "http://fakegmshost:8080"
 
@@ -298,3 +307,361 @@ def test_datahub_rest_emitter(requests_mock, record, path, snapshot):
 
     emitter = DatahubRestEmitter(MOCK_GMS_ENDPOINT)
     emitter.emit(record)
+
+
+def test_datahub_rest_emitter_batch_ingest(requests_mock):
+    urns = [
+        "urn:li:dataset:(urn:li:dataPlatform:foo,bar,PROD)",
+        "urn:li:dataset:(urn:li:dataPlatform:foo,baz,PROD)",
+    ]
+    mces = [
+        models.MetadataChangeEventClass(
+            proposedSnapshot=models.DatasetSnapshotClass(
+                urn=urn,
+                aspects=[models.StatusClass(removed=False)],
+            ),
+            systemMetadata=models.SystemMetadataClass(
+                lastObserved=1618987484580, runId="test-run"
+            ),
+        )
+        for urn in urns
+    ]
+
+    def match_request_text(request: requests.Request) -> bool:
+        assert request.json() == {
+            "entities": [
+                {
+                    "value": {
+                        "com.linkedin.metadata.snapshot.DatasetSnapshot": {
+                            "urn": urn,
+                            "aspects": [
+                                {"com.linkedin.common.Status": {"removed": False}}
+                            ],
+                        }
+                    }
+                }
+                for urn in urns
+            ],
+            "systemMetadata": [
+                {"lastObserved": 1618987484580, "runId": "test-run"} for _ in urns
+            ],
+        }
+        return True
+
+    requests_mock.post(
+        f"{MOCK_GMS_ENDPOINT}/entities?action=batchIngest",
+        request_headers={"X-RestLi-Protocol-Version": "2.0.0"},
+        additional_matcher=match_request_text,
+    )
+
+    emitter = DatahubRestEmitter(MOCK_GMS_ENDPOINT)
+    emitter.emit_mces(mces)
+    assert requests_mock.call_count == 1
+
+
+@pytest.mark.parametrize("supported_encodings", [["gzip", "zstd"], []])
+def test_datahub_rest_emitter_compression(requests_mock, supported_encodings):
+    requests_mock.get(
+        f"{MOCK_GMS_ENDPOINT}/config",
+        json={"noCode": "true", "supportedRequestEncodings": supported_encodings},
+    )
+    requests_mock.post(f"{MOCK_GMS_ENDPOINT}/aspects?action=ingestProposal")
+
+    def make_mcp(description: str) -> MetadataChangeProposalWrapper:
+        return MetadataChangeProposalWrapper(
+            entityType="dataset",
+            entityUrn="urn:li:dataset:(urn:li:dataPlatform:foo,bar,PROD)",
+            changeType=models.ChangeTypeClass.UPSERT,
+            aspectName="datasetProperties",
+            aspect=models.DatasetPropertiesClass(description=description),
+        )
+
+    emitter = DatahubRestEmitter(
+        MOCK_GMS_ENDPOINT, compression="gzip", compression_min_size_bytes=1000
+    )
+    emitter.test_connection()
+    emitter.emit(make_mcp("small"))
+    emitter.emit(make_mcp("large " * 1000))
+
+    small_request, large_request = requests_mock.request_history[1:]
+    assert "Content-Encoding" not in small_request.headers
+    assert small_request.json()["proposal"]["entityUrn"].endswith("bar,PROD)")
+    if supported_encodings:
+        assert large_request.headers["Content-Encoding"] == "gzip"
+        body = json.loads(gzip.decompress(large_request.body))
+    else:
+        assert "Content-Encoding" not in large_request.headers
+        body = large_request.json()
+    assert body == json.loads(emitter.serialize(make_mcp("large " * 1000))[1])
+
+
+def _make_mce(name: str) -> models.MetadataChangeEventClass:
+    return models.MetadataChangeEventClass(
+        proposedSnapshot=models.DatasetSnapshotClass(
+            urn=f"urn:li:dataset:(urn:li:dataPlatform:foo,{name},PROD)",
+            aspects=[models.StatusClass(removed=False)],
+        )
+    )
+
+
+def _make_status_mcp(name: str) -> MetadataChangeProposalWrapper:
+    return MetadataChangeProposalWrapper(
+        entityType="dataset",
+        entityUrn=f"urn:li:dataset:(urn:li:dataPlatform:foo,{name},PROD)",
+        changeType=models.ChangeTypeClass.UPSERT,
+        aspectName="status",
+        aspect=models.StatusClass(removed=True),
+    )
+
+
+def _emitted() -> Tuple[datetime.datetime, datetime.datetime]:
+    now = datetime.datetime.now()
+    return now, now
+
+
+def _create_sink(**config: object) -> Tuple[DatahubRestSink, mock.MagicMock]:
+    with mock.patch(
+        "datahub.ingestion.sink.datahub_rest.DatahubRestEmitter"
+    ) as emitter_class:
+        emitter = emitter_class.return_value
+        emitter.test_connection.return_value = {"noCode": "true"}
+        emitter.emit.side_effect = lambda record: _emitted()
+        emitter.emit_serialized.side_effect = lambda url, payload: _emitted()
+        sink = DatahubRestSink(
+            PipelineContext(run_id="test-run"),
+            DatahubRestSinkConfig(server=MOCK_GMS_ENDPOINT, **config),
+        )
+    return sink, emitter
+
+
+def _write_in_thread(
+    sink: DatahubRestSink, records: List[object], callback: WriteCallback
+) -> threading.Thread:
+    def write() -> None:
+        for record in records:
+            sink.write_record_async(RecordEnvelope(record, metadata={}), callback)
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_datahub_rest_sink_batches_mces():
+    sink, emitter = _create_sink(batch_size=3, batch_max_wait_sec=60, max_threads=1)
+    callback = mock.MagicMock(spec=WriteCallback)
+    for i in range(7):
+        sink.write_record_async(
+            RecordEnvelope(_make_mce(f"t{i}"), metadata={}), callback
+        )
+    sink.close()
+
+    assert [len(call.args[0]) for call in emitter.emit_mces.call_args_list] == [3, 3, 1]
+    assert not emitter.emit.called
+    assert callback.on_success.call_count == 7
+    assert sink.report.batches_written == 3
+    assert sink.report.records_written == 7
+
+
+def test_datahub_rest_sink_flushes_batch_after_max_wait():
+    sink, emitter = _create_sink(batch_size=100, batch_max_wait_sec=0.01)
+    emitted = threading.Event()
+    emitter.emit_mces.side_effect = lambda mces: emitted.set()
+
+    sink.write_record_async(
+        RecordEnvelope(_make_mce("t"), metadata={}), mock.MagicMock(spec=WriteCallback)
+    )
+    # The partially filled batch is sent without waiting for close().
+    assert emitted.wait(timeout=10)
+    sink.close()
+    assert emitter.emit_mces.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "status_code,batching_disabled",
+    [(400, True), (404, True), (405, True), (500, False)],
+)
+def test_datahub_rest_sink_batch_fallback(status_code, batching_disabled):
+    sink, emitter = _create_sink(batch_size=2, batch_max_wait_sec=60, max_threads=1)
+
+    def emit_mces(mces: list) -> None:
+        response = requests.Response()
+        response.status_code = status_code
+        raise OperationalError(
+            "Unable to emit metadata to DataHub GMS", {}
+        ) from requests.exceptions.HTTPError(response=response)
+
+    def emit(record: object) -> Tuple[datetime.datetime, datetime.datetime]:
+        if record.proposedSnapshot.urn.endswith("bad,PROD)"):  # type: ignore
+            raise OperationalError("Unable to emit metadata to DataHub GMS", {})
+        return _emitted()
+
+    emitter.emit_mces.side_effect = emit_mces
+    emitter.emit.side_effect = emit
+    callback = mock.MagicMock(spec=WriteCallback)
+    for name in ["t0", "t1"]:
+        sink.write_record_async(RecordEnvelope(_make_mce(name), metadata={}), callback)
+    # Let the first batch fail before writing more records.
+    sink._wait_for_pending()
+    for name in ["t2", "t3"]:
+        sink.write_record_async(RecordEnvelope(_make_mce(name), metadata={}), callback)
+    sink.close()
+
+    # Each record of the failed batch is re-sent on its own. Batching is only
+    # given up on when that works, i.e. the batch endpoint itself is missing.
+    assert sink.report.batch_fallbacks == (1 if batching_disabled else 2)
+    assert emitter.emit_mces.call_count == (1 if batching_disabled else 2)
+    assert emitter.emit.call_count == 4
+    assert callback.on_success.call_count == 4
+
+    sink, emitter = _create_sink(batch_size=2, batch_max_wait_sec=60, max_threads=1)
+    emitter.emit_mces.side_effect = emit_mces
+    emitter.emit.side_effect = emit
+    callback = mock.MagicMock(spec=WriteCallback)
+    for name in ["bad", "t1", "t2", "t3"]:
+        sink.write_record_async(RecordEnvelope(_make_mce(name), metadata={}), callback)
+    sink.close()
+
+    # A record that fails on its own keeps batching enabled.
+    assert emitter.emit_mces.call_count == 2
+    assert callback.on_failure.call_count == 1
+    assert callback.on_success.call_count == 3
+
+
+def test_datahub_rest_sink_sends_batched_mce_before_mcp_of_same_entity():
+    sink, emitter = _create_sink(batch_size=10, batch_max_wait_sec=60, max_threads=1)
+    callback = mock.MagicMock(spec=WriteCallback)
+    for record in [
+        _make_mce("a"),
+        _make_mce("b"),
+        _make_status_mcp("c"),
+        _make_status_mcp("a"),
+        _make_mce("d"),
+    ]:
+        sink.write_record_async(RecordEnvelope(record, metadata={}), callback)
+    sink.close()
+
+    calls = [
+        (name, args[0])
+        for name, args, _ in emitter.mock_calls
+        if name in {"emit", "emit_mces"}
+    ]
+    assert calls == [
+        ("emit", _make_status_mcp("c")),
+        ("emit_mces", [_make_mce("a"), _make_mce("b")]),
+        ("emit", _make_status_mcp("a")),
+        ("emit_mces", [_make_mce("d")]),
+    ]
+    assert callback.on_success.call_count == 5
+
+
+def _block_emits(emitter: mock.MagicMock) -> threading.Event:
+    release = threading.Event()
+
+    def emit(*args: object) -> Tuple[datetime.datetime, datetime.datetime]:
+        release.wait(timeout=10)
+        return _emitted()
+
+    emitter.emit.side_effect = emit
+    emitter.emit_serialized.side_effect = emit
+    return release
+
+
+def test_datahub_rest_sink_blocks_at_max_pending_requests():
+    sink, emitter = _create_sink(max_pending_requests=2, max_threads=4)
+    release = _block_emits(emitter)
+    callback = mock.MagicMock(spec=WriteCallback)
+
+    thread = _write_in_thread(
+        sink, [_make_status_mcp(f"t{i}") for i in range(3)], callback
+    )
+    thread.join(timeout=0.5)
+    assert thread.is_alive()
+    assert sink._pending_requests == 2
+
+    release.set()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    sink.close()
+    assert callback.on_success.call_count == 3
+    assert sink.report.pending_requests_high_water_mark == 2
+
+
+def test_datahub_rest_sink_blocks_at_max_pending_bytes():
+    sink, emitter = _create_sink(max_pending_bytes=100, max_threads=4)
+    release = _block_emits(emitter)
+    payload_sizes = iter([1000, 60, 60])
+    emitter.serialize.side_effect = lambda record: ("url", "x" * next(payload_sizes))
+    callback = mock.MagicMock(spec=WriteCallback)
+
+    # A single record larger than the limit is let through on its own.
+    thread = _write_in_thread(sink, [_make_status_mcp("huge")], callback)
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert sink._pending_bytes == 1000
+
+    thread = _write_in_thread(
+        sink, [_make_status_mcp("t0"), _make_status_mcp("t1")], callback
+    )
+    thread.join(timeout=0.5)
+    assert thread.is_alive()
+
+    release.set()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    sink.close()
+    assert callback.on_success.call_count == 3
+    assert sink._pending_bytes == 0
+
+
+def test_datahub_rest_sink_counts_batched_records_toward_max_pending_bytes():
+    sink, emitter = _create_sink(
+        batch_size=10, batch_max_wait_sec=60, max_pending_bytes=100
+    )
+    emitter.serialize.side_effect = lambda record: ("url", "x" * 40)
+    callback = mock.MagicMock(spec=WriteCallback)
+
+    # The third record would go over the limit, so the first two are sent off
+    # in a partially filled batch.
+    thread = _write_in_thread(sink, [_make_mce(f"t{i}") for i in range(3)], callback)
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    sink.close()
+
+    assert [len(call.args[0]) for call in emitter.emit_mces.call_args_list] == [2, 1]
+    assert callback.on_success.call_count == 3
+    assert sink.report.pending_bytes_high_water_mark == 80
+    assert sink._pending_bytes == 0
+
+
+def test_datahub_rest_sink_flushes_partial_batches_when_blocked():
+    sink, emitter = _create_sink(
+        batch_size=10, batch_max_wait_sec=60, max_pending_requests=2
+    )
+    callback = mock.MagicMock(spec=WriteCallback)
+
+    # The third record waits for the first two, which sit in a partially filled
+    # batch, so they must be sent off rather than waited for.
+    thread = _write_in_thread(sink, [_make_mce(f"t{i}") for i in range(3)], callback)
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    sink.close()
+
+    assert [len(call.args[0]) for call in emitter.emit_mces.call_args_list] == [2, 1]
+    assert callback.on_success.call_count == 3
+
+
+def test_datahub_rest_sink_releases_pending_on_failure():
+    sink, emitter = _create_sink(max_pending_requests=1)
+    emitter.emit.side_effect = OperationalError("Unable to emit", {"message": "bad"})
+    callback = mock.MagicMock(spec=WriteCallback)
+
+    thread = _write_in_thread(
+        sink, [_make_status_mcp(f"t{i}") for i in range(3)], callback
+    )
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    sink.close()
+
+    assert callback.on_failure.call_count == 3
+    assert len(sink.report.failures) == 3
+    assert sink._pending_requests == 0
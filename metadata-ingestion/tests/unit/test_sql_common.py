@@ -1,14 +1,20 @@
-from typing import Dict
+import pathlib
+from collections import namedtuple
+from typing import Dict, List, Tuple
 from unittest.mock import Mock
 
 import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects.mysql.base import MySQLDialect
 from sqlalchemy.engine.reflection import Inspector
 
 from datahub.ingestion.api.source import Source
+from datahub.ingestion.source.sql.sql_bulk_reflection import BulkSchemaReflector
 from datahub.ingestion.source.sql.sql_common import (
     PipelineContext,
     SQLAlchemyConfig,
     SQLAlchemySource,
+    SQLSourceReport,
     get_platform_from_sqlalchemy_uri,
 )
 
@@ -106,3 +112,76 @@ PLATFORM_FROM_SQLALCHEMY_URI_TEST_CASES: Dict[str, str] = {
 def test_get_platform_from_sqlalchemy_uri(uri: str, expected_platform: str) -> None:
     platform: str = get_platform_from_sqlalchemy_uri(uri)
     assert platform == expected_platform
+
+
+def _get_table_workunit_ids(
+    db_path: pathlib.Path, extraction_workers: int
+) -> Tuple[List[str], SQLSourceReport]:
+    config: SQLAlchemyConfig = TestSQLAlchemyConfig(
+        extraction_workers=extraction_workers
+    )
+    source = TestSQLAlchemySource(
+        config=config, ctx=PipelineContext(run_id="test_ctx"), platform="TEST"
+    )
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        workunit_ids = [
+            wu.id for wu in source.loop_tables(inspect(conn), "main", source.config)
+        ]
+    return workunit_ids, source.report
+
+
+def test_concurrent_table_extraction_keeps_order(tmp_path: pathlib.Path) -> None:
+    db_path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        for i in range(20):
+            conn.execute(f"CREATE TABLE table_{i:02d} (id INTEGER PRIMARY KEY, x TEXT)")
+
+    sequential, sequential_report = _get_table_workunit_ids(
+        db_path, extraction_workers=1
+    )
+    concurrent, concurrent_report = _get_table_workunit_ids(
+        db_path, extraction_workers=4
+    )
+
+    assert "main.table_00" in sequential
+    assert concurrent == sequential
+    # The workers report the workunits of the tables they extract.
+    assert concurrent_report.workunits_produced == len(concurrent)
+    assert sorted(concurrent_report.workunit_ids) == sorted(
+        sequential_report.workunit_ids
+    )
+    assert concurrent_report.tables_scanned == sequential_report.tables_scanned == 20
+
+
+def test_bulk_reflection_serves_tables_from_one_query_per_schema() -> None:
+    column_row = namedtuple(
+        "column_row",
+        "table_name column_name data_type is_nullable column_default "
+        "character_maximum_length numeric_precision numeric_scale comment",
+    )
+    inspector: Inspector = Mock()
+    inspector.dialect = MySQLDialect()
+    inspector.bind.execute.return_value.fetchall.return_value = [
+        column_row("orders", "id", "int", "NO", None, None, 10, 0, ""),
+        column_row("orders", "note", "varchar", "YES", None, 255, None, None, "x"),
+        column_row("users", "id", "bigint", "NO", None, None, 19, 0, ""),
+        column_row("shapes", "area", "geometry", "YES", None, None, None, None, ""),
+    ]
+
+    reflector = BulkSchemaReflector()
+    orders = reflector.get_columns(inspector, "shop", "orders")
+    users = reflector.get_columns(inspector, "shop", "users")
+
+    assert orders is not None and users is not None
+    assert [(c["name"], repr(c["type"]), c["nullable"]) for c in orders] == [
+        ("id", "INTEGER()", False),
+        ("note", "VARCHAR(length=255)", True),
+    ]
+    assert orders[1]["comment"] == "x"
+    assert [c["name"] for c in users] == ["id"]
+    # Unknown types and missing tables are left to the per-table inspector calls.
+    assert reflector.get_columns(inspector, "shop", "shapes") is None
+    assert reflector.get_columns(inspector, "shop", "missing") is None
+    assert inspector.bind.execute.call_count == 1
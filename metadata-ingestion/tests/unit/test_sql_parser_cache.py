@@ -0,0 +1,74 @@
+import concurrent.futures
+from unittest import mock
+
+from datahub.utilities import sql_parser
+from datahub.utilities.sql_parser import SqlLineageSQLParser
+from datahub.utilities.sql_parser_cache import SqlParseCache, make_cache_key
+
+
+def test_sql_parse_cache_key_normalizes_whitespace():
+    key = make_cache_key("parser", "SELECT foo\nFROM bar")
+    assert make_cache_key("parser", "  SELECT \t foo  \n  FROM bar\n") == key
+    assert make_cache_key("parser", "SELECT foo FROM bar") != key
+    assert make_cache_key("other_parser", "SELECT foo\nFROM bar") != key
+
+    # The whitespace in literals and comments is significant.
+    key = make_cache_key("parser", "SELECT 'a  b', \"c  d\" FROM bar -- e  f")
+    assert make_cache_key("parser", "SELECT  'a  b',  \"c  d\" FROM bar -- e  f") == key
+    for sql_query in [
+        "SELECT 'a b', \"c  d\" FROM bar -- e  f",
+        "SELECT 'a  b', \"c d\" FROM bar -- e  f",
+        "SELECT 'a  b', \"c  d\" FROM bar -- e f",
+    ]:
+        assert make_cache_key("parser", sql_query) != key
+    assert make_cache_key("parser", "SELECT 'it''s  ' FROM bar") != make_cache_key(
+        "parser", "SELECT 'it''s ' FROM bar"
+    )
+    assert make_cache_key("parser", "SELECT 'it\\'s  ' FROM bar") != make_cache_key(
+        "parser", "SELECT 'it\\'s ' FROM bar"
+    )
+
+
+def test_sql_parse_cache_tiers(tmp_path):
+    cache = SqlParseCache(max_size=2, cache_dir=str(tmp_path))
+    for i in range(3):
+        cache.put(f"key{i}", ([f"table{i}"], [f"column{i}"]))
+    # The oldest result is evicted from memory, but kept on disk.
+    assert list(cache._entries) == ["key1", "key2"]
+    assert cache.get("key0") == (["table0"], ["column0"])
+    assert cache.get("missing") is None
+    cache.close()
+
+    # The on-disk results survive across runs.
+    cache = SqlParseCache(max_size=2, cache_dir=str(tmp_path))
+    assert cache.get("key2") == (["table2"], ["column2"])
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.close()
+
+    cache = SqlParseCache(max_size=2)
+    cache.put("key", (["table"], ["column"]))
+    cache.put("other_key", (["table"], ["column"]))
+    cache.put("another_key", (["table"], ["column"]))
+    assert cache.get("key") is None
+
+
+def test_sql_lineage_parser_parses_repeated_queries_once():
+    pool = mock.MagicMock()
+
+    def submit(sql_query: str) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_result((["db.table"], ["foo"]))
+        return future
+
+    pool.submit.side_effect = submit
+    with mock.patch.object(
+        sql_parser, "get_default_sql_parser_pool", return_value=pool
+    ), mock.patch.object(
+        sql_parser, "get_default_sql_parse_cache", return_value=SqlParseCache()
+    ):
+        for sql_query in ["SELECT foo FROM db.table", "SELECT  foo FROM db.table "]:
+            parser = SqlLineageSQLParser(sql_query)
+            assert parser.get_tables() == ["db.table"]
+            assert parser.get_columns() == ["foo"]
+
+    assert pool.submit.call_count == 1
@@ -0,0 +1,31 @@
+import pytest
+
+from datahub.utilities.sql_parser_pool import SqlParserPool
+
+
+def test_sql_parser_pool_recycles_workers():
+    with SqlParserPool(num_workers=2, max_parses_per_worker=2) as pool:
+        futures = pool.parse_batch(f"SELECT foo FROM db.table{i}" for i in range(5))
+        results = [future.result() for future in futures]
+
+    assert results == [([f"db.table{i}"], ["foo"]) for i in range(5)]
+    # However the queries are split between the two workers, five parses take
+    # three worker processes when each is replaced after two parses. The last
+    # one is stopped when the pool is closed.
+    assert pool.workers_started == 3
+    assert pool.workers_recycled == 2
+
+
+def test_sql_parser_pool_replaces_timed_out_worker():
+    with SqlParserPool(parse_timeout_sec=1e-6) as pool:
+        with pytest.raises(TimeoutError):
+            pool.submit("SELECT foo FROM db.table").result()
+
+        pool.parse_timeout_sec = None
+        assert pool.submit("SELECT foo FROM db.table").result() == (
+            ["db.table"],
+            ["foo"],
+        )
+
+    assert pool.parse_timeouts == 1
+    assert pool.workers_started == 2
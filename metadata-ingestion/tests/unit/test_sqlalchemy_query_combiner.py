@@ -0,0 +1,89 @@
+from typing import Any, Dict
+
+import sqlalchemy as sa
+
+from datahub.utilities.sqlalchemy_query_combiner import SQLAlchemyQueryCombiner
+
+
+def _make_combiner(**kwargs: Any) -> SQLAlchemyQueryCombiner:
+    return SQLAlchemyQueryCombiner(
+        enabled=True,
+        catch_exceptions=True,
+        is_single_row_query_method=lambda query: True,
+        serial_execution_fallback_enabled=True,
+        **kwargs,
+    )
+
+
+def _run_queries(
+    combiner: SQLAlchemyQueryCombiner, num_queries: int, num_columns: int = 1
+) -> Dict:
+    engine = sa.create_engine("sqlite://")
+    results: Dict[Any, Any] = {}
+    with engine.connect() as conn:
+        conn.execute("CREATE TABLE numbers (x INTEGER)")
+        conn.execute("INSERT INTO numbers VALUES (1), (2), (3), (4)")
+        numbers = sa.table("numbers", sa.column("x"))
+
+        def run_query(key: Any, query: Any) -> None:
+            try:
+                results[key] = conn.execute(query).scalar()
+            except sa.exc.OperationalError:
+                results[key] = "failed"
+
+        with combiner.activate():
+            for i in range(num_queries):
+                query = (
+                    sa.select(
+                        [
+                            (sa.func.count() + j).label(f"c{j}")
+                            for j in range(num_columns)
+                        ]
+                    )
+                    .select_from(numbers)
+                    .where(numbers.c.x > i)
+                )
+                combiner.run(lambda i=i, query=query: run_query(i, query))
+            combiner.run(
+                lambda: run_query(
+                    "missing",
+                    sa.select([sa.func.count()]).select_from(sa.table("missing")),
+                )
+            )
+            combiner.flush()
+    return results
+
+
+def test_query_combiner_bounds_batches():
+    combiner = _make_combiner(max_columns_to_combine=4)
+
+    results = _run_queries(combiner, 6)
+
+    assert results == {0: 4, 1: 3, 2: 2, 3: 1, 4: 0, 5: 0, "missing": "failed"}
+    assert combiner.report.queries_combined == 7
+    # The batch with the failing query is retried in halves until the failing
+    # query is executed on its own.
+    assert combiner.report.combined_query_batches_split == 2
+    assert combiner.report.combined_queries_issued == 6
+    assert combiner.report.uncombined_queries_issued == 1
+    assert sum(combiner.report.combined_query_latency_histogram.values()) == 3
+    # The failure is down to a single query, so the batches are not made smaller.
+    assert combiner.report.batch_limits_by_dialect == {}
+
+
+def test_query_combiner_lowers_batch_limit_on_too_big_queries():
+    # SQLite cannot select more than 2000 columns at once.
+    combiner = _make_combiner(max_columns_to_combine=10000)
+    results = _run_queries(combiner, 40, num_columns=100)
+
+    assert [results[i] for i in range(5)] == [4, 3, 2, 1, 0]
+    assert results["missing"] == "failed"
+    assert combiner.report.combined_query_batches_split > 0
+    assert (
+        combiner.report.batch_limits_by_dialect["sqlite"]
+        < combiner.max_queries_to_combine
+    )
+
+    # The learned limit belongs to the combiner.
+    combiner = _make_combiner(max_columns_to_combine=10000)
+    assert combiner._get_batch_limit("sqlite") == combiner.max_queries_to_combine
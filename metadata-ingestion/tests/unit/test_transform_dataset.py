@@ -1,3 +1,4 @@
+import os
 import re
 from typing import Any, Dict, List, MutableSequence, Optional, Union
 from unittest import mock
@@ -11,6 +12,7 @@ import tests.test_helpers.mce_helpers
 from datahub.emitter.mcp import MetadataChangeProposalWrapper
 from datahub.ingestion.api import workunit
 from datahub.ingestion.api.common import EndOfStream, PipelineContext, RecordEnvelope
+from datahub.ingestion.graph.client import DatahubClientConfig
 from datahub.ingestion.run.pipeline import Pipeline
 from datahub.ingestion.transformer.add_dataset_browse_path import (
     AddDatasetBrowsePathTransformer,
@@ -915,6 +917,64 @@ def test_ownership_patching_with_different_types_2(mock_time):
     ]
 
 
+def test_ownership_patching_with_prefetched_ownership(mock_time):
+    urns = [
+        builder.make_dataset_urn("bigquery", f"example{i}", "PROD") for i in range(3)
+    ]
+    response = mock.MagicMock()
+    response.json.return_value = {
+        "results": {
+            urns[0]: {
+                "aspects": {
+                    "ownership": {
+                        "name": "ownership",
+                        "value": gen_owners(["foo"]).to_obj(),
+                    }
+                }
+            },
+            urns[1]: {"aspects": {}},
+        }
+    }
+
+    with mock.patch("datahub.emitter.rest_emitter.DatahubRestEmitter.test_connection"):
+        ctx = PipelineContext(
+            run_id="test", datahub_api=DatahubClientConfig(aspect_cache_size=2)
+        )
+    assert ctx.graph
+    ctx.graph._session = mock.MagicMock()
+    ctx.graph._session.get.return_value = response
+
+    transformer = SimpleAddDatasetOwnership.create(
+        {"owner_urns": ["bar"], "semantics": "PATCH"}, ctx
+    )
+    transformer.prefetch(urns[:2] + ["urn:li:corpuser:foo"])
+    assert ctx.graph._session.get.call_count == 1
+    assert "entitiesV2?ids=List(" in ctx.graph._session.get.call_args[0][0]
+
+    outputs = list(
+        transformer.transform(
+            [
+                RecordEnvelope(
+                    make_generic_dataset(entity_urn=urn, aspects=[gen_owners([])]),
+                    metadata={},
+                )
+                for urn in urns[:2]
+            ]
+        )
+    )
+    # Both datasets were answered from the cache, including the one without owners.
+    assert ctx.graph._session.get.call_count == 1
+    output_owners = []
+    for output in outputs:
+        ownership = builder.get_aspect_if_available(output.record, OwnershipClass)
+        assert ownership
+        output_owners.append([o.owner for o in ownership.owners])
+    assert output_owners == [["foo", "bar"], ["bar"]]
+    # The cache now holds the patched ownership.
+    ownership = ctx.graph.get_ownership(urns[0])
+    assert ownership and [o.owner for o in ownership.owners] == ["foo", "bar"]
+
+
 PROPERTIES_TO_ADD = {"my_new_property": "property value"}
 
 
@@ -1075,6 +1135,70 @@ def test_mcp_add_tags_missing(mock_time):
     assert isinstance(outputs[-1].record, EndOfStream)
 
 
+@pytest.mark.parametrize("on_disk_state", [False, True])
+def test_mcp_add_tags_missing_for_many_entities(mock_time, tmp_path, on_disk_state):
+    transformer = SimpleAddDatasetTags.create(
+        {"tag_urns": [builder.make_tag_urn("Legacy")]},
+        PipelineContext(
+            run_id="test-tags",
+            transformer_state_dir=str(tmp_path) if on_disk_state else None,
+        ),
+    )
+    urns = [builder.make_dataset_urn("hive", f"table_{i}") for i in range(5)]
+    inputs: List[Union[MetadataChangeEventClass, MetadataChangeProposalWrapper]] = [
+        make_generic_dataset_mcp(entity_urn=urn) for urn in urns
+    ]
+    # The tags of the second entity are seen, so it is transformed in place.
+    inputs.append(
+        make_generic_dataset_mcp(
+            entity_urn=urns[1],
+            aspect_name="globalTags",
+            aspect=GlobalTagsClass(tags=[]),
+        )
+    )
+    # Like the extractor, stamp each record with the time it was observed.
+    for i, mcp in enumerate(inputs):
+        mcp.systemMetadata = models.SystemMetadataClass(
+            runId="test-tags",
+            lastObserved=1000 + i,
+            registryName="registry",
+            properties={"key": "value"},
+        )
+    input_stream: List[RecordEnvelope] = [
+        RecordEnvelope(input, metadata={}) for input in inputs
+    ]
+    input_stream.append(RecordEnvelope(record=EndOfStream(), metadata={}))
+
+    outputs = list(transformer.transform(input_stream))
+
+    assert len(outputs) == len(inputs) + 4 + 1
+    transformed_in_place = outputs[len(inputs) - 1].record
+    assert transformed_in_place.entityUrn == urns[1]
+    assert transformed_in_place.aspect.tags[0].tag == builder.make_tag_urn("Legacy")
+    end_of_stream_outputs = [o.record for o in outputs[len(inputs) : -1]]
+    assert [mcp.entityUrn for mcp in end_of_stream_outputs] == [
+        urns[0],
+        urns[2],
+        urns[3],
+        urns[4],
+    ]
+    for mcp in end_of_stream_outputs:
+        assert mcp.aspectName == "globalTags"
+        # The aspect is observed when it is added, at the end of the stream.
+        assert mcp.systemMetadata == models.SystemMetadataClass(
+            runId="test-tags",
+            lastObserved=builder.get_sys_time(),
+            registryName="registry",
+            properties={"key": "value"},
+        )
+    assert isinstance(outputs[-1].record, EndOfStream)
+    # The entities share their state, however their lastObserved times differ.
+    assert len(transformer.entity_state._seen) == 1
+
+    transformer.close()
+    assert os.listdir(tmp_path) == []
+
+
 def test_mcp_add_tags_existing(mock_time):
     dataset_mcp = make_generic_dataset_mcp(
         aspect_name="globalTags",
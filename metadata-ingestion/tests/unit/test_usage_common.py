@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
 import pytest
 from pydantic import ValidationError
@@ -10,6 +11,8 @@ from datahub.ingestion.api.workunit import MetadataWorkUnit
 from datahub.ingestion.source.usage.usage_common import (
     BaseUsageConfig,
     GenericAggregatedDataset,
+    SpaceSavingCounter,
+    UsageAggregator,
 )
 from datahub.metadata.schema_classes import DatasetUsageStatisticsClass
 
@@ -223,6 +226,146 @@ def test_query_trimming():
     assert du.topSqlQueries.pop() == "select * f ..."
 
 
+def test_space_saving_counter_keeps_heavy_hitters():
+    counter = SpaceSavingCounter(capacity=3)
+    counter.update(["a"] * 10 + ["b"] * 5 + ["c", "d", "e", "f"] + ["b"] * 2)
+
+    assert len(counter) == 3
+    assert counter.most_common(2) == [("a", 10), ("b", 7)]
+    # Counts of evicted keys are inherited, so they are never underestimated.
+    assert counter.most_common()[2] == ("f", 4)
+    assert counter["c"] == 0
+
+
+def _aggregate_usage(
+    config: BaseUsageConfig, events: List[Tuple[datetime, str]]
+) -> Tuple[List[Tuple[datetime, str, int]], UsageAggregator[str]]:
+    aggregator: UsageAggregator[str] = UsageAggregator(config)
+    aggregates: List[_TestAggregatedDataset] = []
+    for timestamp, resource in events:
+        aggregator.add_read_entry(
+            timestamp, resource, "test_email@test.com", "select * from test", []
+        )
+        aggregates.extend(aggregator.pop_finished_aggregates())
+    aggregates.extend(aggregator.pop_all_aggregates())
+    return [
+        (agg.bucket_start_time, agg.resource, agg.readCount) for agg in aggregates
+    ], aggregator
+
+
+def _make_usage_events(
+    start: datetime, lag: Optional[timedelta] = None
+) -> List[Tuple[datetime, str]]:
+    events = [(start + timedelta(minutes=10 * i), f"table_{i % 4}") for i in range(60)]
+    if lag is not None:
+        events.append((events[-1][0] - lag, "table_0"))
+    return events
+
+
+def test_usage_aggregator_spills_buckets_to_disk():
+    start = datetime(2020, 1, 1)
+    events = _make_usage_events(start)
+    in_memory, _ = _aggregate_usage(
+        BaseUsageConfig(bucket_duration=BucketDuration.HOUR), events
+    )
+    spilled, aggregator = _aggregate_usage(
+        BaseUsageConfig(
+            bucket_duration=BucketDuration.HOUR, max_aggregates_in_memory=5
+        ),
+        events,
+    )
+
+    assert aggregator.num_spilled_buckets > 0
+    assert spilled == in_memory
+    assert len(in_memory) == 40
+    assert sum(read_count for _, _, read_count in in_memory) == len(events)
+
+
+def test_usage_aggregator_emits_finished_buckets():
+    start = datetime(2020, 1, 1)
+    config = BaseUsageConfig(
+        bucket_duration=BucketDuration.HOUR,
+        bucket_emit_lateness=timedelta(minutes=30),
+    )
+
+    aggregator: UsageAggregator[str] = UsageAggregator(config)
+    aggregator.add_read_entry(start, "table", "test_email@test.com", None, [])
+    aggregator.add_read_entry(
+        start + timedelta(minutes=80), "table", "test_email@test.com", None, []
+    )
+    assert list(aggregator.pop_finished_aggregates()) == []
+    aggregator.add_read_entry(
+        start + timedelta(minutes=95), "table", "test_email@test.com", None, []
+    )
+    finished = list(aggregator.pop_finished_aggregates())
+    assert [agg.bucket_start_time for agg in finished] == [start]
+
+    # Late events for a bucket that was already emitted are dropped.
+    _, aggregator = _aggregate_usage(
+        config, _make_usage_events(start, lag=timedelta(hours=2))
+    )
+    assert aggregator.num_late_events_dropped == 1
+
+
+def test_usage_aggregator_query_fingerprinting():
+    event_time = datetime(2020, 1, 1)
+    aggregator: UsageAggregator[str] = UsageAggregator(
+        BaseUsageConfig(query_fingerprinting=True)
+    )
+    for query in [
+        "select * from test where id = 1",
+        "select * from test where id = 2",
+        "select  *  from test where id = 3 -- retry",
+        "select * from other",
+    ]:
+        aggregator.add_read_entry(
+            event_time, "test_table", "test_email@test.com", query, []
+        )
+
+    (aggregate,) = aggregator.pop_all_aggregates()
+    assert aggregate.queryCount == 4
+    assert aggregate.queryFreq.most_common() == [
+        ("select * from test where id = 1", 3),
+        ("select * from other", 1),
+    ]
+    # The queries of emitted buckets are not kept around.
+    assert aggregator._queries_by_fingerprint == {}
+
+
+def test_usage_aggregator_query_fingerprinting_with_spilled_buckets():
+    start = datetime(2020, 1, 1)
+    aggregator: UsageAggregator[str] = UsageAggregator(
+        BaseUsageConfig(
+            bucket_duration=BucketDuration.HOUR,
+            query_fingerprinting=True,
+            max_aggregates_in_memory=1,
+        )
+    )
+    for i, offset in enumerate([0, 2, 0, 2]):
+        aggregator.add_read_entry(
+            start + timedelta(hours=offset),
+            "test_table",
+            "test_email@test.com",
+            f"select * from test where id = {i}",
+            [],
+        )
+        # Only the fingerprints of the buckets held in memory are kept.
+        assert set(aggregator._queries_by_fingerprint) <= set(aggregator._buckets)
+
+    assert aggregator.num_spilled_buckets > 0
+    assert [agg.queryFreq.most_common() for agg in aggregator.pop_all_aggregates()] == [
+        [("select * from test where id = 0", 2)],
+        [("select * from test where id = 1", 2)],
+    ]
+    assert aggregator._queries_by_fingerprint == {}
+
+
+def test_max_tracked_queries_validator_fails():
+    with pytest.raises(ValidationError) as excinfo:
+        BaseUsageConfig(top_n_queries=10, max_tracked_queries=5)
+    assert "max_tracked_queries is set to 5" in str(excinfo.value)
+
+
 def test_top_n_queries_validator_fails():
     with pytest.raises(ValidationError) as excinfo:
         GenericAggregatedDataset.total_budget_for_query_list = 20
@@ -1,8 +1,12 @@
 import sys
+import threading
+import time
 
 import pytest
 
 from datahub.utilities.delayed_iter import delayed_iter
+from datahub.utilities.prefetch_iter import PrefetchIterator
+from datahub.utilities.sql_formatter import get_query_fingerprint
 from datahub.utilities.sql_parser import MetadataSQLSQLParser, SqlLineageSQLParser
 
 
@@ -40,6 +44,76 @@ def test_delayed_iter():
     ]
 
 
+def test_prefetch_iter_fetches_concurrently():
+    # Each iterable only gets past the barrier once all of them are being
+    # fetched at the same time; serially, the barrier would time out.
+    barrier = threading.Barrier(4, timeout=10)
+
+    def synced_range(n):
+        barrier.wait()
+        yield from range(n)
+
+    iterators = [PrefetchIterator(synced_range(4), buffer_size=10) for _ in range(4)]
+    assert [list(it) for it in iterators] == [[0, 1, 2, 3]] * 4
+    assert not barrier.broken
+
+
+def test_prefetch_iter_bounds_concurrent_fetches():
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def tracked_range(n):
+        nonlocal active, max_active
+        for i in range(n):
+            with lock:
+                active += 1
+                max_active = max(max_active, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+            yield i
+
+    semaphore = threading.Semaphore(2)
+    iterators = [
+        PrefetchIterator(tracked_range(5), buffer_size=1, semaphore=semaphore)
+        for _ in range(5)
+    ]
+    assert [sum(it) for it in iterators] == [10] * 5
+    assert max_active <= 2
+
+
+def test_prefetch_iter_raises_in_consumer():
+    def failing():
+        yield 1
+        raise ValueError("failed to fetch")
+
+    it = PrefetchIterator(failing(), buffer_size=10)
+    assert next(it) == 1
+    with pytest.raises(ValueError, match="failed to fetch"):
+        next(it)
+    assert list(it) == []
+
+
+def test_query_fingerprint_ignores_literals_comments_and_whitespace():
+    fingerprint = get_query_fingerprint(
+        "SELECT * FROM foo WHERE id = 42 AND name = 'bob' -- don't"
+    )
+
+    assert fingerprint == get_query_fingerprint(
+        "SELECT *\n  FROM foo\n WHERE id = 7 AND name = 'it''s' /* job: 12 */"
+    )
+    assert get_query_fingerprint(
+        "SELECT * FROM foo WHERE id IN (1, 2, 3)"
+    ) == get_query_fingerprint("SELECT * FROM foo WHERE id IN (4)")
+    assert get_query_fingerprint("SELECT * FROM foo1") != get_query_fingerprint(
+        "SELECT * FROM foo2"
+    )
+    assert get_query_fingerprint('SELECT "a 1" FROM foo') != get_query_fingerprint(
+        'SELECT "a 2" FROM foo'
+    )
+
+
 @pytest.mark.skipif(
     sys.version_info < (3, 7), reason="The LookML source requires Python 3.7+"
 )